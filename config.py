@@ -1,8 +1,59 @@
 # Model used for generating embeddings
 EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# Vector store backend used by the app / Options: faiss, hnsw, qdrant
+VECTOR_STORE = "faiss"
+
+# Retrieval settings used by the app and the API, overridden by the file written by the parameter sweep
+# top_k: movies sent to the recommendation model, rerank_depth: retrieved candidates scored by the cross-encoder,
+# overfetch: candidates per search source as a multiple of the requested count, rating_weight: IMDb rating weight in the rerank score
+RETRIEVAL_SETTINGS = {
+    "top_k": 10,
+    "overfetch": 5,
+    "rerank_depth": 10,
+    "rating_weight": 0.1,
+    "vector_store": VECTOR_STORE,
+    "vector_store_params": {},  # Query-time parameters of the vector store, e.g. {"ef_search": 64} for hnsw
+}
+RETRIEVAL_SETTINGS_PATH = "data/processed/retrieval_settings.json"
+
+# Precomputed "more like this" graph built by the preprocessing script, refreshed with `python -m src.database.neighbour_graph --refresh`
+# k: neighbours stored per movie, block_size: movies per matrix product of the exact search,
+# ann_threshold: catalog size above which the neighbours are searched in the ann_backend vector store instead
+NEIGHBOUR_GRAPH = {"path": "data/processed/neighbours", "k": 50, "block_size": 1024, "ann_threshold": 200000, "ann_backend": "hnsw"}
+
+# Cache of the pipeline stage results, keyed by the normalized query and the pipeline configuration
+# max_entries: cached stage results (0 disables the cache), ttl: seconds a result stays valid
+PIPELINE_CACHE = {"max_entries": 512, "ttl": 3600}
+
+# Speculative retrieval: search with the raw query while the HyDE text is generated, then fuse both result lists
+# enabled: overlap the raw query search with the HyDE call, deadline: seconds after the search started to wait for HyDE
+# before continuing with the raw query results alone (None waits for it), rrf_k: constant of the reciprocal rank fusion,
+# workers: threads running the HyDE calls
+SPECULATIVE_RETRIEVAL = {"enabled": True, "deadline": 4.0, "rrf_k": 60, "workers": 8}
+
+# Keyword search backend used by the app / Options: bm25 (in-memory, built at startup), fts (SQLite FTS5 index in movies.db)
+KEYWORD_BACKEND = "bm25"
+
+# Extracted features applied as hard filters during retrieval
+# Options: liked_genres, disliked_genres, liked_stars, disliked_stars, liked_directors, disliked_directors, liked_years, liked_rating
+ACTIVE_FILTERS = ["liked_genres", "disliked_genres"]
+
+# JSON lines file receiving one record per pipeline span (stage timings), None to disable the file log
+TRACE_LOG_PATH = "data/logs/traces.jsonl"
+
+# Latency histograms of the API workers, summed by GET /metrics when the service runs several worker processes
+METRICS = {"multiprocess_dir": "data/metrics",  # Directory where each worker writes its histograms
+           "flush_interval": 1.0}  # Seconds between two writes of a worker's histograms, /metrics may lag by as much
+
 # Model used for reranking search results
 RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
 
+# Language model provider / Options: gemini (Google AI models below), fake (deterministic offline responses for tests and load tests)
+LLM_PROVIDER = "gemini"
+
+# Simulated latency of the fake provider: mean seconds per call and relative jitter (0.2 = +/-20%)
+FAKE_LLM = {"latency": 0.5, "jitter": 0.2}
+
 # Model used for generating summaries / Only Google AI models are supported
 
 SUMMARY_MODEL = {"name": "gemini-2.0-flash-lite-preview-02-05",
@@ -19,13 +70,52 @@ RECOMMENDATION_MODEL = {"name": "gemini-2.0-flash",
                         "rpm": 20  # Requests per minute
                         }
 
+# Movie list of the recommendation prompt, written as compact rows under a token budget (about 4 characters per token)
+RECOMMENDATION_CONTEXT = {"format": "tsv",  # Options: tsv (header line and tab-separated rows), json (one minimal JSON object per line)
+                          "max_tokens": 1500,  # Budget of the movie rows, None for no limit
+                          "fields": ["title", "year", "genres", "directors", "stars", "imdb_rating", "metascore",
+                                     "pg_rating", "length", "plot", "link"],
+                          "truncate_order": ["plot", "stars", "directors"]  # Fields shortened first when over budget, then the lowest ranked movies are left out
+                          }
+
 # Model used for extracting genres / Only Google AI models are supported
 GENRE_EXTRACTOR_MODEL = {"name": "gemini-2.0-flash",
                          "rpm": 20  # Requests per minute
                          }
 
+# Local feature extraction from the query (regular expressions, genre vocabulary, star and director names)
+FEATURE_EXTRACTION = {"mode": "auto",  # Options: auto (language model only for low confidence queries), rules (never call it), llm (always call it)
+                      "min_confidence": 0.8,  # Share of the meaningful query words the rules must explain to skip the language model
+                      "fuzzy_cutoff": 0.88  # Minimum similarity of a misspelled genre to a catalog genre
+                      }
+
 # Path to the Chrome WebDriver executable
 CHROME_DRIVER_PATH = "PATH/TO/chromedriver.exe"  # Replace with your actual path
 
 # List of user agents to rotate through during scraping
 USER_AGENTS_LIST = [] # Populate this list if you want to use a rotating list of user agents.
+
+# Site scraped for movie pages, point it to a local stub server to test the scraper offline
+IMDB_BASE_URL = "https://www.imdb.com"
+
+# Page fetcher: concurrent requests, per-host rate limit (requests per second and burst) and retries on 429/5xx
+SCRAPER = {"max_workers": 8,
+           "requests_per_second": 2.0,
+           "burst": 4,
+           "max_retries": 4,
+           "backoff": 1.0,  # Seconds, doubled on every retry
+           "timeout": 20
+           }
+
+# Raw page store: one SQLite file of compressed pages ("zstd" needs the zstandard package, "zlib" is built in)
+PAGE_STORE = {"path": "data/raw/pages.db",
+              "codec": "zstd",
+              "level": None,  # Codec default
+              "max_age": None  # Seconds before a stored page is checked again, None keeps pages forever
+              }
+
+# Persistent scrape job queue: attempts per movie page and movies saved per database transaction
+SCRAPE_QUEUE = {"path": "data/raw/scrape_jobs.db",
+                "max_attempts": 3,
+                "batch_size": 50
+                }
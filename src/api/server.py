@@ -0,0 +1,207 @@
+"""
+Headless HTTP service running the recommendation pipeline.
+Usage: python -m src.api.server --host 0.0.0.0 --port 8000 --workers 2 --max-concurrent 4
+
+Endpoints (JSON in, JSON out):
+    GET  /health     -> load state of every component and cache counters
+    GET  /metrics    -> per-stage latency histograms in the Prometheus text format, summed over the workers
+    POST /search     {"query": str, "top_k": int}           -> features, hyde, retrieved movies
+    POST /rerank     {"query": str, "candidates": [int]}    -> reranked movies
+    POST /recommend  {"query": str, "top_k": int}           -> full pipeline including the recommendation text
+    POST /similar    {"movie_id": int, "k": int, "filters": dict} -> precomputed most similar movies
+
+"top_k" is optional and defaults to the retrieval settings (see src/core/settings.py).
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import config
+from src.core.pipeline import RecommendationPipeline
+from src.core.startup import StartupOrchestrator
+from src.core.tracing import reset_shared_histograms, tracer
+
+class PipelineServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server holding one pipeline per worker process.
+
+    A semaphore caps the number of requests running the pipeline at once, extra requests wait up to
+    `queue_timeout` seconds and are then rejected with 503 so a load balancer can retry elsewhere.
+    """
+    daemon_threads = True
+    # Accept bursts from a load balancer without dropping connections
+    request_queue_size = 128
+
+    def __init__(self, address, max_concurrent=4, queue_timeout=30.0):
+        """
+        Initializes the PipelineServer.
+
+        Args:
+            address (tuple): (host, port) to listen on.
+            max_concurrent (int, optional): Maximum number of requests running the pipeline at once. Defaults to 4.
+            queue_timeout (float, optional): Seconds a request waits for a free slot before 503. Defaults to 30.
+        """
+        super().__init__(address, PipelineRequestHandler)
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+        self.queue_timeout = queue_timeout
+        self.pipeline = None
+
+    def load_pipeline(self):
+        """Starts loading the models, called in each worker process after it is forked."""
+        self.pipeline = RecommendationPipeline(StartupOrchestrator().start())
+
+
+class PipelineRequestHandler(BaseHTTPRequestHandler):
+    """
+    Routes requests to the pipeline stages.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/health":
+            status = self.server.pipeline.startup.status()
+            ready = all(state not in ("loading", "failed") for state in status.values())
+            self._send_json(HTTPStatus.OK if ready else HTTPStatus.SERVICE_UNAVAILABLE,
+                            {"pid": os.getpid(), "components": status, "cache": self.server.pipeline.cache.stats()})
+        elif self.path == "/metrics":
+            data = tracer.render_prometheus().encode("utf-8")
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        routes = {"/search": self._search, "/rerank": self._rerank, "/recommend": self._recommend, "/similar": self._similar}
+        route = routes.get(self.path)
+        if route is None:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(body, dict):
+                raise ValueError("Request body must be a JSON object.")
+            if self.path == "/similar":
+                if not isinstance(body.get("movie_id"), int):
+                    raise ValueError("'movie_id' must be an integer.")
+            elif not isinstance(body.get("query"), str) or not body["query"].strip():
+                raise ValueError("'query' must be a non-empty string.")
+        except ValueError as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+
+        if not self.server.slots.acquire(timeout=self.server.queue_timeout):
+            self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Server is busy, please retry."})
+            return
+
+        try:
+            with tracer.span(f"api{self.path}") as span:
+                response = route(body)
+                response["trace_id"] = span.trace.trace_id
+            self._send_json(HTTPStatus.OK, response)
+        except (TypeError, ValueError) as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+        except Exception as e:
+            self.log_error("Pipeline failed: %s", e)
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)})
+        finally:
+            self.server.slots.release()
+
+    def _search(self, body):
+        pipeline = self.server.pipeline
+        response = pipeline.search(body["query"], top_k=int(body["top_k"]) if body.get("top_k") else None)
+        response["results"] = pipeline.movies(response["results"])
+        return response
+
+    def _rerank(self, body):
+        pipeline = self.server.pipeline
+        candidates = [int(movie_id) for movie_id in body.get("candidates", [])]
+        return {"results": pipeline.movies(pipeline.rerank(body["query"], candidates, top_k=len(candidates)))}
+
+    def _recommend(self, body):
+        pipeline = self.server.pipeline
+        response = pipeline.recommend(body["query"], top_k=int(body["top_k"]) if body.get("top_k") else None)
+        response["results"] = pipeline.movies(response["results"])
+        response["reranked"] = pipeline.movies(response["reranked"])
+        return response
+
+    def _similar(self, body):
+        pipeline = self.server.pipeline
+        movie_ids = pipeline.similar(body["movie_id"], k=int(body.get("k") or 10), filters=body.get("filters"))
+        return {"results": pipeline.movies(movie_ids)}
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def run_worker(server, share_metrics=False):
+    """
+    Serves requests from the shared listening socket in a worker process.
+
+    Args:
+        server (PipelineServer): Server created by the parent process.
+        share_metrics (bool, optional): Whether to write the latency histograms to the directory shared by the
+                                        workers, so that any of them serves the metrics of all. Defaults to False.
+    """
+    signal.signal(signal.SIGTERM, lambda *_: os._exit(0))
+    if share_metrics:
+        tracer.share_histograms(config.METRICS["multiprocess_dir"], config.METRICS["flush_interval"])
+    server.load_pipeline()
+    print(f"Worker {os.getpid()} serving on {server.server_address[0]}:{server.server_address[1]}")
+    server.serve_forever()
+
+def main():
+    """
+    Binds the socket once and forks worker processes that all accept from it.
+    """
+    parser = argparse.ArgumentParser(description="Run the recommendation pipeline as an HTTP service.")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes, each loads its own models")
+    parser.add_argument("--max-concurrent", type=int, default=4, help="Concurrent pipeline runs per worker")
+    parser.add_argument("--queue-timeout", type=float, default=30.0, help="Seconds a request may wait for a slot")
+    args = parser.parse_args()
+
+    server = PipelineServer((args.host, args.port), max_concurrent=args.max_concurrent, queue_timeout=args.queue_timeout)
+
+    if args.workers <= 1:
+        run_worker(server)
+        return
+
+    # Each worker records its own histograms, /metrics sums the files they write to a shared directory
+    os.makedirs(config.METRICS["multiprocess_dir"], exist_ok=True)
+    reset_shared_histograms(config.METRICS["multiprocess_dir"])
+
+    # Fork after binding so every worker accepts from the same socket, models load after the fork
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=run_worker, args=(server, True), daemon=True) for _ in range(args.workers)]
+    for worker in workers:
+        worker.start()
+
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        print("Shutting down workers...")
+    finally:
+        for worker in workers:
+            worker.terminate()
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
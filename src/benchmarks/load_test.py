@@ -0,0 +1,259 @@
+"""
+Replays a query log against the recommendation pipeline at a target rate and reports throughput and tail latency.
+Usage: python -m src.benchmarks.load_test --queries queries.jsonl --qps 5 --duration 60 --llm fake --synthetic 10000
+
+Requests are sent open-loop: request i is due at start + i / qps whatever happened to the previous ones, and its
+latency is measured from that due time, so queueing delay under overload shows up in the percentiles.
+"""
+
+import argparse
+import json
+import shutil
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from src.benchmarks.utils import latency_summary, write_results
+from src.core.tracing import tracer
+
+def read_query_log(path, field="query"):
+    """
+    Reads the queries to replay.
+
+    Args:
+        path (str): JSON lines file (one object per line) or plain text file (one query per line).
+        field (str, optional): Key holding the query in JSON lines. Defaults to "query"; the first string value is used if missing.
+
+    Returns:
+        list: The queries, in file order.
+    """
+    queries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                queries.append(line)
+                continue
+            if isinstance(record, dict):
+                query = record.get(field) or next((value for value in record.values() if isinstance(value, str)), None)
+            else:
+                query = str(record)
+            if query:
+                queries.append(query)
+    return queries
+
+def synthetic_startup(size, path):
+    """
+    Builds a synthetic catalog and startup stages that use it with the offline stand-in models.
+
+    Args:
+        size (int): Number of movies.
+        path (str): Directory receiving the catalog files.
+
+    Returns:
+        dict: Startup stages for StartupOrchestrator.
+    """
+    from src.benchmarks.synthetic_catalog import HashingEncoder, OverlapCrossEncoder, build_synthetic_catalog
+    from src.core.reranking import Reranker
+    from src.core.retrieval import HybridRetriever
+    from src.core.startup import STARTUP_STAGES
+    from src.database.catalog_snapshot import CatalogSnapshot
+    from src.database.db_manager import MovieDatabase
+    from src.database.vector_store import create_vector_store, load_vector_store
+
+    print(f"Building a synthetic catalog of {size} movies...")
+    movie_db, _, embedding_store = build_synthetic_catalog(size, path)
+    movie_db.close()
+    vector_store = create_vector_store(config.VECTOR_STORE, embedding_store.dim, path=f"{path}/vector_store")
+    vector_store.build(embedding_store.ids, embedding_store.embeddings)
+    vector_store.save()
+
+    def build_retriever(components):
+        return HybridRetriever(
+            vector_store=load_vector_store(f"{path}/vector_store"),
+            catalog=components["catalog"],
+            embedding_store=embedding_store,
+            keyword_backend=config.KEYWORD_BACKEND,
+            movie_db=MovieDatabase(f"{path}/movies.db", check_same_thread=False),
+            embedding_model=HashingEncoder(embedding_store.dim),
+        )
+
+    stages = dict(STARTUP_STAGES)
+    stages["snapshot"] = (lambda components: CatalogSnapshot.open(f"{path}/catalog.arrow"), [])
+    stages["retriever"] = (build_retriever, ["catalog"])
+    stages["reranker"] = (lambda components: Reranker(components["catalog"], model=OverlapCrossEncoder()), ["catalog"])
+    return stages
+
+def pipeline_target(pipeline, top_k):
+    """
+    Returns a function running one query through the pipeline in this process.
+
+    The function returns the per-stage durations of the query, read from its trace.
+    """
+    def run(query):
+        with tracer.span("load_test.request") as span:
+            pipeline.recommend(query, top_k=top_k)
+        stages = {}
+        for row in span.trace.waterfall():
+            if row["name"] != "load_test.request":
+                stages[row["name"]] = stages.get(row["name"], 0.0) + row["duration_ms"] / 1000
+        return stages
+    return run
+
+def http_target(url, top_k, timeout):
+    """
+    Returns a function sending one query to the HTTP service.
+    """
+    def run(query):
+        data = json.dumps({"query": query, "top_k": top_k}).encode("utf-8")
+        request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+        return {}
+    return run
+
+def replay(target, queries, qps, duration, concurrency):
+    """
+    Sends queries at a fixed rate, cycling through the log, and records every request.
+
+    Args:
+        target (callable): Function running one query and returning its per-stage durations.
+        queries (list): Queries to replay.
+        qps (float): Target requests per second.
+        duration (float): Seconds to keep sending requests.
+        concurrency (int): Maximum requests in flight.
+
+    Returns:
+        tuple: (records, elapsed seconds), one record per request with due, start and end times, stages and error.
+    """
+    records = []
+    lock = threading.Lock()
+
+    def send(query, due):
+        start = time.perf_counter()
+        record = {"due": due, "start": start, "stages": {}, "error": None}
+        try:
+            record["stages"] = target(query)
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+        record["end"] = time.perf_counter()
+        with lock:
+            records.append(record)
+
+    total = max(1, int(qps * duration))
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load")
+    started_at = time.perf_counter()
+    for i in range(total):
+        due = started_at + i / qps
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        executor.submit(send, queries[i % len(queries)], due)
+    executor.shutdown(wait=True)
+    return records, time.perf_counter() - started_at
+
+def summarize(records, elapsed, qps):
+    """
+    Builds the load test report.
+
+    Args:
+        records (list): Request records from `replay`.
+        elapsed (float): Seconds from the first request to the last response.
+        qps (float): Target requests per second.
+
+    Returns:
+        dict: Throughput, error rate, end-to-end latency, queueing delay and per-stage latencies.
+    """
+    succeeded = [r for r in records if r["error"] is None]
+    errors = [r["error"] for r in records if r["error"] is not None]
+
+    stage_latencies = {}
+    for record in succeeded:
+        for name, seconds in record["stages"].items():
+            stage_latencies.setdefault(name, []).append(seconds)
+
+    return {
+        "target_qps": qps,
+        "requests": len(records),
+        "succeeded": len(succeeded),
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:5],
+        "elapsed_seconds": elapsed,
+        "throughput_qps": len(succeeded) / elapsed if elapsed else 0.0,
+        # From the due time, includes the wait for a free worker
+        "latency": latency_summary([r["end"] - r["due"] for r in succeeded]),
+        "service_time": latency_summary([r["end"] - r["start"] for r in succeeded]),
+        "queue_delay": latency_summary([max(0.0, r["start"] - r["due"]) for r in records]),
+        "stages": {name: latency_summary(values) for name, values in sorted(stage_latencies.items())},
+    }
+
+def main():
+    """
+    Starts the pipeline (or targets a running service), replays the query log and writes a JSON report.
+    """
+    parser = argparse.ArgumentParser(description="Replay a query log against the recommendation pipeline at a target QPS.")
+    parser.add_argument("--queries", type=str, required=True, help="Query log: JSON lines with a 'query' field, or one query per line")
+    parser.add_argument("--field", type=str, default="query", help="JSON key holding the query")
+    parser.add_argument("--qps", type=float, default=1.0, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds to send requests for")
+    parser.add_argument("--concurrency", type=int, default=16, help="Maximum requests in flight")
+    parser.add_argument("--top-k", type=int, default=None, help="Movies per recommendation, defaults to the retrieval settings")
+    parser.add_argument("--llm", type=str, choices=["gemini", "fake"], default="fake", help="LLM provider of the in-process pipeline")
+    parser.add_argument("--llm-latency", type=float, default=None, help="Mean seconds per fake LLM call")
+    parser.add_argument("--synthetic", type=int, default=None, help="Run on a synthetic catalog of this size with offline models")
+    parser.add_argument("--url", type=str, default=None, help="Target a running service instead, e.g. http://127.0.0.1:8000/recommend")
+    parser.add_argument("--timeout", type=float, default=120.0, help="HTTP request timeout in seconds")
+    parser.add_argument("--output", type=str, default="data/benchmarks/load_test.json")
+    args = parser.parse_args()
+
+    queries = read_query_log(args.queries, args.field)
+    if not queries:
+        raise SystemExit(f"No queries found in {args.queries}.")
+
+    temporary_path = None
+    try:
+        if args.url:
+            target = http_target(args.url, args.top_k, args.timeout)
+        else:
+            from src.core.pipeline import RecommendationPipeline
+            from src.core.startup import STARTUP_STAGES, StartupOrchestrator
+
+            config.LLM_PROVIDER = args.llm
+            if args.llm_latency is not None:
+                config.FAKE_LLM = {**config.FAKE_LLM, "latency": args.llm_latency}
+
+            stages = STARTUP_STAGES
+            if args.synthetic:
+                temporary_path = tempfile.mkdtemp(prefix="load_test_")
+                stages = synthetic_startup(args.synthetic, temporary_path)
+
+            startup = StartupOrchestrator(stages).start()
+            # Start the clock once every component is loaded
+            for name in stages:
+                startup.get(name)
+            target = pipeline_target(RecommendationPipeline(startup), args.top_k)
+
+        print(f"Replaying {len(queries)} queries at {args.qps} QPS for {args.duration}s...")
+        records, elapsed = replay(target, queries, args.qps, args.duration, args.concurrency)
+    finally:
+        if temporary_path:
+            shutil.rmtree(temporary_path, ignore_errors=True)
+
+    report = summarize(records, elapsed, args.qps)
+    report["settings"] = {key: value for key, value in vars(args).items() if key != "output"}
+    print(f" -> {report['throughput_qps']:.2f} QPS, {report['errors']} errors, "
+          f"p50 {report['latency'].get('p50_ms', 0):.0f}ms, p99 {report['latency'].get('p99_ms', 0):.0f}ms")
+    for name, summary in report["stages"].items():
+        print(f"    {name}: p50 {summary['p50_ms']:.1f}ms, p99 {summary['p99_ms']:.1f}ms")
+
+    write_results(report, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Grid-searches the retrieval settings against labeled queries and writes the cheapest setting meeting a quality bar.
+Usage: python -m src.benchmarks.parameter_sweep --labels data/benchmarks/labeled_queries.jsonl --min-ndcg 0.6
+
+Labeled queries are JSON lines: {"query": str, "relevant_ids": [int], "features": {...} (optional), "hyde": str (optional)}.
+The HyDE text is used for retrieval and reranking when present, like in the app, otherwise the query itself.
+"""
+
+import argparse
+import json
+import math
+import platform
+import shutil
+import tempfile
+import time
+from itertools import product
+
+import config
+from src.benchmarks.retrieval_benchmark import git_revision, load_models
+from src.benchmarks.utils import latency_summary, write_results
+from src.core.catalog import Catalog
+from src.core.pipeline import combine_score
+from src.core.reranking import Reranker
+from src.core.retrieval import HybridRetriever
+from src.core.settings import save_retrieval_settings
+from src.database.catalog_snapshot import CatalogSnapshot
+from src.database.db_manager import MovieDatabase
+from src.database.embedding_store import EmbeddingStore
+from src.database.vector_store import VECTOR_STORES, create_vector_store
+
+def read_labeled_queries(path):
+    """
+    Reads labeled queries.
+
+    Args:
+        path (str): JSON lines file.
+
+    Returns:
+        list: Dictionaries with query, relevant_ids (as a set), features and hyde.
+    """
+    labeled = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                labeled.append({
+                    "query": record["query"],
+                    "relevant_ids": {int(movie_id) for movie_id in record["relevant_ids"]},
+                    "features": record.get("features"),
+                    "hyde": record.get("hyde") or record["query"],
+                })
+    return labeled
+
+def recall_at_k(ranked, relevant, k):
+    """Fraction of the relevant movies found in the first k results."""
+    return len(set(ranked[:k]) & relevant) / len(relevant) if relevant else 0.0
+
+def ndcg_at_k(ranked, relevant, k):
+    """Normalized discounted cumulative gain of the first k results with binary relevance."""
+    dcg = sum(1 / math.log2(rank + 2) for rank, movie_id in enumerate(ranked[:k]) if movie_id in relevant)
+    ideal = sum(1 / math.log2(rank + 2) for rank in range(min(len(relevant), k)))
+    return dcg / ideal if ideal else 0.0
+
+def pareto_frontier(points, quality_key, cost_key):
+    """
+    Keeps the points no other point beats on both quality and cost.
+
+    Args:
+        points (list): Result dictionaries.
+        quality_key (str): Key to maximize.
+        cost_key (str): Key to minimize.
+
+    Returns:
+        list: The frontier, cheapest first.
+    """
+    frontier, best_quality = [], -1.0
+    for point in sorted(points, key=lambda p: (p[cost_key], -p[quality_key])):
+        if point[quality_key] > best_quality:
+            frontier.append(point)
+            best_quality = point[quality_key]
+    return frontier
+
+def run_queries(retriever, reranker, labeled, depth):
+    """
+    Retrieves and reranks every labeled query once.
+
+    Args:
+        retriever (HybridRetriever): Retriever configured with the vector store and overfetch under test.
+        reranker (Reranker): Reranker.
+        labeled (list): Labeled queries.
+        depth (int): Retrieved candidates passed to the reranker.
+
+    Returns:
+        tuple: (per-query list of (movie id, cross-encoder score, rating), wall latencies, CPU seconds)
+    """
+    runs, latencies, cpu_times = [], [], []
+    for record in labeled:
+        start, cpu_start = time.perf_counter(), time.process_time()
+        candidates = retriever.hybrid_search(record["hyde"], top_k=depth, filters=record["features"])
+        # Keep the raw cross-encoder scores, so every rating weight is evaluated without reranking again
+        scored = reranker.score(record["hyde"], candidates)
+        latencies.append(time.perf_counter() - start)
+        cpu_times.append(time.process_time() - cpu_start)
+
+        runs.append([(candidate["id"], float(score), candidate["imdb_rating"] or 0) for candidate, score in scored])
+    return runs, latencies, cpu_times
+
+def evaluate(runs, labeled, rating_weight, top_k):
+    """
+    Ranks the reranked candidates with one rating weight and computes the quality metrics.
+
+    Returns:
+        dict: Mean recall@k and nDCG@k.
+    """
+    recalls, ndcgs = [], []
+    for scored, record in zip(runs, labeled):
+        ranked = [movie_id for movie_id, score, rating in
+                  sorted(scored, key=lambda x: combine_score(x[1], x[2], weight=rating_weight), reverse=True)]
+        recalls.append(recall_at_k(ranked, record["relevant_ids"], top_k))
+        ndcgs.append(ndcg_at_k(ranked, record["relevant_ids"], top_k))
+    return {"recall": sum(recalls) / len(recalls), "ndcg": sum(ndcgs) / len(ndcgs)}
+
+def choose(points, min_recall, min_ndcg):
+    """
+    Picks the cheapest setting meeting the quality bar, or the best quality if none does.
+
+    Returns:
+        dict: The chosen point.
+    """
+    passing = [p for p in points if p["recall"] >= min_recall and p["ndcg"] >= min_ndcg]
+    if passing:
+        return min(passing, key=lambda p: (p["p95_ms"], p["cpu_ms"]))
+    print(f"No setting reaches recall@k >= {min_recall} and nDCG@k >= {min_ndcg}, choosing the best nDCG.")
+    return max(points, key=lambda p: (p["ndcg"], -p["p95_ms"]))
+
+def main():
+    """
+    Runs the grid search, prints the Pareto frontier and writes the report and the chosen settings.
+    """
+    parser = argparse.ArgumentParser(description="Tune the retrieval settings on labeled queries.")
+    parser.add_argument("--labels", type=str, required=True, help="Labeled queries (JSON lines)")
+    parser.add_argument("--backends", nargs="+", choices=list(VECTOR_STORES), default=["faiss", "hnsw"])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[16, 32, 64, 128], help="hnsw candidate list sizes")
+    parser.add_argument("--overfetch", type=int, nargs="+", default=[2, 5, 10])
+    parser.add_argument("--rerank-depth", type=int, nargs="+", default=[10, 20, 50])
+    parser.add_argument("--rating-weight", type=float, nargs="+", default=[0.0, 0.05, 0.1, 0.2])
+    parser.add_argument("--top-k", type=int, nargs="+", default=[5, 10])
+    parser.add_argument("--min-recall", type=float, default=0.0, help="Quality bar on mean recall@k")
+    parser.add_argument("--min-ndcg", type=float, default=0.0, help="Quality bar on mean nDCG@k")
+    parser.add_argument("--models", type=str, choices=["fake", "local"], default="local",
+                        help="local: the configured models from the local cache, fake: deterministic stand-ins")
+    parser.add_argument("--embeddings", type=str, default="data/processed/embeddings")
+    parser.add_argument("--output", type=str, default="data/benchmarks/parameter_sweep.json")
+    parser.add_argument("--settings-output", type=str, default=config.RETRIEVAL_SETTINGS_PATH,
+                        help="Where the chosen settings are written, the app loads them from config.RETRIEVAL_SETTINGS_PATH")
+    args = parser.parse_args()
+
+    labeled = read_labeled_queries(args.labels)
+    embedding_store = EmbeddingStore.open(args.embeddings)
+    catalog = Catalog.from_snapshot(CatalogSnapshot.open())
+    movie_db = MovieDatabase(check_same_thread=False)
+    encoder, cross_encoder = load_models(args.models, embedding_store.dim)
+    reranker = Reranker(catalog, model=cross_encoder)
+
+    points = []
+    for backend in args.backends:
+        path = tempfile.mkdtemp(prefix=f"parameter_sweep_{backend}_")
+        try:
+            print(f"Building the {backend} index...")
+            vector_store = create_vector_store(backend, embedding_store.dim, path=path)
+            vector_store.build(embedding_store.ids, embedding_store.embeddings)
+            retriever = HybridRetriever(vector_store, catalog, embedding_store, keyword_backend=config.KEYWORD_BACKEND,
+                                        movie_db=movie_db, embedding_model=encoder)
+
+            # Only query-time parameters are swept, build parameters would need one index per value
+            store_params = [{"ef_search": ef} for ef in args.ef_search] if backend == "hnsw" else [{}]
+            for params, overfetch, depth in product(store_params, args.overfetch, args.rerank_depth):
+                for name, value in params.items():
+                    setattr(vector_store, name, value)
+                retriever.overfetch = overfetch
+
+                # Warm up once, then time every labeled query
+                run_queries(retriever, reranker, labeled[:1], depth)
+                runs, latencies, cpu_times = run_queries(retriever, reranker, labeled, depth)
+                latency = latency_summary(latencies)
+
+                for rating_weight, top_k in product(args.rating_weight, args.top_k):
+                    if top_k > depth:
+                        continue
+                    points.append({
+                        "settings": {
+                            "top_k": top_k,
+                            "overfetch": overfetch,
+                            "rerank_depth": depth,
+                            "rating_weight": rating_weight,
+                            "vector_store": backend,
+                            "vector_store_params": params,
+                        },
+                        **evaluate(runs, labeled, rating_weight, top_k),
+                        "p50_ms": latency["p50_ms"],
+                        "p95_ms": latency["p95_ms"],
+                        "cpu_ms": 1000 * sum(cpu_times) / len(cpu_times),
+                    })
+                print(f" -> {backend} {params} overfetch={overfetch} depth={depth}: p95 {latency['p95_ms']:.1f}ms")
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+    frontier = pareto_frontier(points, "ndcg", "p95_ms")
+    chosen = choose(points, args.min_recall, args.min_ndcg)
+
+    print("Pareto frontier (nDCG@k vs p95 latency):")
+    for point in frontier:
+        print(f"    nDCG {point['ndcg']:.3f}, recall {point['recall']:.3f}, p95 {point['p95_ms']:.1f}ms, "
+              f"CPU {point['cpu_ms']:.1f}ms: {point['settings']}")
+    print(f"Chosen: {chosen['settings']}")
+
+    write_results({
+        "revision": git_revision(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": platform.platform(),
+        "labeled_queries": len(labeled),
+        "quality_bar": {"recall": args.min_recall, "ndcg": args.min_ndcg},
+        "chosen": chosen,
+        "frontier": frontier,
+        "points": points,
+    }, args.output)
+    save_retrieval_settings(chosen["settings"], args.settings_output)
+    movie_db.close()
+
+if __name__ == "__main__":
+    main()
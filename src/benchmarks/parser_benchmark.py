@@ -0,0 +1,216 @@
+"""
+Measures how many title pages per second each extraction path parses and checks that the paths agree.
+Usage: python -m src.benchmarks.parser_benchmark --limit 500
+       python -m src.benchmarks.parser_benchmark --synthetic 200
+
+Pages are read from the page store, or rendered from a synthetic catalog in the layout of IMDb title pages.
+Paths compared:
+    - structured: embedded JSON-LD and Next.js data only
+    - strained: HTML parse restricted to the needed elements
+    - extract: structured data completed by the strained parse, as used by the scraper
+    - full: full BeautifulSoup tree, as the scraper used to parse pages
+"""
+
+import argparse
+import html
+import json
+import platform
+import time
+import zlib
+
+from bs4 import BeautifulSoup
+
+import config
+from src.benchmarks.retrieval_benchmark import git_revision
+from src.benchmarks.utils import write_results
+from src.database.page_store import PageStore
+from src.scraping.utils.extraction import FALLBACK_PARSER, is_missing, extract_movie, strained_movie, structured_movie
+
+# Fields compared between the structured and strained paths
+CHECKED_FIELDS = ["title", "year", "imdb_rating", "pg_rating", "plot", "directors", "stars", "genres"]
+
+def render_title_page(movie, movie_id, filler=200):
+    """
+    Renders a movie as a page with the embedded data and elements of an IMDb title page.
+
+    Args:
+        movie (dict): Movie fields, as produced by `generate_movies`.
+        movie_id (str): IMDb id of the page.
+        filler (int, optional): Unrelated blocks added to reach a realistic page size. Defaults to 200.
+
+    Returns:
+        bytes: The page.
+    """
+    genres = [genre for genre in movie["genres"].split(", ") if genre]
+    stars = [star for star in movie["stars"].split(", ") if star]
+    directors = [director for director in movie["directors"].split(", ") if director]
+    votes = int(movie["votes"].replace(",", ""))
+    minutes = int(movie["length"].split()[0])
+
+    json_ld = {
+        "@context": "https://schema.org", "@type": "Movie", "url": f"/title/{movie_id}/", "name": movie["title"],
+        "description": movie["plot"], "genre": genres, "contentRating": movie["pg_rating"],
+        "datePublished": f"{movie['year']}-01-01", "duration": f"PT{minutes // 60}H{minutes % 60}M",
+        "aggregateRating": {"@type": "AggregateRating", "ratingValue": float(movie["imdb_rating"]), "ratingCount": votes},
+        "director": [{"@type": "Person", "name": name} for name in directors],
+        "actor": [{"@type": "Person", "name": name} for name in stars],
+    }
+    page_props = {
+        "tconst": movie_id,
+        "aboveTheFoldData": {
+            "titleText": {"text": movie["title"]},
+            "releaseYear": {"year": int(movie["year"])},
+            "ratingsSummary": {"aggregateRating": float(movie["imdb_rating"]), "voteCount": votes},
+            "certificate": {"rating": movie["pg_rating"]},
+            "runtime": {"seconds": minutes * 60},
+            "plot": {"plotText": {"plainText": movie["plot"]}},
+            "genres": {"genres": [{"text": genre, "id": genre} for genre in genres]},
+            "metacritic": {"metascore": {"score": int(movie["metascore"])}},
+            "principalCredits": [
+                {"category": {"id": "director", "text": "Director"},
+                 "credits": [{"name": {"nameText": {"text": name}}} for name in directors]},
+                {"category": {"id": "cast", "text": "Stars"},
+                 "credits": [{"name": {"nameText": {"text": name}}} for name in stars]},
+            ],
+        },
+        "mainColumnData": {"trivia": [{"text": "Filler " * 20} for _ in range(filler // 10)]},
+    }
+
+    def links(names):
+        return "".join(f'<li><a href="/name/nm{zlib.crc32(name.encode()) % 10**7:07d}/">{html.escape(name)}</a></li>' for name in names)
+
+    body = (
+        f'<h1 data-testid="hero__pageTitle"><span data-testid="hero__primary-text">{html.escape(movie["title"])}</span></h1>'
+        f'<div data-testid="hero-rating-bar__aggregate-rating"><div>IMDb RATING</div><a href="/title/{movie_id}/ratings/">'
+        f'<span><div><div data-testid="hero-rating-bar__aggregate-rating__score"><span>{movie["imdb_rating"]}</span>'
+        f'<span>/10</span></div><div>{movie["votes"]}</div></div></span></a></div>'
+        f'<div data-testid="interests">{"".join(f"<a><span class=ipc-chip__text>{g}</span></a>" for g in genres)}</div>'
+        f'<p><span data-testid="plot-xl">{html.escape(movie["plot"])}</span></p>'
+        f'<ul><li data-testid="title-pc-principal-credit"><span>Director</span><ul>{links(directors)}</ul></li>'
+        f'<li data-testid="title-pc-principal-credit"><a>Stars</a><ul>{links(stars)}</ul></li></ul>'
+        f'<li data-testid="title-details-releasedate"><span>Release date</span><a>January 1, {movie["year"]}</a></li>'
+        f'<li data-testid="storyline-certificate"><span>Certificate</span><span>{movie["pg_rating"]}</span></li>'
+        f'<li data-testid="title-techspec_runtime"><span>Runtime</span><div>{minutes // 60}<!-- -->h<!-- --> <!-- -->{minutes % 60}<!-- -->m</div></li>'
+    )
+    filler_html = "".join(
+        f'<div class="ipc-shoveler sc-{i:x}"><a href="/title/tt{i:07d}/"><img alt="Related {i}" src="x.jpg"/></a>'
+        f'<span class="ipc-rating-star">7.{i % 10}</span><p>Lorem ipsum dolor sit amet {i}.</p></div>'
+        for i in range(filler)
+    )
+    return (
+        f'<!DOCTYPE html><html><head><title>{html.escape(movie["title"])} - IMDb</title>'
+        f'<script type="application/ld+json">{json.dumps(json_ld)}</script></head>'
+        f'<body><main>{body}{filler_html}</main>'
+        f'<script id="__NEXT_DATA__" type="application/json">{json.dumps({"props": {"pageProps": page_props}})}</script>'
+        f'</body></html>'
+    ).encode("utf-8")
+
+def load_pages(args):
+    """
+    Reads the title pages to parse.
+
+    Returns:
+        list: (url, raw page) tuples.
+    """
+    if args.synthetic:
+        from src.benchmarks.synthetic_catalog import generate_movies
+        return [(movie["link"], render_title_page(movie, movie["link"].rstrip("/").rsplit("/", 1)[-1]))
+                for movie, _ in generate_movies(args.synthetic)]
+
+    store = PageStore(args.store, codec=config.PAGE_STORE["codec"])
+    pages = []
+    for url, data in store.iter_pages(f"{config.IMDB_BASE_URL}/title/"):
+        # Title pages only, the plot summary pages have a different layout
+        if not url.endswith("/plotsummary/"):
+            pages.append((url, data))
+            if len(pages) >= args.limit:
+                break
+    store.close()
+    return pages
+
+def full_parse(data):
+    """Builds the full tree of a page, the cost the scraper used to pay for every page."""
+    soup = BeautifulSoup(data, "html.parser")
+    return soup.find("span", {"data-testid": "hero__primary-text"})
+
+def time_path(function, pages, repeat):
+    """
+    Parses every page with one extraction path.
+
+    Returns:
+        tuple: (pages per second of the best run, results of the last run)
+    """
+    best, results = None, []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [function(data) for _, data in pages]
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return len(pages) / best if best else 0.0, results
+
+def compare(pages, structured, strained):
+    """
+    Counts the fields each path found and the fields where both found different values.
+
+    Returns:
+        dict: Per-field coverage of both paths, mismatch counts and a few mismatch samples.
+    """
+    report = {"coverage": {}, "mismatches": {}, "samples": []}
+    for field in CHECKED_FIELDS:
+        report["coverage"][field] = {
+            "structured": sum(not is_missing(details[field]) for details in structured) / len(pages),
+            "strained": sum(not is_missing(details[field]) for details in strained) / len(pages),
+        }
+        mismatches = 0
+        for (url, _), first, second in zip(pages, structured, strained):
+            if not is_missing(first[field]) and not is_missing(second[field]) and str(first[field]) != str(second[field]):
+                mismatches += 1
+                if len(report["samples"]) < 10:
+                    report["samples"].append({"url": url, "field": field, "structured": first[field], "strained": second[field]})
+        report["mismatches"][field] = mismatches
+    return report
+
+def main():
+    """
+    Times every extraction path on the same pages and writes a JSON report.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the extraction of IMDb title pages.")
+    parser.add_argument("--store", type=str, default=config.PAGE_STORE["path"], help="Page store to read title pages from")
+    parser.add_argument("--limit", type=int, default=500, help="Maximum number of stored pages")
+    parser.add_argument("--synthetic", type=int, default=None, help="Render this many synthetic pages instead")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per path, the best one is reported")
+    parser.add_argument("--output", type=str, default="data/benchmarks/parser.json")
+    args = parser.parse_args()
+
+    pages = load_pages(args)
+    if not pages:
+        raise SystemExit("No title pages found, scrape some pages first or use --synthetic.")
+    print(f"Parsing {len(pages)} pages ({sum(len(data) for _, data in pages) / len(pages) / 1024:.0f} KiB on average), "
+          f"fallback parser: {FALLBACK_PARSER}")
+
+    results = {}
+    outputs = {}
+    paths = {"structured": structured_movie, "strained": strained_movie, "extract": extract_movie, "full": full_parse}
+    for name, function in paths.items():
+        pages_per_second, outputs[name] = time_path(function, pages, args.repeat)
+        results[name] = {"pages_per_second": pages_per_second}
+        print(f" -> {name}: {pages_per_second:.1f} pages/s")
+
+    agreement = compare(pages, outputs["structured"], outputs["strained"])
+    for field, count in agreement["mismatches"].items():
+        if count:
+            print(f"    {field}: structured and strained values differ on {count} pages")
+
+    write_results({
+        "revision": git_revision(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": platform.platform(),
+        "pages": len(pages),
+        "source": "synthetic" if args.synthetic else args.store,
+        "fallback_parser": FALLBACK_PARSER,
+        "paths": results,
+        "agreement": agreement,
+    }, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Measures retrieval and reranking as the catalog grows, on synthetic catalogs and offline models.
+Usage: python -m src.benchmarks.retrieval_benchmark --sizes 1000 10000 100000 --queries 200
+"""
+
+import argparse
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+import numpy as np
+
+import config
+from src.benchmarks.synthetic_catalog import GENRE_WEIGHTS, PLOT_OBJECTS, PLOT_SETTINGS, HashingEncoder, OverlapCrossEncoder, build_synthetic_catalog
+from src.benchmarks.utils import current_rss_bytes, directory_size_bytes, latency_summary, measure, write_results
+from src.core.catalog import Catalog
+from src.core.pipeline import combine_score
+from src.core.reranking import Reranker
+from src.core.retrieval import HybridRetriever
+from src.database.vector_store import VECTOR_STORES, create_vector_store
+
+def git_revision():
+    """Returns the current git commit, so reports of different versions can be compared."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def synthetic_queries(count, seed=0):
+    """
+    Generates HyDE-like queries and extracted features from the synthetic vocabulary.
+
+    Args:
+        count (int): Number of queries.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        list: (query text, features) tuples.
+    """
+    rng = np.random.default_rng(seed)
+    genres = list(GENRE_WEIGHTS)
+    queries = []
+    for _ in range(count):
+        liked, disliked = rng.choice(genres, size=2, replace=False)
+        text = f"A {liked.lower()} movie about {rng.choice(PLOT_OBJECTS)} {rng.choice(PLOT_SETTINGS)}."
+        queries.append((text, {"liked_genres": [str(liked)], "disliked_genres": [str(disliked)]}))
+    return queries
+
+def load_models(models, dim):
+    """
+    Returns the query encoder and the cross-encoder.
+
+    Args:
+        models (str): "fake" for the deterministic stand-ins, "local" for the configured models from the local cache.
+        dim (int): Embedding dimension of the catalog.
+
+    Returns:
+        tuple: (encoder, cross_encoder)
+    """
+    if models == "fake":
+        return HashingEncoder(dim), OverlapCrossEncoder()
+
+    # Only use models already downloaded to the local cache
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    from sentence_transformers import CrossEncoder, SentenceTransformer
+    return SentenceTransformer(config.EMBEDDING_MODEL, device="cpu"), CrossEncoder(config.RERANKER_MODEL, device="cpu")
+
+def time_queries(function, queries):
+    """Runs a function once per query and returns the latency summary."""
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        function(query)
+        latencies.append(time.perf_counter() - start)
+    return latency_summary(latencies)
+
+def benchmark_size(size, args, encoder, cross_encoder, queries):
+    """
+    Builds a synthetic catalog of one size and measures every retrieval path.
+
+    Args:
+        size (int): Number of movies.
+        args (argparse.Namespace): Command line arguments.
+        encoder: Query encoder.
+        cross_encoder: Reranking model.
+        queries (list): (query text, features) tuples.
+
+    Returns:
+        dict: Build times, index memory and disk sizes, and latency summaries per path.
+    """
+    path = tempfile.mkdtemp(prefix=f"retrieval_benchmark_{size}_")
+    try:
+        (movie_db, snapshot, embedding_store), catalog_seconds, _ = measure(
+            build_synthetic_catalog, size, path, dim=args.dim, seed=args.seed, fixture_path=args.fixture)
+        catalog = Catalog.from_snapshot(snapshot)
+
+        vector_store = create_vector_store(args.vector_store, embedding_store.dim, path=f"{path}/vector_store")
+        _, vector_store_seconds, vector_store_rss = measure(vector_store.build, embedding_store.ids, embedding_store.embeddings)
+        vector_store.save()
+
+        retriever, retriever_seconds, retriever_rss = measure(
+            HybridRetriever, vector_store, catalog, embedding_store, keyword_backend=args.keyword_backend,
+            movie_db=movie_db, embedding_model=encoder)
+        reranker = Reranker(catalog, model=cross_encoder)
+
+        top_k = args.top_k
+        texts = [text for text, _ in queries]
+        # Warm up caches and lazy initialization before timing
+        retriever.hybrid_search(texts[0], top_k=top_k)
+
+        candidates = {text: retriever.hybrid_search(text, top_k=args.rerank_depth) for text in texts}
+
+        result = {
+            "build": {
+                "catalog_seconds": catalog_seconds,
+                "vector_store_seconds": vector_store_seconds,
+                "retriever_seconds": retriever_seconds,
+            },
+            "memory": {
+                "vector_store_rss_delta_mb": vector_store_rss / 2**20,
+                "retriever_rss_delta_mb": retriever_rss / 2**20,
+                "process_rss_mb": current_rss_bytes() / 2**20,
+            },
+            "disk_mb": {
+                "database": directory_size_bytes(f"{path}/movies.db") / 2**20,
+                "snapshot": directory_size_bytes(f"{path}/catalog.arrow") / 2**20,
+                "embeddings": directory_size_bytes(f"{path}/embeddings") / 2**20,
+                "vector_store": directory_size_bytes(f"{path}/vector_store") / 2**20,
+            },
+            "latency": {
+                "semantic": time_queries(lambda text: retriever.semantic_search(text, top_k=top_k), texts),
+                "keyword": time_queries(lambda text: retriever.keyword_search_bm25(text, top_k=top_k), texts),
+                "filter": time_queries(lambda q: movie_db.filter_movie_ids(q[1]), queries),
+                "filtered_hybrid": time_queries(lambda q: retriever.hybrid_search(q[0], top_k=top_k, filters=q[1]), queries),
+                "rerank": time_queries(lambda text: reranker.rerank(text, candidates[text], combine_score=combine_score), texts),
+            },
+        }
+        movie_db.close()
+        return result
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+def main():
+    """
+    Runs the benchmark for every catalog size and writes a JSON report.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark hybrid retrieval and reranking on synthetic catalogs.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Catalog sizes, e.g. 1000 10000 100000 1000000")
+    parser.add_argument("--queries", type=int, default=200, help="Number of timed queries per path")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--rerank-depth", type=int, default=50, help="Candidates passed to the reranker")
+    parser.add_argument("--vector-store", type=str, choices=list(VECTOR_STORES), default=config.VECTOR_STORE)
+    parser.add_argument("--keyword-backend", type=str, choices=["bm25", "fts"], default=config.KEYWORD_BACKEND)
+    parser.add_argument("--models", type=str, choices=["fake", "local"], default="fake",
+                        help="fake: deterministic stand-ins, local: the configured models from the local cache")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension of random embeddings")
+    parser.add_argument("--fixture", type=str, default=None, help="Embedding store to sample catalog embeddings from")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=str, default="data/benchmarks/retrieval.json")
+    args = parser.parse_args()
+
+    encoder, cross_encoder = load_models(args.models, args.dim)
+    queries = synthetic_queries(args.queries)
+
+    report = {
+        "revision": git_revision(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": platform.platform(),
+        "settings": {key: value for key, value in vars(args).items() if key not in ("output", "sizes")},
+        "sizes": {},
+    }
+
+    for size in args.sizes:
+        print(f"Benchmarking a catalog of {size} movies...")
+        result = benchmark_size(size, args, encoder, cross_encoder, queries)
+        report["sizes"][str(size)] = result
+        latency = result["latency"]
+        print(" -> " + ", ".join(f"{path} p50 {summary['p50_ms']:.2f}ms / p99 {summary['p99_ms']:.2f}ms"
+                                  for path, summary in latency.items()))
+
+    write_results(report, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Generates synthetic movie catalogs for offline benchmarks.
+Usage: python -m src.benchmarks.synthetic_catalog --size 10000 --output data/benchmarks/catalog_10k
+"""
+
+import argparse
+import os
+import re
+import zlib
+import numpy as np
+
+from src.database.catalog_snapshot import CatalogSnapshot
+from src.database.db_manager import MovieDatabase
+from src.database.embedding_store import EmbeddingStore
+
+# IMDb genres with their approximate share of the catalog
+GENRE_WEIGHTS = {
+    "Drama": 0.30, "Comedy": 0.16, "Thriller": 0.07, "Action": 0.07, "Romance": 0.06, "Horror": 0.05,
+    "Crime": 0.05, "Adventure": 0.04, "Mystery": 0.03, "Documentary": 0.03, "Family": 0.02, "Fantasy": 0.02,
+    "Sci-Fi": 0.02, "Animation": 0.02, "Biography": 0.015, "History": 0.01, "War": 0.01, "Music": 0.01,
+    "Western": 0.005, "Sport": 0.005, "Musical": 0.005,
+}
+
+FIRST_NAMES = [
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "David", "Elizabeth", "William",
+    "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Carlos", "Sofia", "Hiroshi", "Yuki",
+    "Amelie", "Lucas", "Ingrid", "Pedro", "Aisha", "Omar", "Chen", "Mei", "Olga", "Ivan", "Priya", "Arjun",
+]
+
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Wilson", "Anderson", "Taylor", "Moore", "Jackson", "Martin", "Lee", "Thompson",
+    "White", "Harris", "Clark", "Lewis", "Tanaka", "Dubois", "Rossi", "Muller", "Kowalski", "Petrov", "Kim",
+    "Nguyen", "Singh", "Okafor", "Larsen", "Silva", "Cohen", "Novak", "Haddad", "Sato",
+]
+
+PLOT_SUBJECTS = [
+    "a detective", "a young woman", "an astronaut", "a retired soldier", "two brothers", "a small-town teacher",
+    "a hacker", "a family", "a struggling musician", "a ghost", "a journalist", "a con artist", "a scientist",
+    "a boxer", "a runaway teenager", "a widowed farmer", "a spy", "a chef", "a group of friends", "a king",
+]
+
+PLOT_ACTIONS = [
+    "uncovers", "fights", "escapes", "falls in love with", "hunts", "protects", "betrays", "searches for",
+    "investigates", "survives", "challenges", "rebuilds", "confronts", "rescues", "plans a heist against",
+]
+
+PLOT_OBJECTS = [
+    "a corrupt mayor", "an ancient curse", "a serial killer", "a rival gang", "a hidden treasure", "a lost love",
+    "an alien invasion", "a deadly virus", "the family business", "a haunted house", "a powerful corporation",
+    "a broken marriage", "a secret society", "a missing child", "a natural disaster", "an old friend",
+]
+
+PLOT_SETTINGS = [
+    "in 1920s Paris", "in a dystopian future", "during World War II", "in a remote village", "in New York",
+    "on a distant planet", "in Victorian London", "in the Wild West", "in modern Tokyo", "on a cruise ship",
+    "in a prison", "in the Amazon jungle", "in a high school", "in the Arctic", "in medieval Europe",
+]
+
+TITLE_WORDS = ["Rising", "Forever", "Protocol", "Road", "Night", "Legacy", "Code", "Storm", "Falls", "Returns"]
+
+PG_RATINGS = ["G", "PG", "PG-13", "R", "NC-17", "Not Rated"]
+
+class HashingEncoder:
+    """
+    Deterministic offline stand-in for the SentenceTransformer query encoder.
+
+    A text is embedded as the sum of one pseudo-random vector per lowercase token, seeded by the token hash,
+    so texts sharing words land close to each other. Catalog embeddings are built from the same token vectors.
+    """
+    def __init__(self, dim=384):
+        """
+        Initializes the HashingEncoder.
+
+        Args:
+            dim (int, optional): Embedding dimension. Defaults to 384 (all-MiniLM-L6-v2).
+        """
+        self.dim = dim
+        self._token_vectors = {}
+
+    def token_vector(self, token):
+        """Returns the pseudo-random vector of a token."""
+        vector = self._token_vectors.get(token)
+        if vector is None:
+            rng = np.random.default_rng(zlib.crc32(token.encode("utf-8")))
+            vector = self._token_vectors[token] = rng.standard_normal(self.dim).astype(np.float32)
+        return vector
+
+    def encode(self, sentences, normalize_embeddings=False, **kwargs):
+        """
+        Embeds one text or a list of texts, mirroring SentenceTransformer.encode.
+
+        Args:
+            sentences (str or list): Text(s) to embed.
+            normalize_embeddings (bool, optional): Whether to L2-normalize the embeddings. Defaults to False.
+
+        Returns:
+            np.ndarray: One vector for a single text, a (n, dim) matrix for a list.
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else sentences
+
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in re.findall(r"\w+", text.lower()):
+                embeddings[row] += self.token_vector(token)
+        if normalize_embeddings:
+            embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        return embeddings[0] if single else embeddings
+
+class OverlapCrossEncoder:
+    """
+    Deterministic offline stand-in for the CrossEncoder reranker, scoring pairs by shared tokens.
+    """
+    def predict(self, pairs, **kwargs):
+        """
+        Scores (query, text) pairs, mirroring CrossEncoder.predict.
+
+        Args:
+            pairs (list): (query, text) tuples.
+
+        Returns:
+            np.ndarray: One score per pair.
+        """
+        scores = []
+        for query, text in pairs:
+            query_tokens = set(re.findall(r"\w+", query.lower()))
+            text_tokens = set(re.findall(r"\w+", text.lower()))
+            scores.append(len(query_tokens & text_tokens) / np.sqrt(len(text_tokens) + 1))
+        return np.asarray(scores, dtype=np.float32)
+
+def _names(rng, count):
+    """Generates `count` distinct person names."""
+    names = set()
+    while len(names) < count:
+        first = rng.choice(FIRST_NAMES, size=count)
+        last = rng.choice(LAST_NAMES, size=count)
+        suffix = rng.integers(0, max(1, count // 1000) + 1, size=count)
+        names.update(f"{f} {l}" + (f" {s}" if s else "") for f, l, s in zip(first, last, suffix))
+    return sorted(names)[:count]
+
+def _zipf_choice(rng, population, size):
+    """Samples from a population with Zipf-like popularity, a few names appear in many movies."""
+    weights = 1.0 / np.arange(1, len(population) + 1) ** 0.8
+    return rng.choice(len(population), size=size, p=weights / weights.sum())
+
+def generate_movies(size, seed=42):
+    """
+    Generates synthetic movies with realistic genre, star, director, year and rating distributions.
+
+    Args:
+        size (int): Number of movies.
+        seed (int, optional): Random seed. Defaults to 42.
+
+    Yields:
+        tuple: (movie, generated_summary), the movie dictionary has the scraper columns.
+    """
+    rng = np.random.default_rng(seed)
+    genres = list(GENRE_WEIGHTS)
+    genre_p = np.array(list(GENRE_WEIGHTS.values()))
+    genre_p /= genre_p.sum()
+
+    stars = _names(rng, max(10, size // 4))
+    directors = _names(rng, max(5, size // 15))
+
+    # Releases grow over time: most movies are recent, with a long tail back to the 1920s
+    years = np.clip(2025 - rng.exponential(18, size=size).astype(int), 1920, 2024)
+    ratings = np.clip(rng.normal(6.4, 1.1, size=size), 1.0, 9.8).round(1)
+    genre_counts = rng.choice([1, 2, 3], size=size, p=[0.3, 0.45, 0.25])
+    genre_rows = rng.choice(len(genres), size=(size, 3), p=genre_p)
+    star_rows = _zipf_choice(rng, stars, size * 3).reshape(size, 3)
+    director_rows = _zipf_choice(rng, directors, size)
+
+    # Draw every categorical column at once, per-row sampling dominates the generation time of large catalogs
+    subjects = rng.choice(PLOT_SUBJECTS, size=size)
+    actions = rng.choice(PLOT_ACTIONS, size=size)
+    objects = rng.choice(PLOT_OBJECTS, size=size)
+    settings = rng.choice(PLOT_SETTINGS, size=size)
+    title_names = rng.choice(LAST_NAMES, size=size)
+    title_words = rng.choice(TITLE_WORDS, size=size)
+    pg_ratings = rng.choice(PG_RATINGS, size=size)
+    metascores = np.clip(ratings * 10 + rng.normal(0, 8, size=size), 1, 100).astype(int)
+    votes = rng.lognormal(8, 2, size=size).astype(int)
+    lengths = rng.normal(105, 20, size=size).astype(int)
+
+    for i in range(size):
+        movie_genres = list(dict.fromkeys(genres[j] for j in genre_rows[i, :genre_counts[i]]))
+        movie_stars = list(dict.fromkeys(stars[j] for j in star_rows[i]))
+        plot = f"{subjects[i].capitalize()} {actions[i]} {objects[i]} {settings[i]}."
+        movie = {
+            "title": f"{title_names[i]} {title_words[i]} {i}",
+            "year": str(years[i]),
+            "imdb_rating": str(ratings[i]),
+            "metascore": str(metascores[i]),
+            "pg_rating": str(pg_ratings[i]),
+            "votes": f"{votes[i]:,}",
+            "length": f"{lengths[i]} min",
+            "plot": plot,
+            "summary": plot,
+            "synopsis": None,
+            "directors": directors[director_rows[i]],
+            "stars": ", ".join(movie_stars),
+            "genres": ", ".join(movie_genres),
+            "review_title": None,
+            "review_rating": None,
+            "review_text": None,
+            "link": f"https://www.imdb.com/title/tt{i + 1:08d}/",
+        }
+        summary = f"{plot} A {' and '.join(movie_genres).lower()} movie directed by {movie['directors']}, starring {movie['stars']}."
+        yield movie, summary
+
+def synthetic_embeddings(encoder, genres, size, noise=0.5, seed=42, fixture=None):
+    """
+    Builds catalog embeddings without running a model.
+
+    Random mode places every movie near the sum of its genre token vectors plus Gaussian noise, so genre
+    queries find genre neighbours. Fixture mode samples rows of an existing embedding store instead.
+
+    Args:
+        encoder (HashingEncoder): Encoder providing the genre token vectors.
+        genres (list): Genre string of every movie, e.g. "Drama, Romance".
+        size (int): Number of movies.
+        noise (float, optional): Standard deviation of the noise relative to the genre signal. Defaults to 0.5.
+        seed (int, optional): Random seed. Defaults to 42.
+        fixture (EmbeddingStore, optional): Real embeddings to sample from. Defaults to None (random mode).
+
+    Returns:
+        np.ndarray: L2-normalized float32 matrix of shape (size, dim).
+    """
+    rng = np.random.default_rng(seed)
+    if fixture is not None:
+        rows = np.sort(rng.integers(0, len(fixture), size=size))
+        embeddings = np.asarray(fixture.embeddings[rows], dtype=np.float32)
+        embeddings += rng.standard_normal(embeddings.shape, dtype=np.float32) * (noise / np.sqrt(fixture.dim))
+    else:
+        centroids = {}
+        for genre_list in set(genres):
+            centroids[genre_list] = encoder.encode(genre_list, normalize_embeddings=True)
+        embeddings = rng.standard_normal((size, encoder.dim), dtype=np.float32) * (noise / np.sqrt(encoder.dim))
+        for row, genre_list in enumerate(genres):
+            embeddings[row] += centroids[genre_list]
+
+    embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+    return embeddings
+
+def build_synthetic_catalog(size, path, dim=384, seed=42, fixture_path=None, batch_size=10000):
+    """
+    Writes a synthetic movie database, catalog snapshot and embedding store under one directory.
+
+    Args:
+        size (int): Number of movies.
+        path (str): Output directory, receives movies.db, catalog.arrow and embeddings/.
+        dim (int, optional): Embedding dimension in random mode. Defaults to 384.
+        seed (int, optional): Random seed. Defaults to 42.
+        fixture_path (str, optional): Embedding store sampled for the embeddings. Defaults to None (random embeddings).
+        batch_size (int, optional): Movies per database transaction. Defaults to 10000.
+
+    Returns:
+        tuple: (MovieDatabase, CatalogSnapshot, EmbeddingStore)
+    """
+    os.makedirs(path, exist_ok=True)
+    movie_db = MovieDatabase(os.path.join(path, "movies.db"), check_same_thread=False)
+
+    genres, batch, summaries = [], [], []
+    for movie, summary in generate_movies(size, seed=seed):
+        genres.append(movie["genres"])
+        batch.append(movie)
+        summaries.append(summary)
+        if len(batch) == batch_size:
+            movie_db.upsert_movies(batch)
+            batch = []
+    movie_db.upsert_movies(batch)
+
+    # Movies are inserted in order into an empty database, so ids follow the generation order
+    ids = [row[0] for row in movie_db.conn.execute("SELECT id FROM movies ORDER BY id")]
+    movie_db.upsert_generated_summaries(zip(ids, summaries))
+    snapshot = CatalogSnapshot.write(movie_db, os.path.join(path, "catalog.arrow"))
+
+    fixture = EmbeddingStore.open(fixture_path) if fixture_path else None
+    encoder = HashingEncoder(fixture.dim if fixture else dim)
+    embeddings = synthetic_embeddings(encoder, genres, len(ids), seed=seed, fixture=fixture)
+    embedding_store = EmbeddingStore.write(ids, embeddings, model_name=f"synthetic-{'fixture' if fixture else 'hashing'}-{encoder.dim}",
+                                           normalized=True, path=os.path.join(path, "embeddings"))
+
+    return movie_db, snapshot, embedding_store
+
+def main():
+    """
+    Writes one synthetic catalog to disk.
+    """
+    parser = argparse.ArgumentParser(description="Generate a synthetic movie catalog for benchmarks.")
+    parser.add_argument("--size", type=int, default=10000, help="Number of movies")
+    parser.add_argument("--output", type=str, default="data/benchmarks/synthetic_catalog")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension of random embeddings")
+    parser.add_argument("--fixture", type=str, default=None, help="Embedding store to sample embeddings from instead of random vectors")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    movie_db, snapshot, embedding_store = build_synthetic_catalog(args.size, args.output, dim=args.dim,
+                                                                  seed=args.seed, fixture_path=args.fixture)
+    print(f"Synthetic catalog with {len(snapshot)} movies and {embedding_store.dim}-d embeddings written to {args.output}")
+    movie_db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import gc
+import json
+import os
+import time
+import numpy as np
+
+def current_rss_bytes():
+    """
+    Returns the resident memory of the current process.
+
+    Reads /proc on Linux and falls back to the peak RSS reported by the resource module elsewhere.
+
+    Returns:
+        int: Resident set size in bytes, or 0 if it cannot be measured.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        import resource
+        # ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        return 0
+
+def directory_size_bytes(path):
+    """
+    Returns the total size of the files under a path.
+
+    Args:
+        path (str): File or directory.
+
+    Returns:
+        int: Size in bytes.
+    """
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+def latency_summary(latencies):
+    """
+    Summarizes a list of latencies measured in seconds.
+
+    Args:
+        latencies (list): Latencies in seconds.
+
+    Returns:
+        dict: Count, mean and p50/p95/p99 latencies in milliseconds.
+    """
+    if not latencies:
+        return {"count": 0}
+
+    latencies_ms = np.asarray(latencies) * 1000
+    return {
+        "count": len(latencies_ms),
+        "mean_ms": float(latencies_ms.mean()),
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p95_ms": float(np.percentile(latencies_ms, 95)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+    }
+
+def measure(function, *args, **kwargs):
+    """
+    Runs a function and measures its wall time and resident memory growth.
+
+    Args:
+        function (callable): Function to run.
+        *args: Positional arguments of the function.
+        **kwargs: Keyword arguments of the function.
+
+    Returns:
+        tuple: (result, seconds, rss_delta_bytes)
+    """
+    gc.collect()
+    rss_before = current_rss_bytes()
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    gc.collect()
+    return result, seconds, current_rss_bytes() - rss_before
+
+def write_results(results, output_path):
+    """
+    Writes benchmark results to a JSON file.
+
+    Args:
+        results (dict): Benchmark results.
+        output_path (str): Path of the JSON file.
+    """
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump(results, f, indent=4)
+    print(f"Results saved to {output_path}")
@@ -0,0 +1,117 @@
+"""
+Compares the vector store backends on the movie catalog embeddings.
+Usage: python -m src.benchmarks.vector_store_benchmark --backends faiss hnsw qdrant --queries 500
+"""
+
+import argparse
+import platform
+import shutil
+import tempfile
+import time
+import numpy as np
+
+from src.benchmarks.utils import directory_size_bytes, latency_summary, measure, write_results
+from src.database.embedding_store import EmbeddingStore
+from src.database.vector_store import VECTOR_STORES, create_vector_store
+
+def benchmark_backend(backend, embedding_store, queries, top_k, filter_ratio, seed=42):
+    """
+    Builds one backend in a temporary directory and measures it.
+
+    Args:
+        backend (str): Name of the vector store backend.
+        embedding_store (EmbeddingStore): Catalog embeddings.
+        queries (np.ndarray): Query vectors.
+        top_k (int): Number of neighbours per query.
+        filter_ratio (float): Fraction of the catalog allowed in filtered queries.
+        seed (int, optional): Seed for the filter sample. Defaults to 42.
+
+    Returns:
+        dict: Build time, memory, disk size, query latencies and recall against exact search.
+    """
+    path = tempfile.mkdtemp(prefix=f"vector_store_{backend}_")
+    try:
+        store = create_vector_store(backend, embedding_store.dim, path=path)
+        _, build_seconds, build_rss = measure(store.build, embedding_store.ids, embedding_store.embeddings)
+        store.save()
+
+        rng = np.random.default_rng(seed)
+        allowed_ids = rng.choice(embedding_store.ids, size=max(1, int(len(embedding_store) * filter_ratio)), replace=False)
+
+        latencies, filtered_latencies, results = [], [], []
+        for query in queries:
+            start = time.perf_counter()
+            ids, _ = store.search(query, top_k=top_k)
+            latencies.append(time.perf_counter() - start)
+            results.append(ids)
+
+            start = time.perf_counter()
+            store.search(query, top_k=top_k, allowed_ids=allowed_ids)
+            filtered_latencies.append(time.perf_counter() - start)
+
+        return {
+            "build_seconds": build_seconds,
+            "build_rss_delta_mb": build_rss / 2**20,
+            "disk_mb": directory_size_bytes(path) / 2**20,
+            "query": latency_summary(latencies),
+            "filtered_query": latency_summary(filtered_latencies),
+            "results": results,
+        }
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+def exact_neighbours(embedding_store, queries, top_k):
+    """Returns the exact top_k neighbour ids of each query with brute force search."""
+    embeddings = np.asarray(embedding_store.embeddings)
+    neighbours = []
+    for query in queries:
+        distances = ((embeddings - query) ** 2).sum(axis=1)
+        neighbours.append(embedding_store.ids[np.argsort(distances)[:top_k]])
+    return neighbours
+
+def main():
+    """
+    Runs the benchmark for every selected backend and writes a JSON report.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark vector store backends on the catalog embeddings.")
+    parser.add_argument("--backends", nargs="+", choices=list(VECTOR_STORES), default=list(VECTOR_STORES))
+    parser.add_argument("--embeddings", type=str, default="data/processed/embeddings", help="Embedding store directory")
+    parser.add_argument("--queries", type=int, default=500, help="Number of catalog embeddings used as queries")
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--filter-ratio", type=float, default=0.1, help="Fraction of the catalog allowed in filtered queries")
+    parser.add_argument("--output", type=str, default="data/benchmarks/vector_stores.json")
+    args = parser.parse_args()
+
+    embedding_store = EmbeddingStore.open(args.embeddings)
+    rng = np.random.default_rng(0)
+    query_rows = rng.choice(len(embedding_store), size=min(args.queries, len(embedding_store)), replace=False)
+    queries = np.asarray(embedding_store.embeddings[np.sort(query_rows)])
+    truth = exact_neighbours(embedding_store, queries, args.top_k)
+
+    report = {
+        "catalog_size": len(embedding_store),
+        "dim": embedding_store.dim,
+        "queries": len(queries),
+        "top_k": args.top_k,
+        "machine": platform.platform(),
+        "backends": {},
+    }
+
+    for backend in args.backends:
+        print(f"Benchmarking {backend}...")
+        try:
+            result = benchmark_backend(backend, embedding_store, queries, args.top_k, args.filter_ratio)
+        except ImportError as e:
+            print(f" -> Skipping {backend}: {e}")
+            continue
+
+        found = result.pop("results")
+        result["recall_at_k"] = float(np.mean([len(np.intersect1d(f, t)) / len(t) for f, t in zip(found, truth)]))
+        report["backends"][backend] = result
+        print(f" -> build {result['build_seconds']:.2f}s, p50 {result['query']['p50_ms']:.2f}ms, "
+              f"p99 {result['query']['p99_ms']:.2f}ms, recall@{args.top_k} {result['recall_at_k']:.3f}")
+
+    write_results(report, args.output)
+
+if __name__ == "__main__":
+    main()
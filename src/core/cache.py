@@ -0,0 +1,137 @@
+import copy
+import hashlib
+import json
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+def normalize_query(query):
+    """
+    Normalizes a user query for cache lookups: Unicode compatibility form, case folded, whitespace collapsed.
+
+    Punctuation is kept because it can change the meaning of a query, e.g. "rating 8+".
+
+    Args:
+        query (str): The user query.
+
+    Returns:
+        str: The normalized query.
+    """
+    return " ".join(unicodedata.normalize("NFKC", str(query)).casefold().split())
+
+def cache_key(*parts):
+    """
+    Hashes JSON-serializable parts into a fixed-size key.
+
+    Args:
+        *parts: Key components, e.g. the stage name, the normalized query and the config version.
+
+    Returns:
+        str: Hex digest of the parts.
+    """
+    data = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+class _InFlight:
+    """A computation other threads can wait for."""
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+class PipelineCache:
+    """
+    Thread-safe LRU cache with a time-to-live and single-flight computation.
+
+    When several threads ask for the same missing key, the first one computes the value and the others
+    wait for its result instead of computing it again. Failed computations are not cached.
+    """
+    def __init__(self, max_entries=512, ttl=3600):
+        """
+        Initializes the PipelineCache.
+
+        Args:
+            max_entries (int, optional): Maximum number of cached values, 0 disables caching. Defaults to 512.
+            ttl (float, optional): Seconds a value stays valid. Defaults to 3600.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the cached value of a key, computing it once if it is missing or expired.
+
+        Args:
+            key (str): Cache key.
+            compute (callable): Function without arguments producing the value.
+
+        Returns:
+            tuple: (value, status) with status "hit", "coalesced" or "miss". Values are copies, callers may modify them.
+
+        Raises:
+            Exception: Whatever `compute` raised, also in the threads that waited for it.
+        """
+        if self.max_entries <= 0:
+            return compute(), "miss"
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[1]), "hit"
+
+            in_flight = self._in_flight.get(key)
+            owner = in_flight is None
+            if owner:
+                in_flight = self._in_flight[key] = _InFlight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            in_flight.done.wait()
+            if in_flight.error is not None:
+                raise in_flight.error
+            return copy.deepcopy(in_flight.value), "coalesced"
+
+        try:
+            in_flight.value = compute()
+        except Exception as e:
+            in_flight.error = e
+            raise
+        else:
+            with self._lock:
+                self._entries[key] = (time.monotonic() + self.ttl, in_flight.value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return copy.deepcopy(in_flight.value), "miss"
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            in_flight.done.set()
+
+    def clear(self):
+        """Drops every cached value."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: entries, hits, misses and coalesced requests.
+        """
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "coalesced": self.coalesced}
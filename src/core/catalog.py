@@ -0,0 +1,129 @@
+import re
+import unicodedata
+import numpy as np
+
+def normalize_title(title):
+    """
+    Normalizes a title for lookups: accents removed, lowercase, punctuation and extra spaces dropped.
+
+    Args:
+        title (str): The title to normalize.
+
+    Returns:
+        str: The normalized title, e.g. "Amélie (2001)!" -> "amelie 2001".
+    """
+    title = unicodedata.normalize("NFKD", str(title)).encode("ascii", "ignore").decode("ascii")
+    return " ".join(re.findall(r"\w+", title.lower()))
+
+class Catalog:
+    """
+    Shared in-memory catalog with O(1) lookups by movie id and by normalized title.
+
+    Components pass movie ids between each other and project the fields they need from the catalog,
+    instead of carrying pandas rows around. The catalog wraps the Arrow table of the catalog snapshot,
+    so it adds only the id and title lookup tables on top of the memory-mapped columns.
+    """
+    def __init__(self, table):
+        """
+        Initializes the Catalog.
+
+        Args:
+            table (pa.Table): Catalog table with at least "id" and "title" columns.
+        """
+        self.table = table
+        self.ids = table.column("id").to_numpy()
+        self.columns = table.column_names
+        self._row_by_id = {int(movie_id): row for row, movie_id in enumerate(self.ids)}
+
+        # Several movies can share a title (remakes), so titles map to lists of ids
+        self._ids_by_title = {}
+        for movie_id, title in zip(self.ids, table.column("title").to_pylist()):
+            self._ids_by_title.setdefault(normalize_title(title), []).append(int(movie_id))
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """
+        Builds the catalog from a catalog snapshot.
+
+        Args:
+            snapshot (CatalogSnapshot): The opened snapshot.
+
+        Returns:
+            Catalog: The catalog.
+        """
+        return cls(snapshot.table)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, movie_id):
+        return int(movie_id) in self._row_by_id
+
+    def get(self, movie_id, fields=None):
+        """
+        Returns one movie.
+
+        Args:
+            movie_id (int): The movie id.
+            fields (list, optional): Fields to return. Defaults to every column.
+
+        Returns:
+            dict: The movie fields, or None if the id is unknown.
+        """
+        movies = self.project([movie_id], fields)
+        return movies[0] if movies else None
+
+    def ids_for_title(self, title):
+        """
+        Returns the ids of the movies with a title, compared after normalization.
+
+        Args:
+            title (str): The title to look up.
+
+        Returns:
+            list: Movie ids, empty if no movie has this title.
+        """
+        return list(self._ids_by_title.get(normalize_title(title), []))
+
+    def rows_for_ids(self, ids):
+        """
+        Maps movie ids to table rows, skipping unknown ids.
+
+        Args:
+            ids (iterable): Movie ids.
+
+        Returns:
+            np.ndarray: Row positions in the order of `ids`.
+        """
+        return np.array([self._row_by_id[int(i)] for i in ids if int(i) in self._row_by_id], dtype=np.int64)
+
+    def project(self, ids, fields=None):
+        """
+        Returns the given fields of several movies with a single vectorized take.
+
+        Args:
+            ids (iterable): Movie ids, in the order the movies should be returned.
+            fields (list, optional): Fields to return. Defaults to every column.
+
+        Returns:
+            list: One dictionary per known id.
+        """
+        rows = self.rows_for_ids(ids)
+        table = self.table.select(fields) if fields else self.table
+        return table.take(rows).to_pylist()
+
+    def column(self, field, ids=None):
+        """
+        Returns one field for several movies.
+
+        Args:
+            field (str): The field to return.
+            ids (iterable, optional): Movie ids. Defaults to every movie in catalog order.
+
+        Returns:
+            list: The values of the field.
+        """
+        column = self.table.column(field)
+        if ids is not None:
+            column = column.take(self.rows_for_ids(ids))
+        return column.to_pylist()
@@ -1,18 +1,28 @@
 import config
-from src.llm.google_gemini import Gemini
+from src.core.rule_features import RuleFeatureExtractor
+from src.core.tracing import tracer
+from src.llm.provider import create_llm
 
 class FeatureExtractor:
     """
-    Extracts movie features from a user query using a language model.
+    Extracts movie features from a user query, with local rules first and a language model for the queries
+    the rules don't understand well enough.
     """
-    def __init__(self, genres_list=[]):
+    def __init__(self, genres_list=[], stars=(), directors=(), mode=None, min_confidence=None):
         """
         Initializes the FeatureExtractor with a Gemini language model and a list of genres.
 
         Args:
             genres_list (list, optional): A list of movie genres to consider. Defaults to a predefined list.
+            stars (iterable, optional): Star names recognized by the rules. Defaults to ().
+            directors (iterable, optional): Director names recognized by the rules. Defaults to ().
+            mode (str, optional): "auto", "rules" or "llm". Defaults to config.FEATURE_EXTRACTION["mode"].
+            min_confidence (float, optional): Rules confidence needed to skip the language model in auto mode.
+                                              Defaults to config.FEATURE_EXTRACTION["min_confidence"].
         """
-        self.gemini = Gemini(model_info=config.GENRE_EXTRACTOR_MODEL, json_output=True)
+        self.gemini = create_llm(config.GENRE_EXTRACTOR_MODEL, json_output=True)
+        self.mode = mode or config.FEATURE_EXTRACTION["mode"]
+        self.min_confidence = config.FEATURE_EXTRACTION["min_confidence"] if min_confidence is None else min_confidence
         # Use provided genres list or default to a predefined list
         if len(genres_list):
             self.genres_list = genres_list
@@ -21,11 +31,41 @@ class FeatureExtractor:
                 "action", "comedy", "drama", "horror", "thriller", "sci-fi",
                 "romance", "mystery", "crime", "animation", "adventure", "fantasy"
             ]
+        self.rules = RuleFeatureExtractor(self.genres_list, stars, directors,
+                                          fuzzy_cutoff=config.FEATURE_EXTRACTION["fuzzy_cutoff"])
 
     def extract_features(self, query: str) -> dict:
         """
         Extracts movie features (liked/disliked genres, stars, directors, years, rating) from a user query.
 
+        The local rules answer when their confidence reaches min_confidence, the language model otherwise.
+
+        Args:
+            query (str): The user's query expressing their movie preferences.
+
+        Returns:
+            dict: A dictionary containing the extracted movie features.
+        """
+        if self.mode != "llm":
+            with tracer.span("features.rules") as span:
+                features, confidence = self.rules.extract(query)
+                span.set(confidence=round(confidence, 3))
+            if self.mode == "rules" or confidence >= self.min_confidence:
+                self._record_source("rules")
+                return features
+        self._record_source("llm")
+        return self.extract_features_llm(query)
+
+    def _record_source(self, source):
+        """Records on the running span whether the rules or the language model produced the features."""
+        span = tracer.current_span()
+        if span is not None:
+            span.set(source=source)
+
+    def extract_features_llm(self, query: str) -> dict:
+        """
+        Extracts movie features from a user query with the language model.
+
         Args:
             query (str): The user's query expressing their movie preferences.
 
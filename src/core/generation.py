@@ -1,5 +1,7 @@
 import config
-import src.llm.google_gemini as llm
+from src.core.movie_context import MovieContextSerializer
+from src.core.tracing import tracer
+from src.llm.provider import create_llm, estimate_tokens
 
 class RecommendationGenerator:
     """
@@ -9,36 +11,45 @@ class RecommendationGenerator:
     It leverages the Gemini Pro model for its advanced natural language processing capabilities to understand user preferences
     and suggest relevant movies from a provided list.
     """
-    def __init__(self):
+    def __init__(self, catalog):
         """
         Initializes the RecommendationGenerator with a specified Gemini model.
 
         The model name is specified in the config file.
+
+        Args:
+            catalog (Catalog): Shared movie catalog used to look up the retrieved movies by id.
         """
-        
-        self.model = llm.Gemini(config.RECOMMENDATION_MODEL)  # Initialize the generative model from the google.generativeai library.
+        self.catalog = catalog
 
-    def generate(self, query, movies):
+        self.model = create_llm(config.RECOMMENDATION_MODEL)  # Initialize the generative model of the configured provider.
+        # Renders the retrieved movies as compact rows under the token budget of the prompt
+        self.serializer = MovieContextSerializer(**config.RECOMMENDATION_CONTEXT)
+
+    def generate(self, query, movie_ids):
         """
         Generates movie recommendations based on a user query and a list of retrieved movies.
 
-        This is the core method for generating movie recommendations. It takes a user query and a list of movies as input,
+        This is the core method for generating movie recommendations. It takes a user query and a list of movie ids as input,
         constructs a detailed prompt for the Gemini Pro model, sends the prompt to the model, and returns the generated recommendations.
 
         Args:
             query (str): The user's movie query or preferences, as a string.
-            movies (list): A list of movie dictionaries retrieved from the search engine.
+            movie_ids (list): Ids of the movies retrieved from the search engine, best match first.
 
         Returns:
             str: The generated movie recommendations as a text string.
         """
 
+        with tracer.span("generation.context", movies=len(movie_ids)) as span:
+            movies, stats = self.serializer.serialize(self.catalog.project(movie_ids, self.serializer.fields))
+            span.set(**stats)
 
         rag_prompt = f"""
         Act as a movie recommendation engine. Use the following **retrieved list of movies** to suggest films tailored to the user's preferences.
 
-        **Retrieved Movie List (Structured Data):**
-        {movies}
+        **Retrieved Movie List ({self.serializer.describe()}):**
+{movies}
 
         **Task:**
         1. **Analyze the user's query** (e.g., genre, mood, director, actor, or themes).
@@ -96,5 +107,13 @@ class RecommendationGenerator:
 
         """
 
+        prompt_tokens = estimate_tokens(rag_prompt)
+        span = tracer.current_span()
+        if span is not None:
+            span.set(prompt_tokens=prompt_tokens, context_tokens=stats["tokens"])
+        print(f"Recommendation prompt: ~{prompt_tokens} tokens, {stats['movies']} movies in ~{stats['tokens']} tokens"
+              + (f", shortened {', '.join(stats['truncated_fields'])}" if stats["truncated_fields"] else "")
+              + (f", left out {stats['dropped_movies']} movies" if stats["dropped_movies"] else ""))
+
         # Generate the response using the Gemini model
         return self.model.generate_response(rag_prompt, max_output_tokens=5000)
@@ -1,5 +1,5 @@
 import config
-import src.llm.google_gemini as llm
+from src.llm.provider import create_llm
 
 class Hyde:
     """
@@ -10,9 +10,9 @@ class Hyde:
     """
     def __init__(self):
         """
-        Initializes the Hyde class with a Gemini model for document generation.
+        Initializes the Hyde class with the configured language model (Gemini by default) for document generation.
         """
-        self.model = llm.Gemini(config.HYDE_MODEL)
+        self.model = create_llm(config.HYDE_MODEL)
 
     def generate(self, query):
         """
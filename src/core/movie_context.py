@@ -0,0 +1,125 @@
+import json
+
+from src.llm.provider import estimate_tokens
+
+# Character limits tried in turn when a field must shrink to fit the budget, 0 drops the field
+TRUNCATION_STEPS = (240, 160, 100, 60, 0)
+
+def _value(value):
+    """Formats a field value on one line: floats without noise digits, missing values as empty strings."""
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.1f}".rstrip("0").rstrip(".")
+    return " ".join(str(value).split())
+
+def shorten(text, limit):
+    """
+    Cuts a text to a number of characters, at a list separator or a word boundary.
+
+    Args:
+        text (str): The text, e.g. a plot or a comma-separated list of names.
+        limit (int): Maximum number of characters, 0 returns an empty string.
+
+    Returns:
+        str: The text itself if short enough, otherwise its beginning followed by "…".
+    """
+    if len(text) <= limit:
+        return text
+    if limit <= 1:
+        return ""
+    cut = text[:limit - 1]
+    separator = cut.rfind(", ") if ", " in cut else cut.rfind(" ")
+    if separator > limit // 2:
+        cut = cut[:separator]
+    return cut.rstrip(" ,.;") + "…"
+
+class MovieContextSerializer:
+    """
+    Renders the retrieved movies as compact rows for the recommendation prompt, under a token budget.
+
+    Only the selected fields are written, as tab-separated values with one header line or as one minimal
+    JSON object per line. When the rows exceed the budget, the fields of `truncate_order` are shortened
+    one after the other, then the lowest ranked movies are left out.
+    """
+    def __init__(self, fields, max_tokens=1500, format="tsv", truncate_order=("plot",)):
+        """
+        Initializes the MovieContextSerializer.
+
+        Args:
+            fields (list): Movie fields to write, in column order.
+            max_tokens (int, optional): Token budget of the rendered movies, None for no limit. Defaults to 1500.
+            format (str, optional): "tsv" or "json". Defaults to "tsv".
+            truncate_order (tuple, optional): Fields shortened first when over budget. Defaults to ("plot",).
+
+        Raises:
+            ValueError: If the format is unknown.
+        """
+        if format not in ("tsv", "json"):
+            raise ValueError(f"Unknown movie context format '{format}'. Options: tsv, json")
+        self.fields = list(fields)
+        self.max_tokens = max_tokens
+        self.format = format
+        self.truncate_order = [field for field in truncate_order if field in self.fields]
+
+    def describe(self):
+        """
+        Describes the layout of the rendered movies for the prompt.
+
+        Returns:
+            str: One line telling the model how to read the rows.
+        """
+        if self.format == "tsv":
+            return "tab-separated, header line first, one movie per line, best match first"
+        return "one JSON object per line, best match first, empty fields omitted"
+
+    def _render(self, rows, limits):
+        """Renders formatted rows with the fields cut to their character limits."""
+        rows = [{field: shorten(row[field], limits[field]) if field in limits else row[field] for field in self.fields}
+                for row in rows]
+        fields = [field for field in self.fields if limits.get(field, 1) > 0]
+        if self.format == "tsv":
+            lines = ["\t".join(fields)] + ["\t".join(row[field] for field in fields) for row in rows]
+        else:
+            lines = [json.dumps({field: row[field] for field in fields if row[field]}, ensure_ascii=False,
+                                separators=(",", ":")) for row in rows]
+        return "\n".join(lines)
+
+    def serialize(self, movies):
+        """
+        Renders movies within the token budget.
+
+        Args:
+            movies (list): Movie dictionaries, best match first.
+
+        Returns:
+            tuple: (text, stats) with the rendered movies and a dictionary of the estimated tokens, the number
+                   of movies written and the fields that were shortened.
+        """
+        rows = [{field: _value(movie.get(field)) for field in self.fields} for movie in movies]
+        limits = {}
+        text = self._render(rows, limits)
+
+        def fits(text):
+            return self.max_tokens is None or estimate_tokens(text) <= self.max_tokens
+
+        for field in self.truncate_order:
+            if fits(text):
+                break
+            for limit in TRUNCATION_STEPS:
+                limits[field] = limit
+                text = self._render(rows, limits)
+                if fits(text):
+                    break
+
+        kept = len(rows)
+        while kept > 1 and not fits(text):
+            kept -= 1
+            text = self._render(rows[:kept], limits)
+
+        return text, {
+            "tokens": estimate_tokens(text),
+            "movies": kept,
+            "dropped_movies": len(rows) - kept,
+            "truncated_fields": sorted(limits),
+        }
@@ -0,0 +1,225 @@
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import config
+from src.core.cache import PipelineCache, cache_key, normalize_query
+from src.core.settings import load_retrieval_settings
+from src.core.tracing import tracer
+from src.database.db_manager import SERVING_COLUMNS
+
+# Default weight of the IMDb rating when combined with the cross-encoder score
+RATING_WEIGHT = 0.1
+
+def combine_score(score, rating, weight=RATING_WEIGHT):
+    """
+    Combines a cross-encoder score with the IMDb rating of a movie.
+
+    Args:
+        score (float): Cross-encoder relevance score.
+        rating (float): IMDb rating of the movie.
+        weight (float, optional): Weight of the rating. Defaults to RATING_WEIGHT.
+
+    Returns:
+        float: The combined score.
+    """
+    return score + weight * rating
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """
+    Merges ranked lists of movie ids with reciprocal rank fusion: each list adds 1 / (k + rank) to the score of its movies.
+
+    Args:
+        rankings (list): Lists of movie ids, best first. Ties keep the order of the first lists.
+        k (int, optional): Fusion constant, larger values flatten the rank differences. Defaults to 60.
+
+    Returns:
+        list: Movie ids by decreasing fused score.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, movie_id in enumerate(ranking, 1):
+            scores[movie_id] = scores.get(movie_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=lambda movie_id: -scores[movie_id])
+
+class RecommendationPipeline:
+    """
+    Runs the recommendation pipeline: FeatureExtractor -> Hyde -> HybridRetriever -> Reranker -> RecommendationGenerator.
+
+    Components are taken from a StartupOrchestrator, so every stage waits only for the components it uses.
+    The same pipeline backs the Streamlit app and the HTTP service. Candidate counts and the rating weight
+    come from the retrieval settings tuned by the parameter sweep.
+
+    Every stage result is cached by its inputs and the pipeline configuration, so Streamlit reruns and repeated
+    queries skip the LLM calls and the models. Identical requests running at the same time share one computation.
+
+    With config.SPECULATIVE_RETRIEVAL enabled, the search retrieves with the raw query while HyDE is generated,
+    and fuses in the HyDE results only if they arrive before the deadline.
+    """
+    def __init__(self, startup, settings=None, cache=None):
+        """
+        Initializes the RecommendationPipeline.
+
+        Args:
+            startup (StartupOrchestrator): Orchestrator loading the components.
+            settings (dict, optional): Retrieval settings. Defaults to the saved settings (see load_retrieval_settings).
+            cache (PipelineCache, optional): Cache of the stage results. Defaults to a cache sized by config.PIPELINE_CACHE.
+        """
+        self.startup = startup
+        self.settings = settings or load_retrieval_settings()
+        self.combine_score = partial(combine_score, weight=self.settings["rating_weight"])
+        self.cache = cache or PipelineCache(**config.PIPELINE_CACHE)
+        # Cached results are only valid for the models and settings that produced them
+        self.config_version = cache_key(self.settings, config.LLM_PROVIDER, config.EMBEDDING_MODEL, config.RERANKER_MODEL,
+                                        config.GENRE_EXTRACTOR_MODEL, config.HYDE_MODEL, config.RECOMMENDATION_MODEL,
+                                        config.KEYWORD_BACKEND, config.ACTIVE_FILTERS, config.FEATURE_EXTRACTION,
+                                        config.RECOMMENDATION_CONTEXT, config.SPECULATIVE_RETRIEVAL)
+        self.speculative = config.SPECULATIVE_RETRIEVAL
+        self._executor = ThreadPoolExecutor(max_workers=self.speculative["workers"], thread_name_prefix="hyde") \
+            if self.speculative["enabled"] else None
+
+    def _cached(self, stage, inputs, compute):
+        """
+        Returns the cached result of a stage, computing it on a miss.
+
+        Args:
+            stage (str): Stage name.
+            inputs (tuple): Stage inputs, queries normalized.
+            compute (callable): Function computing the result.
+
+        Returns:
+            Any: The stage result.
+        """
+        result, status = self.cache.get_or_compute(cache_key(stage, self.config_version, *inputs), compute)
+        span = tracer.current_span()
+        if span is not None:
+            span.set(cache=status)
+        return result
+
+    def extract_features(self, query):
+        """Extracts the liked/disliked features of a query."""
+        with tracer.span("pipeline.extract_features"):
+            return self._cached("features", (normalize_query(query),),
+                                lambda: self.startup.get("feature_extractor").extract_features(query=query))
+
+    def generate_hyde(self, query):
+        """Generates a hypothetical movie synopsis for a query."""
+        with tracer.span("pipeline.hyde"):
+            return self._cached("hyde", (normalize_query(query),),
+                                lambda: self.startup.get("hyde").generate(query=query))
+
+    def retrieve(self, hyde_text, features=None, top_k=None):
+        """Runs the hybrid search and returns movie ids, `rerank_depth` of them by default."""
+        top_k = top_k or self.settings["rerank_depth"]
+        with tracer.span("pipeline.retrieve", top_k=top_k) as span:
+            results = self._cached("retrieve", (hyde_text, features, top_k),
+                                   lambda: self.startup.get("retriever").hybrid_search(query=hyde_text, top_k=top_k, filters=features))
+            span.set(results=len(results))
+            return results
+
+    def rerank(self, hyde_text, candidates, top_k=None):
+        """Reranks candidate movie ids with the cross-encoder and the IMDb rating, keeps the best `top_k`."""
+        if not candidates:
+            return []
+        top_k = top_k or self.settings["top_k"]
+        with tracer.span("pipeline.rerank", candidates=len(candidates)):
+            reranked = self._cached("rerank", (hyde_text, list(candidates)),
+                                    lambda: self.startup.get("reranker").rerank(query=hyde_text, candidates=candidates,
+                                                                                combine_score=self.combine_score))
+        return reranked[:top_k]
+
+    def generate(self, query, movie_ids):
+        """Generates the final recommendation text for the reranked movies."""
+        with tracer.span("pipeline.generate", movies=len(movie_ids)):
+            return self._cached("generate", (normalize_query(query), list(movie_ids)),
+                                lambda: self.startup.get("generator").generate(query=query, movie_ids=movie_ids))
+
+    def similar(self, movie_id, k=10, filters=None):
+        """Returns the precomputed most similar movie ids of a movie, optionally filtered by extracted features."""
+        with tracer.span("pipeline.similar", k=k):
+            return self.startup.get("retriever").similar(movie_id, k=k, filters=filters)
+
+    def movies(self, movie_ids, fields=SERVING_COLUMNS):
+        """Projects serving fields of movies from the catalog."""
+        return self.startup.get("catalog").project(movie_ids, fields)
+
+    def search(self, query, top_k=None):
+        """
+        Runs feature extraction, HyDE and the hybrid search.
+
+        Args:
+            query (str): The user query.
+            top_k (int, optional): Number of movies to retrieve. Defaults to the `rerank_depth` setting.
+
+        Returns:
+            dict: features, hyde (None if it missed the speculative deadline) and the retrieved movie ids under "results".
+        """
+        if self._executor is not None:
+            return self.search_speculative(query, top_k=top_k)
+        with tracer.span("pipeline.search", top_k=top_k):
+            features = self.extract_features(query)
+            hyde_text = self.generate_hyde(query)
+            results = self.retrieve(hyde_text, features, top_k=top_k)
+        return {"features": features, "hyde": hyde_text, "results": results}
+
+    def search_speculative(self, query, top_k=None):
+        """
+        Runs the search with the raw query while HyDE is generated, then merges in the HyDE search results.
+
+        HyDE runs on a worker thread from the start. Meanwhile the features are extracted and the raw query is
+        searched. If the HyDE text arrives before the deadline, it is searched too and both lists are fused with
+        reciprocal rank fusion. Otherwise the raw query results are returned alone, and the HyDE call keeps
+        running to fill the cache for the next identical query.
+
+        Args:
+            query (str): The user query.
+            top_k (int, optional): Number of movies to retrieve. Defaults to the `rerank_depth` setting.
+
+        Returns:
+            dict: features, hyde (None if it failed or missed the deadline) and the retrieved movie ids under "results".
+        """
+        top_k = top_k or self.settings["rerank_depth"]
+        deadline = self.speculative["deadline"]
+        start = time.perf_counter()
+        with tracer.span("pipeline.search", top_k=top_k, speculative=True) as span:
+            # The copied context keeps the HyDE spans in this trace
+            hyde_future = self._executor.submit(contextvars.copy_context().run, self.generate_hyde, query)
+            features = self.extract_features(query)
+            raw_results = self.retrieve(query, features, top_k=top_k)
+
+            hyde_text = None
+            timeout = None if deadline is None else max(0.0, deadline - (time.perf_counter() - start))
+            try:
+                hyde_text = hyde_future.result(timeout=timeout)
+            except TimeoutError:
+                print(f"HyDE missed the {deadline}s deadline, continuing with the raw query results.")
+            except Exception as e:
+                print(f"HyDE failed, continuing with the raw query results: {e}")
+
+            if hyde_text is None:
+                results = raw_results
+            else:
+                hyde_results = self.retrieve(hyde_text, features, top_k=top_k)
+                results = reciprocal_rank_fusion([hyde_results, raw_results], k=self.speculative["rrf_k"])[:top_k]
+            span.set(hyde_used=hyde_text is not None, results=len(results))
+        return {"features": features, "hyde": hyde_text, "results": results}
+
+    def recommend(self, query, top_k=None):
+        """
+        Runs the full pipeline.
+
+        Args:
+            query (str): The user query.
+            top_k (int, optional): Number of movies sent to the recommendation model. Defaults to the `top_k` setting.
+
+        Returns:
+            dict: features, hyde, retrieved ids ("results"), reranked ids ("reranked") and the "recommendation" text.
+        """
+        top_k = top_k or self.settings["top_k"]
+        with tracer.span("pipeline.recommend", top_k=top_k):
+            response = self.search(query, top_k=max(top_k, self.settings["rerank_depth"]))
+            # Without a HyDE text the cross-encoder scores the candidates against the query itself
+            response["reranked"] = self.rerank(response["hyde"] or query, response["results"], top_k=top_k)
+            response["recommendation"] = self.generate(query, response["reranked"]) if response["reranked"] else None
+        return response
@@ -1,38 +1,45 @@
 from sentence_transformers import CrossEncoder
 import config
+from src.core.tracing import tracer
 
 class Reranker:
     """
     Reranks movie candidates using a cross-encoder model to improve search result relevance.
     """
-    def __init__(self, model_name=config.RERANKER_MODEL):
+    # Fields read from the catalog to build the cross-encoder input
+    FIELDS = ["id", "directors", "stars", "genres", "plot", "imdb_rating"]
+
+    def __init__(self, catalog, model_name=config.RERANKER_MODEL, model=None):
         """
         Initialize the Reranker with a pre-trained cross-encoder model.
 
         Args:
+            catalog (Catalog): Shared movie catalog used to look up candidate fields by id.
             model_name (str, optional): Name of the cross-encoder model for reranking.
                                          Defaults to a model fine-tuned for semantic similarity specified in config.py.
+            model (optional): Already loaded model with the CrossEncoder `predict` signature, e.g. an offline stand-in
+                              used by the benchmarks. Defaults to None (load `model_name`).
         """
-        self.model = CrossEncoder(model_name)
+        self.catalog = catalog
+        self.model = model or CrossEncoder(model_name)
 
-    def rerank(self, query, candidates, combine_score=None):
+    def score(self, query, candidates):
         """
-        Rerank movie candidates based on query relevance using a cross-encoder.
-
-        This method takes a user query and a list of movie candidates, and uses a cross-encoder model
-        to re-rank the candidates based on their relevance to the query.
+        Scores movie candidates against a query with the cross-encoder.
 
         Args:
             query (str): User's search query.
-            candidates (list): List of movie candidate dictionaries.
-            combine_score (function, optional): Function to combine cross-encoder score with other metrics. Defaults to None.
+            candidates (list): List of movie candidate ids.
 
         Returns:
-            list: Reranked list of movie candidates.
+            list: (candidate, cross-encoder score) pairs in candidate order, candidates are dictionaries with the FIELDS columns.
         """
         if not candidates:
             return []
-        
+
+        with tracer.span("rerank.project", candidates=len(candidates)):
+            candidates = self.catalog.project(candidates, self.FIELDS)
+
         pairs = []
         # Create pairs of query and candidate text for cross-encoder input
         for candidate in candidates:
@@ -47,15 +54,32 @@ class Reranker:
             pairs.append((query, text))
         
         # Get cross-encoder scores for each pair
-        cross_encoder_scores = self.model.predict(pairs)
+        with tracer.span("rerank.cross_encoder", pairs=len(pairs)):
+            cross_encoder_scores = self.model.predict(pairs)
+
+        return list(zip(candidates, cross_encoder_scores))
+
+    def rerank(self, query, candidates, combine_score=None):
+        """
+        Rerank movie candidates based on query relevance using a cross-encoder.
+
+        This method takes a user query and a list of movie candidate ids, and uses a cross-encoder model
+        to re-rank the candidates based on their relevance to the query.
+
+        Args:
+            query (str): User's search query.
+            candidates (list): List of movie candidate ids.
+            combine_score (function, optional): Function to combine cross-encoder score with other metrics. Defaults to None.
+
+        Returns:
+            list: Reranked list of movie candidate ids.
+        """
+        scored = self.score(query, candidates)
 
         # Combine scores if a combine function is provided
         if combine_score:
-            combined_scores = [combine_score(score, candidate["imdb_rating"]) 
-                               for score, candidate in zip(cross_encoder_scores, candidates)]
-        else:
-            combined_scores = cross_encoder_scores
+            scored = [(candidate, combine_score(score, candidate["imdb_rating"] or 0)) for candidate, score in scored]
 
         # Sort candidates by combined scores in descending order
-        reranked_candidates = sorted(zip(candidates, combined_scores), key=lambda x: x[1], reverse=True)
-        return [candidate for candidate, score in reranked_candidates]
+        reranked_candidates = sorted(scored, key=lambda x: x[1], reverse=True)
+        return [candidate["id"] for candidate, score in reranked_candidates]
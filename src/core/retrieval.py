@@ -1,48 +1,111 @@
 from sentence_transformers import SentenceTransformer
-import faiss
 import numpy as np
 from rank_bm25 import BM25Okapi
 import config
+from src.core.tracing import tracer
+
+# Catalog fields read to apply the filters to precomputed neighbours
+FILTER_FIELDS = ["id", "genres", "stars", "directors", "year", "imdb_rating"]
+
+def matches_filters(movie, filters):
+    """
+    Checks one movie against extracted features, with the rules of MovieDatabase.filter_movie_ids.
+
+    Args:
+        movie (dict): Catalog fields of the movie (genres, stars and directors as comma-separated names, year, imdb_rating).
+        filters (dict): Features as produced by FeatureExtractor.
+
+    Returns:
+        bool: Whether the movie has one of the liked names of every kind, none of the disliked names, and its year
+              and rating in the requested ranges.
+    """
+    for key in ("genres", "stars", "directors"):
+        names = {name.strip().casefold() for name in (movie.get(key) or "").split(",") if name.strip()}
+        liked = {name.casefold() for name in filters.get(f"liked_{key}") or [] if name}
+        disliked = {name.casefold() for name in filters.get(f"disliked_{key}") or [] if name}
+        if (liked and not liked & names) or disliked & names:
+            return False
+
+    liked_years = list(filters.get("liked_years") or []) + [False, False]
+    year = movie.get("year")
+    if liked_years[0] and (year is None or year < int(liked_years[0])):
+        return False
+    if liked_years[1] and (year is None or year > int(liked_years[1])):
+        return False
+    if filters.get("liked_rating") and (movie.get("imdb_rating") or 0) < float(filters["liked_rating"]):
+        return False
+    return True
 
 class HybridRetriever:
     """
     Hybrid retrieval system combining vector-based semantic search and keyword-based BM25 retrieval.
 
-    This class implements a hybrid approach to movie retrieval, leveraging the strengths of both semantic similarity search using FAISS
+    This class implements a hybrid approach to movie retrieval, leveraging the strengths of both semantic similarity search using a vector store
     and keyword-based relevance ranking using BM25. It is designed to enhance search accuracy and recall by considering both semantic meaning
     and keyword matches in user queries.
     """
-    def __init__(self, vector_index_path, bm25_corpus, metadata):
+    def __init__(self, vector_store, catalog, embedding_store, keyword_backend="bm25", movie_db=None, embedding_model=None, overfetch=5,
+                 neighbour_graph=None):
         """
         Initializes the HybridRetriever with necessary components for hybrid search.
 
         Args:
-            vector_index_path (str): Path to the FAISS vector index file.
-            bm25_corpus (list): Corpus of movie descriptions used for BM25 keyword-based retrieval.
-            metadata (DataFrame): Movie metadata containing movie information such as genres and IMDb ratings.
+            vector_store (VectorStore): Vector store keyed by movie id (FAISS, hnswlib or Qdrant).
+            catalog (Catalog): Shared movie catalog, its generated summaries form the BM25 corpus.
+            embedding_store (EmbeddingStore): Memory-mapped embeddings, BM25 rows follow the same order.
+            keyword_backend (str, optional): "bm25" for the in-memory BM25 index or "fts" for the SQLite FTS5 index. Defaults to "bm25".
+            movie_db (MovieDatabase, optional): Database used for filtering and by the "fts" keyword backend. Defaults to None.
+            embedding_model (optional): Query encoder with the SentenceTransformer `encode` signature, e.g. an offline stand-in
+                                        used by the benchmarks. Defaults to None (load config.EMBEDDING_MODEL).
+            overfetch (int, optional): Candidates fetched per search source as a multiple of top_k. Defaults to 5.
+            neighbour_graph (NeighbourGraph, optional): Precomputed neighbours answering `similar`. Defaults to None.
         """
-        self.vector_index = faiss.read_index(vector_index_path)
-        self.bm25_corpus = bm25_corpus
-        self.bm25 = BM25Okapi(bm25_corpus)
-        self.metadata = metadata
-        self.embeddings_generator = SentenceTransformer(config.EMBEDDING_MODEL)
+        if embedding_model is None:
+            embedding_store.check_model(config.EMBEDDING_MODEL)
+        self.embedding_store = embedding_store
+        self.vector_store = vector_store
+        self.keyword_backend = keyword_backend
+        self.movie_db = movie_db
+        self.catalog = catalog
+        self.overfetch = overfetch
+        self.neighbour_graph = neighbour_graph
+        self.bm25_corpus = None
+
+        if keyword_backend == "bm25":
+            # Align the BM25 corpus with the embedding rows
+            self.bm25_corpus = [summary or "" for summary in catalog.column("generated_summary", embedding_store.ids)]
+            self.bm25 = BM25Okapi(self.bm25_corpus)
+        elif keyword_backend == "fts":
+            if movie_db is None:
+                raise ValueError("The 'fts' keyword backend requires a MovieDatabase.")
+            # Keyword search runs against the index on disk, nothing to build at startup
+            self.bm25 = None
+        else:
+            raise ValueError(f"Unknown keyword backend '{keyword_backend}'. Options: bm25, fts")
+
+        self.embeddings_generator = embedding_model or SentenceTransformer(config.EMBEDDING_MODEL)
 
-    def semantic_search(self, query, top_k=10):
+    def semantic_search(self, query, top_k=10, allowed_ids=None):
         """
-        Performs semantic similarity search using a pre-trained SentenceTransformer model and a FAISS index.
+        Performs semantic similarity search using a pre-trained SentenceTransformer model and the vector store.
 
-        This method encodes the query into a vector embedding and uses FAISS to find the top_k most similar movie embeddings in the index.
+        This method encodes the query into a vector embedding and uses the vector store to find the top_k most similar movie embeddings.
 
         Args:
             query (str): The user's search query as a text string.
             top_k (int, optional): The number of top similar movies to retrieve. Defaults to 10.
+            allowed_ids (set, optional): Restricts the search to these movie ids. Defaults to None (no restriction).
 
         Returns:
-            np.ndarray: Indices of the top_k most semantically similar movies in the FAISS index.
+            np.ndarray: Movie ids of the top_k most semantically similar movies in the vector store.
         """
-        query_embedding = self.embeddings_generator.encode(query)
-        _, I = self.vector_index.search(np.array([query_embedding]).astype("float32"), top_k*5)
-        return I[0]
+        with tracer.span("retrieval.encode", model=config.EMBEDDING_MODEL):
+            query_embedding = self.embeddings_generator.encode(query, normalize_embeddings=self.embedding_store.normalized)
+        k = top_k * self.overfetch
+        with tracer.span("retrieval.vector_search", backend=type(self.vector_store).__name__, k=k,
+                         filtered=allowed_ids is not None):
+            ids, _ = self.vector_store.search(query_embedding, top_k=k, allowed_ids=allowed_ids)
+        return ids
 
     def keyword_search_bm25(self, query, top_k=10):
         """
@@ -55,99 +118,97 @@ class HybridRetriever:
             top_k (int, optional): The number of top keyword-relevant movies to retrieve. Defaults to 10.
 
         Returns:
-            np.ndarray: Indices of the top_k most keyword-relevant movies according to BM25.
+            np.ndarray: Movie ids of the top_k most keyword-relevant movies according to BM25.
         """
         
-        tokenized_query = query.split(" ")
-        bm25_scores = self.bm25.get_scores(tokenized_query)
-        top_n_idx = np.argsort(bm25_scores)[::-1][:top_k*5]
-        return top_n_idx
+        if self.keyword_backend == "fts":
+            return self.keyword_search_fts(query, top_k=top_k)
+
+        k = top_k * self.overfetch
+        with tracer.span("retrieval.keyword_search", backend="bm25", k=k):
+            tokenized_query = query.split(" ")
+            bm25_scores = self.bm25.get_scores(tokenized_query)
+            top_n_idx = np.argsort(bm25_scores)[::-1][:k]
+            return self.embedding_store.ids[top_n_idx]
+
+    def keyword_search_fts(self, query, top_k=10):
+        """
+        Performs keyword-based retrieval with the SQLite FTS5 index of the movie database.
+
+        Args:
+            query (str): The user's search query as a text string.
+            top_k (int, optional): The number of top keyword-relevant movies to retrieve. Defaults to 10.
+
+        Returns:
+            np.ndarray: Movie ids of the top_k most keyword-relevant movies according to FTS5 bm25 ranking.
+        """
+        k = top_k * self.overfetch
+        with tracer.span("retrieval.keyword_search", backend="fts", k=k):
+            results = self.movie_db.search_text(query, limit=k)
+        return np.array([movie_id for movie_id, _ in results], dtype=np.int64)
 
     def hybrid_search(self, query, top_k=10, filters=None):
         """
         Executes a hybrid search combining semantic and keyword-based retrieval, with optional filtering.
 
         This method integrates the results from both semantic_search and keyword_search_bm25 to provide a more comprehensive set of relevant movies.
+        Filters are resolved to a set of movie ids through the indexed tables of the movie database and pushed down
+        into the vector store search, so the filter never scans the catalog.
 
         Args:
             query (str): The user's search query as a text string.
             top_k (int, optional): The number of top movies to return after hybrid search and filtering. Defaults to 10.
-            filters (dict, optional): Dictionary containing liked and disliked genres. Defaults to None.
+            filters (dict, optional): Features extracted by FeatureExtractor. Only the keys listed in config.ACTIVE_FILTERS are applied. Defaults to None.
 
         Returns:
-            list: A list of movie metadata dictionaries for the top_k movies that are relevant to the query,
-                  considering both semantic and keyword relevance, and filtered by genre if specified.
+            list: Movie ids of the top_k movies that are relevant to the query,
+                  considering both semantic and keyword relevance, and filtered if specified.
         """
-        
-        semantic_results_idx = self.semantic_search(query, top_k=top_k)
+        allowed_ids = None
+        if filters and self.movie_db is not None:
+            active_filters = {key: filters[key] for key in config.ACTIVE_FILTERS if key in filters}
+            with tracer.span("retrieval.filter", filters=sorted(active_filters)) as span:
+                allowed_ids = self.movie_db.filter_movie_ids(active_filters)
+                span.set(matches=None if allowed_ids is None else len(allowed_ids))
+            if allowed_ids is not None:
+                print(f"{len(allowed_ids)} movies match the filters.")
+
+        semantic_results_idx = self.semantic_search(query, top_k=top_k, allowed_ids=allowed_ids)
         keyword_results_idx = self.keyword_search_bm25(query, top_k=top_k)
 
-        hybrid_results_idx = np.unique(np.concatenate((semantic_results_idx, keyword_results_idx)))
-
-        filtered_results = []
-        if filters:
-            positive_genres = set(filters['liked_genres'])
-            negative_genres = set(filters['disliked_genres'])
-            liked_stars = set(filters['liked_stars'])
-            disliked_stars = set(filters['disliked_stars'])
-            liked_directors = set(filters['liked_directors'])
-            disliked_directors = set(filters['disliked_directors'])
-            liked_years = set(filters['liked_years'])
-            liked_rating = filters['liked_rating']
-
-            for idx in semantic_results_idx:
-                movie_metadata = self.metadata.iloc[idx]
-                movie_genres = set(movie_metadata["genres"].split(", "))  # Convert to set for faster lookup
-                movie_stars = set(movie_metadata["stars"].split(", "))  # Convert to set for faster lookup
-                movie_directors = set(movie_metadata["directors"].split(", "))  # Convert to set for faster lookup
-                movie_year = int(movie_metadata["year"])
-                movie_rating = float(movie_metadata["imdb_rating"])
-
-                if positive_genres and not any(p_genre in m_genre for p_genre in positive_genres for m_genre in movie_genres):
-                    print("Positive Genre Not Found in", movie_metadata["title"])
-                    print("Genres:", movie_genres)
-                    continue
-
-                if negative_genres and any(n_genre in m_genre for n_genre in negative_genres for m_genre in movie_genres):
-                    print("Negative Genre Found in", movie_metadata["title"])
-                    print("Genres:", movie_genres)
-                    continue
-                
-                # if liked_stars and not any(l_star in m_star for l_star in liked_stars for m_star in movie_stars):
-                #     print("Liked Star Not Found in", movie_metadata["title"])
-                #     print("Stars:", movie_stars)
-                #     continue
-
-                # if disliked_stars and any(d_star in m_star for d_star in disliked_stars for m_star in movie_stars):
-                #     print("Disliked Star Found in", movie_metadata["title"])
-                #     print("Stars:", movie_stars)
-                #     continue
-            
-                # if liked_directors and not any(l_director in m_director for l_director in liked_directors for m_director in movie_directors):
-                #     print("Liked Director Not Found in", movie_metadata["title"])
-                #     print("Directors:", movie_directors)
-                #     continue
-
-                # if disliked_directors and any(d_director in m_director for d_director in disliked_directors for m_director in movie_directors):
-                #     print("Disliked Director Found in", movie_metadata["title"])
-                #     print("Directors:", movie_directors)
-                #     continue
-
-                # if liked_years[0]:
-                #     if liked_years[0] > movie_year:
-                #         print(f"Year {movie_year} is not in the liked years list.")
-                #         continue
-                # if liked_years[1]:
-                #     if movie_year > liked_years[1]:
-                #         print(f"Year {movie_year} is not in the liked years list.")
-                #         continue
-
-                # if liked_rating and movie_rating < liked_rating:
-                #     print(f"Movie Rating is less than the liked rating. It is {movie_year}.")
-                #     continue
-
-                filtered_results.append(movie_metadata)
-        else:
-            filtered_results = [self.metadata.iloc[idx] for idx in hybrid_results_idx]
+        if allowed_ids is not None:
+            keyword_results_idx = [idx for idx in keyword_results_idx if int(idx) in allowed_ids]
+
+        # Semantic results first, then keyword results that were not found semantically
+        hybrid_results_idx = dict.fromkeys(int(idx) for idx in np.concatenate((semantic_results_idx, keyword_results_idx)))
 
-        return filtered_results[:top_k]
+        return list(hybrid_results_idx)[:top_k]
+
+    def similar(self, movie_id, k=10, filters=None):
+        """
+        Returns the movies most similar to a movie from the precomputed neighbour graph, without any search.
+
+        Only the stored neighbours are considered, so strict filters may return fewer than k movies.
+
+        Args:
+            movie_id (int): The movie id.
+            k (int, optional): Number of similar movies to return. Defaults to 10.
+            filters (dict, optional): Features extracted by FeatureExtractor. Only the keys listed in config.ACTIVE_FILTERS are applied. Defaults to None.
+
+        Returns:
+            list: Movie ids of the most similar movies, most similar first. Empty if the movie is not in the graph.
+
+        Raises:
+            RuntimeError: If no neighbour graph is loaded.
+        """
+        if self.neighbour_graph is None:
+            raise RuntimeError("No neighbour graph loaded, please rerun the data preprocessing script.")
+
+        active_filters = {key: filters[key] for key in config.ACTIVE_FILTERS if key in filters} if filters else {}
+        with tracer.span("retrieval.similar", k=k, filters=sorted(active_filters)) as span:
+            ids, _ = self.neighbour_graph.similar(int(movie_id), None if active_filters else k)
+            ids = [int(i) for i in ids]
+            if active_filters:
+                ids = [movie["id"] for movie in self.catalog.project(ids, FILTER_FIELDS) if matches_filters(movie, active_filters)]
+            span.set(results=min(len(ids), k))
+            return ids[:k]
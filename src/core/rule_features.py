@@ -0,0 +1,363 @@
+import difflib
+import re
+import unicodedata
+from collections import deque
+
+# Genre words that differ from the catalog genre names, resolved only if the target genre is in the vocabulary
+GENRE_ALIASES = {
+    "funny": ["comedy"], "comic": ["comedy"], "comedic": ["comedy"], "hilarious": ["comedy"],
+    "rom com": ["romance", "comedy"], "romcom": ["romance", "comedy"],
+    "scary": ["horror"], "creepy": ["horror"], "slasher": ["horror"],
+    "romantic": ["romance"],
+    "animated": ["animation"], "cartoon": ["animation"], "anime": ["animation"],
+    "science fiction": ["sci-fi"], "sci fi": ["sci-fi"], "scifi": ["sci-fi"],
+    "noir": ["film-noir"], "film noir": ["film-noir"],
+    "biopic": ["biography"], "biographical": ["biography"],
+    "historical": ["history"], "sports": ["sport"], "musicals": ["musical"],
+    "documentary": ["documentary"], "docs": ["documentary"],
+    "suspense": ["thriller"], "mysterious": ["mystery"], "criminal": ["crime"],
+    "kids": ["family"], "family friendly": ["family"], "magic": ["fantasy"],
+}
+
+# Words carrying no feature, ignored when measuring how much of the query was understood
+FILLER_WORDS = set("""
+a an the i im i m me my we us you your it its this that these those some any something anything one ones
+want wanna would like love loves liked enjoy enjoys prefer really very much more most also too just only please
+to of in on at by for from with about and or but so as be is are was were been being am do does did have has had
+can could should will shall may might must get give show find recommend recommendation recommendations suggest
+watch watching see looking look need feel mood tonight today night good great best nice fun top well
+movie movies film films flick flicks picture pictures cinema title titles genre genres kind type sort
+star stars starring actor actors actress actresses director directors directed featuring played plays acting
+year years old new release released made era decade decades rating rated ratings score imdb above over least
+than higher greater min minimum not no dont don t never dislike dislikes hate hates without avoid
+except nothing none skip excluding either nor anything but everything all other
+""".split())
+
+# Negations, possibly followed by a liking verb ("don't like"), and liking cues. The last cue before a
+# feature in its clause decides whether the feature is liked or disliked. "like" used as a preposition
+# ("directors like ...") is no cue.
+CUE_PATTERN = re.compile(
+    r"\b(?P<neutral>(?:directors?|actors?|actress(?:es)?|stars?|movies?|films?|ones|something|anything|people) like"
+    r"|such as|similar to)\b"
+    r"|\b(?P<negative>(?:not|no|never|don ?t|doesn ?t|didn ?t|do not|does not|can ?t stand|cannot stand|won ?t)"
+    r"(?:\s+(?:really\s+)?(?:like|love|enjoy|want|into|fan of|care for))?"
+    r"|dislikes?|hates?|without|avoid|except|excluding|skip|nothing|anything but|nor)\b"
+    r"|\b(?P<positive>like|likes|love|loves|enjoy|enjoys|want|prefer|fan of|into|adore|with|starring|featuring|by)\b")
+# Clauses end at sentence punctuation and at contrasting conjunctions, "anything but" excepted
+CLAUSE_PATTERN = re.compile(r"[.;!?,]|(?<!anything )(?<!everything )\bbut\b|\bhowever\b|\bwhereas\b|\bwhile\b")
+
+DECADE_WORDS = {"twenties": 2, "thirties": 3, "forties": 4, "fifties": 5, "sixties": 6, "seventies": 7,
+                "eighties": 8, "nineties": 9}
+YEAR = r"((?:19|20)\d\d)"
+DECADE_PATTERN = re.compile(
+    r"(?:\b(?P<part>early|mid|late)[\s-]*)?(?:\b(?P<century>19|20)|'|\b)(?P<decade>\d)0 ?s\b"
+    r"|\b(?:(?P<word_part>early|mid|late)[\s-]*)?(?P<word>" + "|".join(DECADE_WORDS) + r")\b")
+YEAR_RANGE_PATTERN = re.compile(r"\b(?:from |between )?" + YEAR + r"s?\s*(?:-|–|to|and|until|till|through)\s*" + YEAR + r"\b")
+YEAR_AFTER_PATTERN = re.compile(
+    r"\b(?:after|since|post|newer than|later than)\s*-?\s*" + YEAR + r"\b"
+    r"|\b" + YEAR + r"\s*(?:onwards?|and later|or later|and after|or newer|and newer)\b")
+YEAR_BEFORE_PATTERN = re.compile(
+    r"\b(?:before|until|till|up to|pre|older than|earlier than|prior to)\s*-?\s*" + YEAR + r"\b"
+    r"|\b" + YEAR + r"\s*(?:or earlier|and earlier|and before|or older|and older)\b")
+YEAR_SINGLE_PATTERN = re.compile(r"\b(?:in|of|from|released in)\s+" + YEAR + r"\b")
+
+RATING = r"(10(?:\.0+)?|\d(?:\.\d+)?)"
+RATING_PATTERNS = [
+    re.compile(r"\+\s*" + RATING + r"\b"),
+    re.compile(r"\b" + RATING + r"\s*\+"),
+    re.compile(r"\b" + RATING + r"\s*/\s*10\b"),
+    re.compile(r"\b(?:above|over|at ?least|more than|higher than|greater than|min(?:imum)?(?: of)?|not (?:below|under|less than))\s*"
+               r"(?:a |an )?(?:rating |score |imdb )?(?:of )?" + RATING + r"(?!\s*(?:min|minutes|hours?|h\b|s\b|\d|%))\b"),
+    re.compile(r"(?:>=?|≥)\s*" + RATING + r"\b"),
+    re.compile(r"\b(?:rat(?:ed|ing)|imdb|score)\s*(?:of |is |should be )?" + RATING + r"\b(?!\s*(?:min|minutes|hours?|s\b))"),
+]
+
+def fold(text):
+    """
+    Lowercases text and strips its accents, so that "Almodóvar" matches "almodovar".
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        str: The folded text with collapsed whitespace.
+    """
+    text = unicodedata.normalize("NFKD", str(text))
+    return " ".join("".join(c for c in text if not unicodedata.combining(c)).casefold().split())
+
+def words_only(text):
+    """Replaces the characters that are not letters or digits by spaces, keeping the positions."""
+    return "".join(c if c.isalnum() else " " for c in text)
+
+def name_key(name):
+    """Normalizes a name for gazetteer lookups: folded, punctuation removed."""
+    return " ".join(words_only(fold(name)).split())
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton finding all the occurrences of many keywords in one pass over a text.
+    """
+    def __init__(self, keywords):
+        """
+        Builds the automaton.
+
+        Args:
+            keywords (dict): Values to report keyed by keyword.
+        """
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for keyword, value in keywords.items():
+            if keyword:
+                self._add(keyword, value)
+        self._build()
+
+    def _add(self, keyword, value):
+        """Adds the path of a keyword to the trie."""
+        node = 0
+        for char in keyword:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][char] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = child
+        self._output[node].append((len(keyword), value))
+
+    def _build(self):
+        """Computes the failure links breadth first and merges the outputs along them."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def __len__(self):
+        return len(self._goto) - 1
+
+    def find(self, text):
+        """
+        Finds all the keyword occurrences, overlapping ones included.
+
+        Args:
+            text (str): The text to scan.
+
+        Yields:
+            tuple: (start, end, value) of each occurrence.
+        """
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for length, value in self._output[node]:
+                yield position + 1 - length, position + 1, value
+
+    def find_words(self, text):
+        """
+        Finds the keyword occurrences made of whole words, longest first, without overlaps.
+
+        Args:
+            text (str): The text to scan, with words separated by spaces.
+
+        Returns:
+            list: (start, end, value) of each occurrence, in text order.
+        """
+        matches = [(start, end, value) for start, end, value in self.find(text)
+                   if (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())]
+        matches.sort(key=lambda match: (match[0] - match[1], match[0]))
+        taken, kept = [False] * len(text), []
+        for start, end, value in matches:
+            if not any(taken[start:end]):
+                taken[start:end] = [True] * (end - start)
+                kept.append((start, end, value))
+        return sorted(kept, key=lambda match: match[0])
+
+class RuleFeatureExtractor:
+    """
+    Extracts the query features with regular expressions and dictionaries, without a language model.
+
+    Decades, year ranges and ratings are read with regular expressions, genres are matched against the
+    catalog genres, tolerating plurals and typos, and star and director names are found with an
+    Aho-Corasick gazetteer. The confidence is the share of the meaningful query words explained by the
+    extracted features, so queries with plot descriptions or unknown names can be sent to the language model.
+    """
+    def __init__(self, genres, stars=(), directors=(), fuzzy_cutoff=0.88):
+        """
+        Initializes the RuleFeatureExtractor.
+
+        Args:
+            genres (list): Catalog genre names.
+            stars (iterable, optional): Catalog star names. Defaults to ().
+            directors (iterable, optional): Catalog director names. Defaults to ().
+            fuzzy_cutoff (float, optional): Minimum difflib similarity of a misspelled genre. Defaults to 0.88.
+        """
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.genres = {name_key(genre): genre for genre in genres}
+        genre_keys = dict(self.genres)
+        for genre in self.genres.values():
+            # "sci-fi" is also written "sci fi" and "scifi"
+            genre_keys.setdefault(name_key(genre).replace(" ", ""), genre)
+        for alias, targets in GENRE_ALIASES.items():
+            resolved = [self.genres[name_key(target)] for target in targets if name_key(target) in self.genres]
+            if len(resolved) == len(targets):
+                genre_keys.setdefault(alias, resolved if len(resolved) > 1 else resolved[0])
+        self.genre_keys = genre_keys
+
+        people = {}
+        for kind, names in (("stars", stars), ("directors", directors)):
+            for name in names:
+                key = name_key(name)
+                # Single word names would match common words
+                if " " in key:
+                    people.setdefault(key, []).append((kind, name))
+        self.gazetteer = AhoCorasick(people)
+
+    def _genre(self, word):
+        """Resolves a query word to catalog genres, or returns None."""
+        candidates = [word]
+        if word.endswith("ies"):
+            candidates.append(word[:-3] + "y")
+        if word.endswith("s"):
+            candidates.append(word[:-1])
+        for candidate in candidates:
+            if candidate in self.genre_keys:
+                genre = self.genre_keys[candidate]
+                return genre if isinstance(genre, list) else [genre]
+        if len(word) >= 5:
+            close = difflib.get_close_matches(word, self.genre_keys.keys(), n=1, cutoff=self.fuzzy_cutoff)
+            if close:
+                genre = self.genre_keys[close[0]]
+                return genre if isinstance(genre, list) else [genre]
+        return None
+
+    def _years(self, text):
+        """Returns the year range of the query as [start, end] with False placeholders, and its span."""
+        match = YEAR_RANGE_PATTERN.search(text)
+        if match:
+            start, end = sorted(int(year) for year in match.groups())
+            return [start, end], match.span()
+        match = DECADE_PATTERN.search(text)
+        if match:
+            if match.group("word"):
+                decade, part = DECADE_WORDS[match.group("word")], match.group("word_part")
+                start = 1900 + decade * 10
+            else:
+                decade, part = int(match.group("decade")), match.group("part")
+                century = match.group("century") or ("19" if decade >= 3 else "20")
+                start = int(f"{century}{decade}0")
+            first, last = {"early": (0, 3), "mid": (3, 6), "late": (6, 9)}.get(part, (0, 9))
+            return [start + first, start + last], match.span()
+        for pattern, placeholder in ((YEAR_AFTER_PATTERN, 1), (YEAR_BEFORE_PATTERN, 0)):
+            match = pattern.search(text)
+            if match:
+                year = int(next(group for group in match.groups() if group))
+                return ([year, False] if placeholder else [False, year]), match.span()
+        match = YEAR_SINGLE_PATTERN.search(text)
+        if match:
+            year = int(match.group(1))
+            return [year, year], match.span()
+        return [], None
+
+    def _rating(self, text):
+        """Returns the minimum rating of the query and its span, or (0.0, None)."""
+        for pattern in RATING_PATTERNS:
+            match = pattern.search(text)
+            if match:
+                return float(match.group(1)), match.span()
+        return 0.0, None
+
+    def _polarity(self, text, plain, position):
+        """Tells whether the feature starting at a position is disliked, from the cues before it in its clause."""
+        clause_start = 0
+        for boundary in CLAUSE_PATTERN.finditer(text, 0, position):
+            clause_start = boundary.end()
+        cues = [cue for cue in CUE_PATTERN.finditer(plain, clause_start, position) if cue.group("neutral") is None]
+        # Negations carry over the features listed after them: "no horror or thriller"
+        return bool(cues) and cues[-1].group("negative") is not None
+
+    def extract(self, query):
+        """
+        Extracts the features of a user query.
+
+        Args:
+            query (str): The user's query expressing their movie preferences.
+
+        Returns:
+            tuple: (features, confidence) with the features in the shape returned by the language model
+                   (liked/disliked genres, stars and directors, liked_years, liked_rating), and the
+                   confidence between 0 and 1.
+        """
+        text = fold(query)
+        plain = words_only(text)
+        covered = [False] * len(text)
+        features = {
+            "liked_genres": [], "disliked_genres": [],
+            "liked_stars": [], "disliked_stars": [],
+            "liked_directors": [], "disliked_directors": [],
+            "liked_years": [], "liked_rating": 0.0,
+        }
+
+        def add(key, value):
+            if value not in features[key]:
+                features[key].append(value)
+
+        def cover(span):
+            covered[span[0]:span[1]] = [True] * (span[1] - span[0])
+
+        found = 0
+        for start, end, entries in self.gazetteer.find_words(plain):
+            prefix = "disliked" if self._polarity(text, plain, start) else "liked"
+            for kind, name in entries:
+                add(f"{prefix}_{kind}", name)
+            cover((start, end))
+            found += 1
+
+        features["liked_years"], span = self._years(text)
+        if span:
+            cover(span)
+            found += 1
+        features["liked_rating"], span = self._rating(text)
+        if span:
+            cover(span)
+            found += 1
+
+        words = [(match.start(), match.end(), match.group()) for match in re.finditer(r"[^\W_]+", plain)]
+        # Two word genres and aliases first ("science fiction", "rom com"), then single words
+        index = 0
+        while index < len(words):
+            start, end, word = words[index]
+            if covered[start]:
+                index += 1
+                continue
+            genres, length = None, 1
+            if index + 1 < len(words) and not covered[words[index + 1][0]]:
+                pair = f"{word} {words[index + 1][2]}"
+                genres = self.genre_keys.get(pair)
+                genres, length = ([genres] if isinstance(genres, str) else genres), 2
+            if not genres:
+                genres, length = self._genre(word), 1
+            if genres:
+                span_end = words[index + length - 1][1]
+                prefix = "disliked" if self._polarity(text, plain, start) else "liked"
+                for genre in genres:
+                    add(f"{prefix}_genres", genre)
+                cover((start, span_end))
+                found += 1
+            index += length if genres else 1
+
+        if not found:
+            return features, 0.0
+        content = [(start, word) for start, _, word in words if word not in FILLER_WORDS]
+        if not content:
+            return features, 1.0
+        explained = sum(1 for start, _ in content if covered[start])
+        return features, explained / len(content)
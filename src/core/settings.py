@@ -0,0 +1,43 @@
+import json
+import os
+
+import config
+
+def load_retrieval_settings(path=None):
+    """
+    Loads the tuned retrieval settings, falling back to the defaults of config.py for missing keys.
+
+    Args:
+        path (str, optional): Settings file written by the parameter sweep. Defaults to config.RETRIEVAL_SETTINGS_PATH.
+
+    Returns:
+        dict: top_k, overfetch, rerank_depth, rating_weight, vector_store and vector_store_params.
+    """
+    path = path or config.RETRIEVAL_SETTINGS_PATH
+    settings = json.loads(json.dumps(config.RETRIEVAL_SETTINGS))
+
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            saved = json.load(f)
+        unknown = set(saved) - set(settings)
+        if unknown:
+            print(f"Ignoring unknown retrieval settings in {path}: {', '.join(sorted(unknown))}")
+        settings.update({key: value for key, value in saved.items() if key in settings})
+
+    if settings["rerank_depth"] < settings["top_k"]:
+        settings["rerank_depth"] = settings["top_k"]
+    return settings
+
+def save_retrieval_settings(settings, path=None):
+    """
+    Writes retrieval settings for the app and the API to load at startup.
+
+    Args:
+        settings (dict): Settings with the keys of config.RETRIEVAL_SETTINGS.
+        path (str, optional): Settings file. Defaults to config.RETRIEVAL_SETTINGS_PATH.
+    """
+    path = path or config.RETRIEVAL_SETTINGS_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({key: settings[key] for key in config.RETRIEVAL_SETTINGS}, f, indent=4)
+    print(f"Retrieval settings saved to {path}")
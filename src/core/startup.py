@@ -0,0 +1,191 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from src.core.catalog import Catalog
+from src.core.feature_extractor import FeatureExtractor
+from src.core.generation import RecommendationGenerator
+from src.core.hyde import Hyde
+from src.core.reranking import Reranker
+from src.core.retrieval import HybridRetriever
+from src.core.settings import load_retrieval_settings
+from src.database.catalog_snapshot import CatalogSnapshot
+from src.database.db_manager import MovieDatabase
+from src.database.embedding_store import EmbeddingStore
+from src.database.neighbour_graph import NeighbourGraph
+from src.database.vector_store import load_vector_store
+
+WARMUP_TEXT = "A warmup query about a movie."
+
+def build_snapshot(components):
+    """Memory-maps the catalog snapshot."""
+    return CatalogSnapshot.open()
+
+def build_catalog(components):
+    """Builds the id-indexed catalog from the snapshot."""
+    return Catalog.from_snapshot(components["snapshot"])
+
+def build_feature_extractor(components):
+    """Creates the feature extractor with the catalog genres, stars and directors."""
+    vocabulary = components["snapshot"].vocabulary
+    return FeatureExtractor(vocabulary.get("genres", []), stars=vocabulary.get("stars", []),
+                            directors=vocabulary.get("directors", []))
+
+def build_hyde(components):
+    """Creates the HyDE generator."""
+    return Hyde()
+
+def load_neighbour_graph():
+    """Opens the precomputed neighbour graph, or returns None if preprocessing did not build one."""
+    try:
+        return NeighbourGraph.open(config.NEIGHBOUR_GRAPH["path"])
+    except FileNotFoundError:
+        print("No neighbour graph found, similar movies are disabled.")
+        return None
+
+def build_retriever(components):
+    """Loads the embedding model, the vector store, the keyword index and the neighbour graph, then runs one search."""
+    settings = load_retrieval_settings()
+    vector_store = load_vector_store(f"data/vector_stores/{settings['vector_store']}")
+    # Only query-time parameters can change without rebuilding the index
+    for name, value in settings["vector_store_params"].items():
+        if hasattr(vector_store, name):
+            setattr(vector_store, name, value)
+
+    retriever = HybridRetriever(
+        vector_store=vector_store,
+        catalog=components["catalog"],
+        embedding_store=EmbeddingStore.open(),
+        keyword_backend=config.KEYWORD_BACKEND,
+        # Shared across threads for filter queries and the FTS keyword backend
+        movie_db=MovieDatabase(check_same_thread=False),
+        overfetch=settings["overfetch"],
+        neighbour_graph=load_neighbour_graph()
+    )
+    # Pay the first-inference costs (allocations, lazy initialization) before the first user does
+    retriever.hybrid_search(WARMUP_TEXT, top_k=1)
+    return retriever
+
+def build_reranker(components):
+    """Loads the cross-encoder and runs one prediction."""
+    reranker = Reranker(components["catalog"])
+    reranker.model.predict([(WARMUP_TEXT, WARMUP_TEXT)])
+    return reranker
+
+def build_generator(components):
+    """Creates the recommendation generator."""
+    return RecommendationGenerator(components["catalog"])
+
+# Component name -> (builder, names of the components it needs)
+STARTUP_STAGES = {
+    "snapshot": (build_snapshot, []),
+    "catalog": (build_catalog, ["snapshot"]),
+    "feature_extractor": (build_feature_extractor, ["snapshot"]),
+    "hyde": (build_hyde, []),
+    "retriever": (build_retriever, ["catalog"]),
+    "reranker": (build_reranker, ["catalog"]),
+    "generator": (build_generator, ["catalog"]),
+}
+
+class StartupOrchestrator:
+    """
+    Loads the pipeline components concurrently on a thread pool.
+
+    Every component starts as soon as the components it depends on are ready, so the two transformer models,
+    the keyword index and the catalog load in parallel. Callers block only on the components they need.
+    """
+    def __init__(self, stages=STARTUP_STAGES, max_workers=None):
+        """
+        Initializes the StartupOrchestrator.
+
+        Args:
+            stages (dict, optional): Component name -> (builder, dependencies). Defaults to STARTUP_STAGES.
+            max_workers (int, optional): Size of the thread pool. Defaults to one thread per component.
+        """
+        self.stages = stages
+        self.components = {}
+        self.timings = {}
+        self.errors = {}
+        self._ready = {name: threading.Event() for name in stages}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or len(stages), thread_name_prefix="startup")
+        self.started_at = None
+
+    def start(self):
+        """
+        Submits every component to the thread pool and returns immediately.
+
+        Returns:
+            StartupOrchestrator: self, to allow `StartupOrchestrator().start()`.
+        """
+        self.started_at = time.perf_counter()
+        for name in self.stages:
+            self._executor.submit(self._load, name)
+        self._executor.shutdown(wait=False)
+        return self
+
+    def _load(self, name):
+        """Waits for the dependencies of a component, builds it and records its load time."""
+        builder, dependencies = self.stages[name]
+        try:
+            for dependency in dependencies:
+                self.get(dependency)
+            start = time.perf_counter()
+            self.components[name] = builder(self.components)
+            self.timings[name] = time.perf_counter() - start
+            print(f"{name} loaded in {self.timings[name]:.2f}s.")
+        except Exception as e:
+            self.errors[name] = e
+            print(f"Failed to load {name}: {e}")
+        finally:
+            self._ready[name].set()
+
+    def ready(self, name):
+        """
+        Checks whether a component finished loading (successfully or not).
+
+        Args:
+            name (str): Component name.
+
+        Returns:
+            bool: True if the component is done loading.
+        """
+        return self._ready[name].is_set()
+
+    def get(self, name, timeout=None):
+        """
+        Returns a component, waiting for it to load if needed.
+
+        Args:
+            name (str): Component name.
+            timeout (float, optional): Maximum number of seconds to wait. Defaults to None (wait forever).
+
+        Returns:
+            Any: The loaded component.
+
+        Raises:
+            TimeoutError: If the component is not ready within the timeout.
+            RuntimeError: If the component, or one of its dependencies, failed to load.
+        """
+        if not self._ready[name].wait(timeout):
+            raise TimeoutError(f"{name} is still loading.")
+        if name in self.errors:
+            raise RuntimeError(f"{name} failed to load: {self.errors[name]}") from self.errors[name]
+        return self.components[name]
+
+    def status(self):
+        """
+        Describes the state of every component.
+
+        Returns:
+            dict: Component name -> "loading", "failed" or the load time in seconds.
+        """
+        status = {}
+        for name in self.stages:
+            if not self.ready(name):
+                status[name] = "loading"
+            elif name in self.errors:
+                status[name] = "failed"
+            else:
+                status[name] = round(self.timings[name], 2)
+        return status
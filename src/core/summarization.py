@@ -1,8 +1,8 @@
 import config
-import src.llm.google_gemini as llm
+from src.llm.provider import create_llm
 
 # Initialize the Gemini model for summarization
-model = llm.Gemini(config.SUMMARY_MODEL)
+model = create_llm(config.SUMMARY_MODEL)
 
 def summarize_movie_text(row):
     """
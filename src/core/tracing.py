@@ -0,0 +1,314 @@
+import contextvars
+import glob
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import config
+
+# Upper bounds of the latency histogram buckets, in seconds
+HISTOGRAM_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+logger = logging.getLogger("tracing")
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+class Span:
+    """
+    One timed operation of a trace, e.g. the cross-encoder call inside the rerank stage.
+    """
+    def __init__(self, name, trace, parent_id=None, attributes=None):
+        """
+        Initializes the Span.
+
+        Args:
+            name (str): Name of the operation, e.g. "retrieval.vector_search".
+            trace (Trace): The trace the span belongs to.
+            parent_id (str, optional): Id of the enclosing span. Defaults to None for the root span.
+            attributes (dict, optional): Extra information such as the model name or result counts. Defaults to None.
+        """
+        self.name = name
+        self.trace = trace
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.start = time.time()
+        self._perf_start = time.perf_counter()
+        self.duration = None
+        self.error = None
+
+    @property
+    def end(self):
+        """float: End timestamp, None while the span is open."""
+        return None if self.duration is None else self.start + self.duration
+
+    def set(self, **attributes):
+        """Adds attributes to the span."""
+        self.attributes.update(attributes)
+
+    def finish(self):
+        """Closes the span."""
+        self.duration = time.perf_counter() - self._perf_start
+
+    def to_dict(self):
+        """
+        Serializes the span.
+
+        Returns:
+            dict: The span fields, with times in seconds since the epoch.
+        """
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "end": self.end,
+            "duration_ms": None if self.duration is None else self.duration * 1000,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+class Trace:
+    """
+    All spans recorded while handling one query.
+    """
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, span):
+        """Registers a span, spans may be opened from several threads."""
+        with self._lock:
+            self.spans.append(span)
+
+    @property
+    def root(self):
+        """Span: The first span of the trace."""
+        return self.spans[0] if self.spans else None
+
+    def waterfall(self):
+        """
+        Lists the finished spans with offsets relative to the start of the trace.
+
+        Returns:
+            list: Dictionaries with name, depth, start_ms, end_ms and duration_ms, in start order.
+        """
+        if not self.spans:
+            return []
+
+        depth = {}
+        rows = []
+        origin = self.root.start
+        for span in sorted(self.spans, key=lambda s: s.start):
+            depth[span.span_id] = depth.get(span.parent_id, -1) + 1
+            if span.duration is None:
+                continue
+            rows.append({
+                "name": span.name,
+                "depth": depth[span.span_id],
+                "start_ms": (span.start - origin) * 1000,
+                "end_ms": (span.end - origin) * 1000,
+                "duration_ms": span.duration * 1000,
+            })
+        return rows
+
+class Histogram:
+    """
+    Cumulative latency histogram rendered in the Prometheus text format.
+    """
+    def __init__(self, buckets=HISTOGRAM_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """Records one observation in seconds."""
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def to_dict(self):
+        """Serializes the histogram for the histogram files shared between worker processes."""
+        return {"buckets": list(self.buckets), "counts": self.counts, "count": self.count, "sum": self.sum}
+
+    def merge(self, data):
+        """Adds the observations of a serialized histogram with the same buckets."""
+        self.counts = [count + other for count, other in zip(self.counts, data["counts"])]
+        self.count += data["count"]
+        self.sum += data["sum"]
+
+def reset_shared_histograms(directory):
+    """
+    Deletes the histogram files left in a shared directory by a previous run of the service.
+
+    Args:
+        directory (str): Directory passed to `Tracer.share_histograms`.
+    """
+    for path in glob.glob(os.path.join(directory, "histograms_*.json")):
+        os.remove(path)
+
+class Tracer:
+    """
+    Records spans, exports finished traces as JSON log lines and keeps per-span latency histograms.
+    """
+    def __init__(self, log_path=None):
+        """
+        Initializes the Tracer.
+
+        Args:
+            log_path (str, optional): JSON lines file receiving one line per finished span, created with its directory
+                                      when the first span finishes. Defaults to None (use the "tracing" logger handlers only).
+        """
+        self.log_path = log_path
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self._log_handler = None
+        self._shared_dir = None
+        self._flush_interval = 1.0
+        self._flushed_at = 0.0
+
+    def _open_log(self):
+        """Attaches the JSON lines file to the "tracing" logger, deferred so importing a module writes nothing."""
+        with self._lock:
+            if self._log_handler is not None:
+                return
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            self._log_handler = logging.FileHandler(self.log_path)
+            self._log_handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(self._log_handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+
+    def share_histograms(self, directory, flush_interval=1.0):
+        """
+        Writes the histograms of this process to a directory shared with the other worker processes.
+
+        `render_prometheus` then sums the files of every worker, including the workers that exited, so the
+        counters of the service never go backwards. Called in each worker after it is forked, the histograms
+        start empty so spans recorded by the parent are not counted once per worker.
+
+        Args:
+            directory (str): Directory shared by the worker processes.
+            flush_interval (float, optional): Minimum seconds between two writes of the file. Defaults to 1.
+        """
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self.histograms = {}
+            self._shared_dir = directory
+            self._flush_interval = flush_interval
+            self._write_histograms()
+
+    def _write_histograms(self):
+        """Replaces the histogram file of this process, called with the lock held."""
+        path = os.path.join(self._shared_dir, f"histograms_{os.getpid()}.json")
+        with open(f"{path}.tmp", "w") as f:
+            json.dump({name: histogram.to_dict() for name, histogram in self.histograms.items()}, f)
+        os.replace(f"{path}.tmp", path)
+        self._flushed_at = time.monotonic()
+
+    def _shared_histograms(self):
+        """Sums the histogram files of all the worker processes, called with the lock held."""
+        histograms = {}
+        for path in glob.glob(os.path.join(self._shared_dir, "histograms_*.json")):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, histogram in data.items():
+                histograms.setdefault(name, Histogram(tuple(histogram["buckets"]))).merge(histogram)
+        return histograms
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """
+        Times a block of code as a child of the current span, or as the root of a new trace.
+
+        Args:
+            name (str): Name of the operation.
+            **attributes: Attributes recorded on the span.
+
+        Yields:
+            Span: The open span, use `span.set(...)` to add attributes.
+        """
+        parent = _current_span.get()
+        trace = parent.trace if parent else Trace()
+        span = Span(name, trace, parent.span_id if parent else None, attributes)
+        trace.add(span)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.finish()
+            _current_span.reset(token)
+            self._export(span)
+
+    def _export(self, span):
+        """Writes the span to the JSON log and records its duration."""
+        if self.log_path and self._log_handler is None:
+            self._open_log()
+        logger.info(json.dumps(span.to_dict(), default=str))
+        with self._lock:
+            self.histograms.setdefault(span.name, Histogram()).observe(span.duration)
+            if self._shared_dir and time.monotonic() - self._flushed_at >= self._flush_interval:
+                self._write_histograms()
+
+    def current_span(self):
+        """
+        Returns the running span.
+
+        Returns:
+            Span: The innermost open span of this thread, or None outside of any span.
+        """
+        return _current_span.get()
+
+    def current_trace(self):
+        """
+        Returns the trace of the running span.
+
+        Returns:
+            Trace: The current trace, or None outside of any span.
+        """
+        span = _current_span.get()
+        return span.trace if span else None
+
+    def render_prometheus(self):
+        """
+        Renders the latency histograms in the Prometheus text exposition format.
+
+        With `share_histograms`, the histograms of all the worker processes are summed.
+
+        Returns:
+            str: One `pipeline_span_duration_seconds` histogram per span name.
+        """
+        lines = [
+            "# HELP pipeline_span_duration_seconds Duration of the recommendation pipeline stages.",
+            "# TYPE pipeline_span_duration_seconds histogram",
+        ]
+        with self._lock:
+            histograms = self.histograms
+            if self._shared_dir:
+                self._write_histograms()
+                histograms = self._shared_histograms()
+            for name, histogram in sorted(histograms.items()):
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    lines.append(f'pipeline_span_duration_seconds_bucket{{span="{name}",le="{bound}"}} {count}')
+                lines.append(f'pipeline_span_duration_seconds_bucket{{span="{name}",le="+Inf"}} {histogram.count}')
+                lines.append(f'pipeline_span_duration_seconds_sum{{span="{name}"}} {histogram.sum}')
+                lines.append(f'pipeline_span_duration_seconds_count{{span="{name}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+# Process-wide tracer used by every component, the log file is only opened once a span finishes
+tracer = Tracer(log_path=config.TRACE_LOG_PATH)
@@ -1,18 +1,20 @@
 import sqlite3
 import pandas as pd
 from sentence_transformers import SentenceTransformer
-import faiss
-import numpy as np
 from src.core.summarization import summarize_movie_text
+from src.database.catalog_snapshot import CatalogSnapshot
+from src.database.db_manager import MovieDatabase
+from src.database.embedding_store import EmbeddingStore
+from src.database.neighbour_graph import NeighbourGraph
+from src.database.vector_store import VECTOR_STORES, create_vector_store
 import json
 import os
 import argparse
-from tqdm import tqdm
 import config
 
 # Argument Parser
 parser = argparse.ArgumentParser(description="Preprocess movie data and build vector database.")
-parser.add_argument('--vd', nargs='+', choices=['faiss', 'qdrant'], default=['faiss'], help='List of vector databases to build index for. Options: faiss, qdrant')
+parser.add_argument('--vd', nargs='+', choices=list(VECTOR_STORES), default=[config.VECTOR_STORE], help=f'List of vector databases to build index for. Options: {", ".join(VECTOR_STORES)}')
 args = parser.parse_args()
 
 # Database connection
@@ -56,35 +58,48 @@ df["generated_summary"] = combined_texts
 # Generate Embeddings
 print("Generating embeddings...")
 model = SentenceTransformer(config.EMBEDDING_MODEL)
-embeddings_list = []
-# Iterate over each row in the DataFrame
-for i, row in tqdm(df.iterrows(), total=len(df)):
-    text = str(row["genres"]) + ". " + str(row["stars"]) + ". " + str(row["directors"]) + ". " + str(row["generated_summary"])
-
-    embeddings_list.append(model.encode(text))
+texts = (df["genres"].astype(str) + ". " + df["stars"].astype(str) + ". " +
+         df["directors"].astype(str) + ". " + df["generated_summary"].astype(str)).tolist()
+embeddings = model.encode(texts, batch_size=64, show_progress_bar=True, convert_to_numpy=True)
 
-df["embeddings"] = embeddings_list
+# Save embeddings as a memory-mapped matrix aligned with the movie ids
+embedding_store = EmbeddingStore.write(ids=df["id"].to_numpy(),
+                                       embeddings=embeddings,
+                                       model_name=config.EMBEDDING_MODEL,
+                                       normalized=False)
+print(f"Saved {len(embedding_store)} embeddings of dimension {embedding_store.dim}.")
 
 vector_databases = args.vd
 print(f"Vector databases selected: {vector_databases}")
 
 print("Building Vector Database...")
 
-# Build FAISS index
-if str(vector_databases[0]).lower() == 'faiss':
-    # Build Vector Database
-    embeddings = np.array(df["embeddings"].tolist()).astype("float32")
-    index = faiss.IndexFlatL2(embeddings.shape[1])
-    index.add(embeddings)
-    faiss.write_index(index, "data/faiss_index.bin")
-elif vector_databases.lower() == 'qdrant':
-    pass
-else:
-    raise Exception("No existing vector database such as ", vector_databases)
-
-# Save processed data (for now, saving to a new db)
-conn_processed = sqlite3.connect('data/processed/movies_summaries.db')
-df.to_sql("movies_summaries", conn_processed, if_exists="replace", index=False)
-conn_processed.close()
+# Build every selected vector store from the embedding store, keyed by movie id
+vector_stores = {}
+for backend in vector_databases:
+    vector_store = create_vector_store(backend, embedding_store.dim)
+    vector_store.build(embedding_store.ids, embedding_store.embeddings)
+    vector_store.save()
+    vector_stores[backend] = vector_store
+    print(f" -> {backend} index saved to {vector_store.path} ({len(vector_store)} vectors).")
+
+# Precompute the "more like this" neighbours of every movie, with the approximate index on large catalogs if it was built
+print("Building neighbour graph...")
+neighbour_graph = NeighbourGraph.build(embedding_store,
+                                       k=config.NEIGHBOUR_GRAPH["k"],
+                                       block_size=config.NEIGHBOUR_GRAPH["block_size"],
+                                       vector_store=vector_stores.get(config.NEIGHBOUR_GRAPH["ann_backend"]),
+                                       ann_threshold=config.NEIGHBOUR_GRAPH["ann_threshold"],
+                                       path=config.NEIGHBOUR_GRAPH["path"])
+print(f" -> Neighbour graph saved to {neighbour_graph.path} ({len(neighbour_graph)} movies, {neighbour_graph.k} neighbours each).")
+
+# Save generated summaries next to the movies, triggers add them to the full-text index
+db = MovieDatabase()
+db.upsert_generated_summaries(zip(df["id"], df["generated_summary"]))
+
+# Write the columnar snapshot the app loads at startup
+snapshot = CatalogSnapshot.write(db)
+print(f"Catalog snapshot saved to {snapshot.path} ({len(snapshot)} movies).")
+db.close()
 
 print("Data preprocessing completed.")
@@ -0,0 +1,127 @@
+import json
+import os
+import time
+import pyarrow as pa
+
+from src.database.db_manager import SERVING_COLUMNS
+
+# Bump when the columns or the metadata of the snapshot change
+SNAPSHOT_VERSION = 1
+
+SNAPSHOT_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("title", pa.string()),
+    ("year", pa.int32()),
+    ("imdb_rating", pa.float32()),
+    ("metascore", pa.float32()),
+    ("pg_rating", pa.string()),
+    ("votes", pa.string()),
+    ("length", pa.string()),
+    ("plot", pa.string()),
+    ("directors", pa.string()),
+    ("stars", pa.string()),
+    ("genres", pa.string()),
+    ("link", pa.string()),
+    ("generated_summary", pa.string()),
+])
+
+def _to_number(value, cast):
+    """Converts scraped values such as "7.5" or "N/A" to numbers, None when they are not numeric."""
+    try:
+        return cast(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+class CatalogSnapshot:
+    """
+    Read-only columnar copy of the catalog used by the app.
+
+    The snapshot is an uncompressed Arrow IPC file holding only the serving columns and the generated summaries,
+    plus the genre, star and director vocabularies in its schema metadata. Opening it memory-maps the file,
+    so loading is a metadata read and every component shares the same buffers.
+    """
+    def __init__(self, table, path):
+        """
+        Initializes the CatalogSnapshot. Use `CatalogSnapshot.open` or `CatalogSnapshot.write` instead of calling this directly.
+
+        Args:
+            table (pa.Table): The catalog table.
+            path (str): Path of the snapshot file.
+        """
+        metadata = table.schema.metadata or {}
+        self.table = table
+        self.path = path
+        self.version = int(metadata.get(b"snapshot_version", b"0"))
+        self.created_at = float(metadata.get(b"created_at", b"0"))
+        self.vocabulary = json.loads(metadata.get(b"vocabulary", b"{}"))
+
+    def __len__(self):
+        return self.table.num_rows
+
+    @classmethod
+    def write(cls, movie_db, path="data/processed/catalog.arrow", batch_size=5000):
+        """
+        Streams the serving columns of the movie database into a new snapshot.
+
+        The file is written to a temporary path and renamed, so readers never see a partial snapshot.
+
+        Args:
+            movie_db (MovieDatabase): Source database.
+            path (str, optional): Path of the snapshot file. Defaults to "data/processed/catalog.arrow".
+            batch_size (int, optional): Rows per record batch. Defaults to 5000.
+
+        Returns:
+            CatalogSnapshot: The written snapshot, opened memory-mapped.
+        """
+        metadata = {
+            "snapshot_version": str(SNAPSHOT_VERSION),
+            "created_at": str(time.time()),
+            "vocabulary": json.dumps(movie_db.read_vocabulary()),
+        }
+        schema = SNAPSHOT_SCHEMA.with_metadata(metadata)
+
+        columns = ", ".join(f"m.{col}" for col in SERVING_COLUMNS)
+        rows = movie_db.conn.execute(f"""
+            SELECT {columns}, s.generated_summary
+            FROM movies m LEFT JOIN movies_summaries s ON s.id = m.id
+            ORDER BY m.id
+        """)
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temporary_path = path + ".tmp"
+        with pa.OSFile(temporary_path, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+            while True:
+                batch = rows.fetchmany(batch_size)
+                if not batch:
+                    break
+                values = dict(zip(schema.names, map(list, zip(*batch))))
+                values["year"] = [_to_number(v, int) for v in values["year"]]
+                values["imdb_rating"] = [_to_number(v, float) for v in values["imdb_rating"]]
+                values["metascore"] = [_to_number(v, float) for v in values["metascore"]]
+                writer.write_batch(pa.RecordBatch.from_pydict(values, schema=schema))
+        os.replace(temporary_path, path)
+
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path="data/processed/catalog.arrow"):
+        """
+        Memory-maps an existing snapshot.
+
+        Args:
+            path (str, optional): Path of the snapshot file. Defaults to "data/processed/catalog.arrow".
+
+        Returns:
+            CatalogSnapshot: The opened snapshot.
+
+        Raises:
+            ValueError: If the snapshot was written by another version of the code.
+        """
+        source = pa.memory_map(path, "r")
+        table = pa.ipc.open_file(source).read_all()
+
+        snapshot = cls(table, path)
+        if snapshot.version != SNAPSHOT_VERSION:
+            raise ValueError(f"Catalog snapshot {path} has version {snapshot.version}, expected {SNAPSHOT_VERSION}. "
+                             "Please rerun the data preprocessing script.")
+        return snapshot
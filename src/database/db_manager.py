@@ -1,19 +1,123 @@
+import re
 import sqlite3
-from typing import List, Dict, Optional, Any
+from collections import namedtuple
+from functools import lru_cache
+from typing import List, Dict, Iterable, Iterator, Optional, Any
+
+# Columns written by the scraper, in table order after the primary key
+MOVIE_COLUMNS = [
+    "title", "year", "imdb_rating", "metascore", "pg_rating", "votes", "length", "plot", "summary",
+    "synopsis", "directors", "stars", "genres", "review_title", "review_rating", "review_text", "link"
+]
+
+# Columns shown in the app and sent to the recommendation model (long texts such as reviews are left out)
+SERVING_COLUMNS = [
+    "id", "title", "year", "imdb_rating", "metascore", "pg_rating", "votes", "length", "plot",
+    "directors", "stars", "genres", "link"
+]
+
+IMDB_ID_PATTERN = re.compile(r"tt\d{7,8}")
+
+# Columns indexed by the movies_fts full-text table
+FTS_COLUMNS = ["title", "plot", "generated_summary", "stars", "directors"]
+
+# Relative bm25 weights of the FTS columns, title matches count the most
+FTS_WEIGHTS = (4.0, 1.0, 1.0, 2.0, 2.0)
+
+# Roles stored in the movie_people join table, mapped to the movies column they are split from
+PEOPLE_ROLES = {"star": "stars", "director": "directors"}
+
+# Maximum number of SQL variables per statement (SQLite's default limit is 999 on older builds)
+SQL_VARIABLE_LIMIT = 900
+
+def extract_imdb_id(link: Optional[str]) -> Optional[str]:
+    """
+    Extracts the IMDb title id (e.g. "tt0068646") from a movie link.
+
+    Args:
+        link (Optional[str]): The IMDb link of the movie.
+
+    Returns:
+        Optional[str]: The IMDb id, or None if the link does not contain one.
+    """
+    if not link:
+        return None
+    match = IMDB_ID_PATTERN.search(link)
+    return match.group() if match else None
+
+@lru_cache(maxsize=None)
+def movie_record_type(columns: tuple) -> type:
+    """
+    Returns the namedtuple type used for rows with the given columns.
+
+    Namedtuples have no per-instance dictionary, so records are much smaller than row dictionaries.
+    Types are cached so every query over the same columns shares one class.
+
+    Args:
+        columns (tuple): Column names of the rows.
+
+    Returns:
+        type: A namedtuple class named MovieRecord.
+    """
+    return namedtuple("MovieRecord", columns)
+
+def _check_columns(columns: List[str]) -> List[str]:
+    """Validates column names before they are interpolated into a query."""
+    unknown = [col for col in columns if col not in ["id", "imdb_id"] + MOVIE_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown movie columns: {', '.join(unknown)}")
+    return list(columns)
+
+def split_names(text: Optional[str]) -> List[str]:
+    """
+    Splits a comma-joined list such as "Drama, Crime" into names, skipping placeholders.
+
+    Args:
+        text (Optional[str]): Comma-joined names as stored in the movies table.
+
+    Returns:
+        List[str]: The unique names in their original order.
+    """
+    if not text or text == "N/A":
+        return []
+    return list(dict.fromkeys(name.strip() for name in str(text).split(",") if name.strip()))
+
+def _fts_tokens(text: str) -> List[str]:
+    """Splits free text into FTS5 tokens, quoted so that user input is never parsed as query syntax."""
+    return ['"' + token + '"' for token in re.findall(r"\w+", text.lower())]
 
 class MovieDatabase:
     """Handles database operations for movies."""
 
-    def __init__(self, db_filename: str = 'data/processed/movies.db'):
+    def __init__(self, db_filename: str = 'data/processed/movies.db', check_same_thread: bool = True):
         """
         Initializes the MovieDatabase class.
 
         Args:
             db_filename (str): The name of the SQLite database file.
+            check_same_thread (bool): Set to False to share the connection across threads (e.g. the Streamlit app).
         """
-        self.conn = sqlite3.connect(db_filename)
+        self.conn = sqlite3.connect(db_filename, check_same_thread=check_same_thread)
         self.cursor = self.conn.cursor()
+        self._configure_connection()
         self._create_movie_table()
+        self._migrate_movie_table()
+        self._create_summary_table()
+        self._create_fts_table()
+        self._create_normalized_tables()
+
+    def _configure_connection(self) -> None:
+        """Sets the journaling mode and pragmas used for bulk loads and concurrent readers."""
+        # WAL lets readers (the app) run while the scraper writes
+        self.cursor.execute("PRAGMA journal_mode = WAL")
+        # NORMAL is durable across application crashes in WAL mode and avoids an fsync per commit
+        self.cursor.execute("PRAGMA synchronous = NORMAL")
+        self.cursor.execute("PRAGMA temp_store = MEMORY")
+        self.cursor.execute("PRAGMA foreign_keys = ON")
+        # Negative values are in KiB, i.e. a 64 MiB page cache
+        self.cursor.execute("PRAGMA cache_size = -65536")
+        self.cursor.execute("PRAGMA mmap_size = 268435456")
+        self.conn.create_function("extract_imdb_id", 1, extract_imdb_id, deterministic=True)
 
     def _create_movie_table(self) -> None:
         """Creates the movies table if it doesn't exist."""
@@ -36,50 +140,427 @@ class MovieDatabase:
                 review_title TEXT,
                 review_rating INTEGER,
                 review_text TEXT,
-                link TEXT
+                link TEXT,
+                imdb_id TEXT
             )
         ''')
         self.conn.commit()
 
-    def insert_movie_data(self, movie_data: Dict[str, Optional[str]]) -> None:
+    def _migrate_movie_table(self) -> None:
+        """Adds the imdb_id column to older databases and creates the indexes."""
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_movies_imdb_id'")
+        if self.cursor.fetchone() is None:
+            self.cursor.execute("PRAGMA table_info(movies)")
+            columns = {row[1] for row in self.cursor.fetchall()}
+
+            with self.conn:
+                if "imdb_id" not in columns:
+                    self.cursor.execute("ALTER TABLE movies ADD COLUMN imdb_id TEXT")
+
+                self.cursor.execute("UPDATE movies SET imdb_id = extract_imdb_id(link) WHERE imdb_id IS NULL")
+
+                # Older databases may hold duplicates, keep the first row of each IMDb id
+                self.cursor.execute('''
+                    DELETE FROM movies
+                    WHERE imdb_id IS NOT NULL
+                    AND id NOT IN (SELECT MIN(id) FROM movies WHERE imdb_id IS NOT NULL GROUP BY imdb_id)
+                ''')
+
+                self.cursor.execute("CREATE UNIQUE INDEX idx_movies_imdb_id ON movies(imdb_id)")
+
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_movies_title ON movies(title)")
+        self.conn.commit()
+
+    def _create_summary_table(self) -> None:
+        """Creates the table holding the generated summaries of the movies."""
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS movies_summaries (
+                id INTEGER PRIMARY KEY REFERENCES movies(id) ON DELETE CASCADE,
+                generated_summary TEXT
+            )
+        ''')
+        self.conn.commit()
+
+    def _create_fts_table(self) -> None:
+        """Creates the FTS5 index over movies and summaries, and the triggers keeping it in sync."""
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'movies_fts'")
+        exists = self.cursor.fetchone() is not None
+
+        with self.conn:
+            # The FTS rowid is the movie id. Prefix indexes make title autocomplete cheap.
+            self.cursor.execute(f'''
+                CREATE VIRTUAL TABLE IF NOT EXISTS movies_fts USING fts5(
+                    {", ".join(FTS_COLUMNS)},
+                    tokenize = 'unicode61 remove_diacritics 2',
+                    prefix = '2 3'
+                )
+            ''')
+
+            insert_row = f'''
+                INSERT INTO movies_fts (rowid, {", ".join(FTS_COLUMNS)})
+                VALUES (new.id, new.title, new.plot,
+                        (SELECT generated_summary FROM movies_summaries WHERE id = new.id),
+                        new.stars, new.directors);
+            '''
+            self.cursor.executescript(f'''
+                CREATE TRIGGER IF NOT EXISTS movies_fts_insert AFTER INSERT ON movies BEGIN
+                    {insert_row}
+                END;
+                CREATE TRIGGER IF NOT EXISTS movies_fts_delete AFTER DELETE ON movies BEGIN
+                    DELETE FROM movies_fts WHERE rowid = old.id;
+                END;
+                CREATE TRIGGER IF NOT EXISTS movies_fts_update AFTER UPDATE ON movies BEGIN
+                    DELETE FROM movies_fts WHERE rowid = old.id;
+                    {insert_row}
+                END;
+                CREATE TRIGGER IF NOT EXISTS movies_summaries_fts_insert AFTER INSERT ON movies_summaries BEGIN
+                    UPDATE movies_fts SET generated_summary = new.generated_summary WHERE rowid = new.id;
+                END;
+                CREATE TRIGGER IF NOT EXISTS movies_summaries_fts_update AFTER UPDATE ON movies_summaries BEGIN
+                    UPDATE movies_fts SET generated_summary = new.generated_summary WHERE rowid = new.id;
+                END;
+                CREATE TRIGGER IF NOT EXISTS movies_summaries_fts_delete AFTER DELETE ON movies_summaries BEGIN
+                    UPDATE movies_fts SET generated_summary = NULL WHERE rowid = old.id;
+                END;
+            ''')
+
+            # Index the rows that existed before the FTS table was created
+            if not exists:
+                self.cursor.execute(f'''
+                    INSERT INTO movies_fts (rowid, {", ".join(FTS_COLUMNS)})
+                    SELECT m.id, m.title, m.plot, s.generated_summary, m.stars, m.directors
+                    FROM movies m LEFT JOIN movies_summaries s ON s.id = m.id
+                ''')
+
+    def _create_normalized_tables(self) -> None:
+        """Creates the genres, people and join tables used by indexed filter queries."""
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'movie_genres'")
+        exists = self.cursor.fetchone() is not None
+
+        self.cursor.executescript('''
+            CREATE TABLE IF NOT EXISTS genres (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE COLLATE NOCASE
+            );
+            CREATE TABLE IF NOT EXISTS people (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE COLLATE NOCASE
+            );
+            CREATE TABLE IF NOT EXISTS movie_genres (
+                genre_id INTEGER NOT NULL REFERENCES genres(id),
+                movie_id INTEGER NOT NULL REFERENCES movies(id) ON DELETE CASCADE,
+                PRIMARY KEY (genre_id, movie_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS movie_people (
+                role TEXT NOT NULL,
+                person_id INTEGER NOT NULL REFERENCES people(id),
+                movie_id INTEGER NOT NULL REFERENCES movies(id) ON DELETE CASCADE,
+                PRIMARY KEY (role, person_id, movie_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_movie_genres_movie ON movie_genres(movie_id);
+            CREATE INDEX IF NOT EXISTS idx_movie_people_movie ON movie_people(movie_id);
+            CREATE INDEX IF NOT EXISTS idx_movies_year ON movies(year);
+            CREATE INDEX IF NOT EXISTS idx_movies_imdb_rating ON movies(imdb_rating);
+        ''')
+        self.conn.commit()
+
+        # Populate the tables from movies that were saved before they existed
+        if not exists:
+            self.rebuild_normalized_tables()
+
+    def rebuild_normalized_tables(self) -> None:
+        """Rebuilds the genres, people and join tables from the comma-joined columns of every movie."""
+        try:
+            with self.conn:
+                self.cursor.execute("DELETE FROM movie_genres")
+                self.cursor.execute("DELETE FROM movie_people")
+                rows = self.conn.execute("SELECT id, genres, stars, directors FROM movies")
+                while True:
+                    batch = rows.fetchmany(10000)
+                    if not batch:
+                        break
+                    self._link_movies(batch)
+        except sqlite3.Error as e:
+            print(f"Error rebuilding normalized tables: {e}")
+
+    def _link_movies(self, movies: List[tuple]) -> None:
         """
-        Inserts movie data into the database.
+        Replaces the genre and people links of movies. Must run inside a transaction.
 
         Args:
-            movie_data (Dict[str, Optional[str]]): A dictionary containing movie data.
+            movies (List[tuple]): (movie id, genres, stars, directors) tuples with comma-joined names.
+        """
+        movie_ids = [(movie_id,) for movie_id, *_ in movies]
+        self.cursor.executemany("DELETE FROM movie_genres WHERE movie_id = ?", movie_ids)
+        self.cursor.executemany("DELETE FROM movie_people WHERE movie_id = ?", movie_ids)
+
+        genre_links, people_links = [], []
+        for movie_id, genres, stars, directors in movies:
+            genre_links.extend((movie_id, name) for name in split_names(genres))
+            people_links.extend(("star", movie_id, name) for name in split_names(stars))
+            people_links.extend(("director", movie_id, name) for name in split_names(directors))
+
+        genre_ids = self._name_ids("genres", {name for _, name in genre_links})
+        person_ids = self._name_ids("people", {name for _, _, name in people_links})
+        # Rows are sorted in primary key order so the B-tree inserts stay sequential
+        self.cursor.executemany("INSERT OR IGNORE INTO movie_genres (genre_id, movie_id) VALUES (?, ?)",
+                                sorted((genre_ids[name.lower()], movie_id) for movie_id, name in genre_links))
+        self.cursor.executemany("INSERT OR IGNORE INTO movie_people (role, person_id, movie_id) VALUES (?, ?, ?)",
+                                sorted((role, person_ids[name.lower()], movie_id) for role, movie_id, name in people_links))
+
+    def _name_ids(self, table: str, names: set) -> Dict[str, int]:
+        """
+        Inserts missing names into the genres or people table and returns their ids.
+
+        Args:
+            table (str): "genres" or "people".
+            names (set): Names to resolve.
+
+        Returns:
+            Dict[str, int]: Ids keyed by lowercase name, since names are unique case-insensitively.
+        """
+        names = list(names)
+        self.cursor.executemany(f"INSERT OR IGNORE INTO {table} (name) VALUES (?)", ((name,) for name in names))
+
+        ids = {}
+        for start in range(0, len(names), SQL_VARIABLE_LIMIT):
+            chunk = names[start:start + SQL_VARIABLE_LIMIT]
+            self.cursor.execute(f"SELECT name, id FROM {table} WHERE name IN ({', '.join('?' * len(chunk))})", chunk)
+            ids.update((name.lower(), name_id) for name, name_id in self.cursor.fetchall())
+        return ids
+
+    def upsert_movies(self, movies: Iterable[Dict[str, Optional[str]]]) -> int:
+        """
+        Inserts or updates many movies in a single transaction.
+
+        Movies are deduplicated by the IMDb id extracted from their link. A movie that already exists
+        is updated with the new values instead of being inserted again. The genre and people tables are
+        updated in the same transaction. Movies whose link has no IMDb id are skipped, they could not be
+        deduplicated on the next scrape.
+
+        Args:
+            movies (Iterable[Dict[str, Optional[str]]]): Movie dictionaries as produced by the scraper.
+
+        Returns:
+            int: The number of inserted or updated rows, skipped movies excluded.
         """
+        columns = MOVIE_COLUMNS + ["imdb_id"]
+        placeholders = ", ".join("?" for _ in columns)
+        updates = ", ".join(f"{col} = excluded.{col}" for col in MOVIE_COLUMNS)
+
+        # Only the fields needed to rebuild the genre and people links are kept while rows stream in
+        links = []
+        skipped = []
+
+        def rows():
+            for movie in movies:
+                if not movie:
+                    continue
+                imdb_id = extract_imdb_id(movie.get("link"))
+                if imdb_id is None:
+                    skipped.append(movie.get("title"))
+                    continue
+                links.append((imdb_id, movie.get("genres"), movie.get("stars"), movie.get("directors")))
+                yield tuple(movie.get(col) for col in MOVIE_COLUMNS) + (imdb_id,)
+
         try:
-            # Check if a movie with the same title already exists
-            self.cursor.execute('''SELECT COUNT(*) FROM movies WHERE title = ?''', (movie_data['title'],))
-            result = self.cursor.fetchone()
+            with self.conn:
+                self.cursor.executemany(f'''
+                    INSERT INTO movies ({", ".join(columns)})
+                    VALUES ({placeholders})
+                    ON CONFLICT(imdb_id) DO UPDATE SET {updates}
+                ''', rows())
+                saved = self.cursor.rowcount
 
-            if result[0] == 0:  # No record with this title
-                # Insert the movie data into the database
-                self.cursor.execute('''
-                    INSERT INTO movies (title, year, imdb_rating, metascore, pg_rating, votes, length, plot, summary, synopsis, directors, stars, genres, review_title, review_rating, review_text, link)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    movie_data['title'],
-                    movie_data['year'],
-                    movie_data['imdb_rating'],
-                    movie_data['metascore'],
-                    movie_data['pg_rating'],
-                    movie_data['votes'],
-                    movie_data['length'],
-                    movie_data['plot'],
-                    movie_data['summary'],
-                    movie_data['synopsis'],
-                    movie_data['directors'],
-                    movie_data['stars'],
-                    movie_data['genres'],
-                    movie_data['review_title'],
-                    movie_data['review_rating'],
-                    movie_data['review_text'],
-                    movie_data['link']
-                ))
-                self.conn.commit()
+                # Resolve movie ids through the imdb_id index and refresh their links
+                movie_ids = {}
+                imdb_ids = [link[0] for link in links]
+                for start in range(0, len(imdb_ids), SQL_VARIABLE_LIMIT):
+                    chunk = imdb_ids[start:start + SQL_VARIABLE_LIMIT]
+                    self.cursor.execute(f"SELECT imdb_id, id FROM movies WHERE imdb_id IN ({', '.join('?' * len(chunk))})", chunk)
+                    movie_ids.update(self.cursor.fetchall())
+                self._link_movies([(movie_ids[imdb_id], *names) for imdb_id, *names in links if imdb_id in movie_ids])
+            if skipped:
+                print(f"Skipped {len(skipped)} movies without an IMDb id in their link, e.g. {skipped[0]!r}.")
+            return saved
         except sqlite3.Error as e:
-            print(f"Error inserting movie data: {e}")
+            print(f"Error upserting movie data: {e}")
+            return 0
+
+    def upsert_generated_summaries(self, summaries: Iterable[tuple]) -> None:
+        """
+        Saves generated summaries in a single transaction.
+
+        Args:
+            summaries (Iterable[tuple]): (movie id, generated summary) pairs.
+        """
+        try:
+            with self.conn:
+                self.cursor.executemany('''
+                    INSERT INTO movies_summaries (id, generated_summary) VALUES (?, ?)
+                    ON CONFLICT(id) DO UPDATE SET generated_summary = excluded.generated_summary
+                ''', ((int(movie_id), summary) for movie_id, summary in summaries))
+        except sqlite3.Error as e:
+            print(f"Error saving generated summaries: {e}")
+
+    def search_text(self, query: str, limit: int = 50) -> List[tuple]:
+        """
+        Ranks movies against free text with the FTS5 index.
+
+        Every word of the query is optional (OR), so long texts such as HyDE synopses can be used directly.
+
+        Args:
+            query (str): Free text to search for.
+            limit (int): The maximum number of results.
+
+        Returns:
+            List[tuple]: (movie id, score) pairs, best match first. Higher scores are better.
+        """
+        tokens = list(dict.fromkeys(_fts_tokens(query)))
+        if not tokens:
+            return []
+
+        try:
+            rows = self.conn.execute(f'''
+                SELECT rowid, -bm25(movies_fts, {", ".join(map(str, FTS_WEIGHTS))}) AS score
+                FROM movies_fts
+                WHERE movies_fts MATCH ?
+                ORDER BY score DESC
+                LIMIT ?
+            ''', (" OR ".join(tokens), limit)).fetchall()
+            return rows
+        except sqlite3.Error as e:
+            print(f"Error searching movies: {e}")
+            return []
+
+    def search_titles(self, prefix: str, limit: int = 10) -> List[tuple]:
+        """
+        Autocompletes movie titles, the last word of the prefix may be incomplete.
+
+        Args:
+            prefix (str): The beginning of a title, e.g. "the godf".
+            limit (int): The maximum number of results.
+
+        Returns:
+            List[tuple]: (movie id, title, year) tuples, best match first.
+        """
+        tokens = _fts_tokens(prefix)
+        if not tokens:
+            return []
+        tokens[-1] += "*"
+
+        try:
+            return self.conn.execute('''
+                SELECT m.id, m.title, m.year
+                FROM movies_fts f JOIN movies m ON m.id = f.rowid
+                WHERE movies_fts MATCH ?
+                ORDER BY f.rank
+                LIMIT ?
+            ''', (f"title : ({' AND '.join(tokens)})", limit)).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error searching titles: {e}")
+            return []
+
+    def filter_movie_ids(self, filters: Dict[str, Any]) -> Optional[set]:
+        """
+        Resolves extracted features into the set of matching movie ids through the indexed tables.
+
+        Liked genres, stars and directors keep movies having at least one of them, disliked ones
+        drop movies having any of them. Names are matched case-insensitively.
+
+        Args:
+            filters (Dict[str, Any]): Features as produced by FeatureExtractor (liked_genres, disliked_genres,
+                                      liked_stars, disliked_stars, liked_directors, disliked_directors,
+                                      liked_years as [start, end] with False placeholders, liked_rating).
+                                      Missing keys are ignored.
+
+        Returns:
+            Optional[set]: The matching movie ids, or None if the filters contain no constraint.
+        """
+        includes, excludes, params = [], [], []
+
+        def names_query(table, names, role=None):
+            query = f"SELECT j.movie_id FROM {'movie_genres' if table == 'genres' else 'movie_people'} j " \
+                    f"JOIN {table} t ON t.id = j.{'genre_id' if table == 'genres' else 'person_id'} " \
+                    f"WHERE t.name IN ({', '.join('?' * len(names))})"
+            query_params = list(names)
+            if role:
+                query += " AND j.role = ?"
+                query_params.append(role)
+            return query, query_params
+
+        for key, table, role in [("genres", "genres", None), ("stars", "people", "star"), ("directors", "people", "director")]:
+            liked = [name for name in filters.get(f"liked_{key}") or [] if name]
+            disliked = [name for name in filters.get(f"disliked_{key}") or [] if name]
+            if liked:
+                includes.append(names_query(table, liked, role))
+            if disliked:
+                excludes.append(names_query(table, disliked, role))
+
+        # Year range and minimum rating use the indexes on movies
+        conditions, condition_params = [], []
+        liked_years = list(filters.get("liked_years") or []) + [False, False]
+        if liked_years[0]:
+            conditions.append("year >= ?")
+            condition_params.append(int(liked_years[0]))
+        if liked_years[1]:
+            conditions.append("year <= ?")
+            condition_params.append(int(liked_years[1]))
+        if filters.get("liked_rating"):
+            conditions.append("imdb_rating >= ?")
+            condition_params.append(float(filters["liked_rating"]))
+        if conditions:
+            includes.append((f"SELECT id FROM movies WHERE {' AND '.join(conditions)}", condition_params))
+
+        if not includes and not excludes:
+            return None
+
+        if not includes:
+            includes.append(("SELECT id FROM movies", []))
+
+        # Combine the id sets in SQL: INTERSECT for constraints, EXCEPT for exclusions
+        parts = [query for query, _ in includes]
+        query = " INTERSECT ".join(parts)
+        if excludes:
+            query += " EXCEPT " + " EXCEPT ".join(exclude for exclude, _ in excludes)
+        for _, query_params in includes + excludes:
+            params.extend(query_params)
+
+        try:
+            return {row[0] for row in self.conn.execute(query, params)}
+        except sqlite3.Error as e:
+            print(f"Error filtering movies: {e}")
+            return None
+
+    def read_vocabulary(self, keys: Iterable[str] = ("genres", "stars", "directors")) -> Dict[str, List[str]]:
+        """
+        Reads the distinct genres, stars and directors of the catalog.
+
+        Args:
+            keys (Iterable[str]): Which vocabularies to read among "genres", "stars" and "directors".
+
+        Returns:
+            Dict[str, List[str]]: Sorted names under each requested key.
+        """
+        vocabulary = {}
+        if "genres" in keys:
+            vocabulary["genres"] = [row[0] for row in self.conn.execute("SELECT name FROM genres ORDER BY name")]
+        for role, key in PEOPLE_ROLES.items():
+            if key in keys:
+                vocabulary[key] = [row[0] for row in self.conn.execute('''
+                    SELECT DISTINCT p.name FROM movie_people j JOIN people p ON p.id = j.person_id
+                    WHERE j.role = ? ORDER BY p.name
+                ''', (role,))]
+        return vocabulary
+
+    def insert_movie_data(self, movie_data: Dict[str, Optional[str]]) -> None:
+        """
+        Inserts movie data into the database.
+
+        Args:
+            movie_data (Dict[str, Optional[str]]): A dictionary containing movie data.
+        """
+        self.upsert_movies([movie_data])
 
     def delete_movie_by_title(self, title: str) -> None:
         """
@@ -98,7 +579,7 @@ class MovieDatabase:
         except sqlite3.Error as e:
             print(f"Error deleting movie: {e}")
 
-    def read_movie_by_title(self, title: str) -> Optional[Dict[str, Any]]:
+    def read_movie_by_title(self, title: str) -> Optional[List[Dict[str, Any]]]:
         """
         Reads a movie from the database based on its title.
 
@@ -106,83 +587,102 @@ class MovieDatabase:
             title (str): The title of the movie to read.
 
         Returns:
-            Optional[Dict[str, Any]]: A dictionary containing the movie data, or None if no movie is found.
+            Optional[List[Dict[str, Any]]]: Dictionaries containing the data of the matching movies, or None if no movie is found.
         """
-        try:
-            query = "SELECT * FROM movies WHERE title LIKE ?"
-            self.cursor.execute(query, (f"%{title}%",))
+        tokens = _fts_tokens(title)
+        if not tokens:
+            return None
 
-            rows = self.cursor.fetchall()
+        columns = ["id"] + MOVIE_COLUMNS
+        try:
+            # Match every word of the title through the FTS index instead of scanning with LIKE
+            query = f"""
+                SELECT {", ".join("m." + col for col in columns)}
+                FROM movies_fts f JOIN movies m ON m.id = f.rowid
+                WHERE movies_fts MATCH ?
+                ORDER BY f.rank
+            """
+            self.cursor.execute(query, (f"title : ({' AND '.join(tokens)})",))
 
-            if rows:
-                movies = []
-                for row in rows:
-                    movie = {
-                        "id": row[0],
-                        "title": row[1],
-                        "year": row[2],
-                        "imdb_rating": row[3],
-                        "metascore": row[4],
-                        "pg_rating": row[5],
-                        "votes": row[6],
-                        "length": row[7],
-                        "plot": row[8],
-                        "summary": row[9],
-                        "synopsis": row[10],
-                        "directors": row[11],
-                        "stars": row[12],
-                        "genres": row[13],
-                        "review_title": row[14],
-                        "review_rating": row[15],
-                        "review_text": row[16],
-                        "link": row[17]
-                    }
-                    movies.append(movie)
-                return movies
-            
-            else:
-                # print(f"No movie found with title: {title}")
-                return None
+            record = movie_record_type(tuple(columns))
+            movies = [record._make(row)._asdict() for row in self.cursor.fetchall()]
+            return movies or None
         except sqlite3.Error as e:
             print(f"Error reading movie: {e}")
             return None
 
+    def iter_movies(self, columns: Optional[List[str]] = None, batch_size: int = 1000,
+                    as_arrays: bool = False) -> Iterator[Any]:
+        """
+        Streams movies from the database without loading the whole table.
+
+        Rows are fetched `batch_size` at a time, so memory stays flat for full-catalog passes.
+
+        Args:
+            columns (Optional[List[str]]): Columns to read. Defaults to the id and every scraped column.
+            batch_size (int): Number of rows fetched per round trip.
+            as_arrays (bool): Yield one dictionary of column lists per batch instead of one record per row.
+
+        Yields:
+            MovieRecord namedtuples with the requested columns as attributes, or Dict[str, list] batches if as_arrays is True.
+        """
+        columns = _check_columns(columns or ["id"] + MOVIE_COLUMNS)
+        record = movie_record_type(tuple(columns))
+
+        try:
+            rows = self.conn.execute(f"SELECT {', '.join(columns)} FROM movies ORDER BY id")
+            while True:
+                batch = rows.fetchmany(batch_size)
+                if not batch:
+                    break
+                if as_arrays:
+                    yield dict(zip(columns, map(list, zip(*batch))))
+                else:
+                    yield from map(record._make, batch)
+        except sqlite3.Error as e:
+            print(f"Error iterating movies: {e}")
+
+    def read_movies_by_ids(self, ids: Iterable[int], columns: Optional[List[str]] = None) -> List[Any]:
+        """
+        Reads exactly the given movies through the primary key.
+
+        Args:
+            ids (Iterable[int]): Movie ids, in the order the records should be returned.
+            columns (Optional[List[str]]): Columns to read. Defaults to the id and every scraped column.
+
+        Returns:
+            List[MovieRecord]: One record per id found, in the order of `ids`.
+        """
+        columns = _check_columns(columns or ["id"] + MOVIE_COLUMNS)
+        # The id is always selected to restore the requested order
+        selected = columns if "id" in columns else ["id"] + columns
+        record = movie_record_type(tuple(columns))
+        ids = [int(movie_id) for movie_id in ids]
+
+        found = {}
+        try:
+            for start in range(0, len(ids), SQL_VARIABLE_LIMIT):
+                chunk = ids[start:start + SQL_VARIABLE_LIMIT]
+                rows = self.conn.execute(
+                    f"SELECT {', '.join(selected)} FROM movies WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+                for row in rows:
+                    values = dict(zip(selected, row))
+                    found[values["id"]] = record._make(values[col] for col in columns)
+        except sqlite3.Error as e:
+            print(f"Error reading movies by ids: {e}")
+
+        return [found[movie_id] for movie_id in ids if movie_id in found]
+
     def read_all_movies(self) -> List[Dict[str, Any]]:
         """
         Reads all movies from the database.
 
+        Prefer `iter_movies` for full-catalog passes, this method keeps every row in memory.
+
         Returns:
             List[Dict[str, Any]]: A list of dictionaries, each containing movie data.
         """
-        try:
-            self.cursor.execute("SELECT * FROM movies")
-            rows = self.cursor.fetchall()
-            movies = []
-            for row in rows:
-                movies.append({
-                    "id": row[0],
-                    "title": row[1],
-                    "year": row[2],
-                    "imdb_rating": row[3],
-                    "metascore": row[4],
-                    "pg_rating": row[5],
-                    "votes": row[6],
-                    "length": row[7],
-                    "plot": row[8],
-                    "summary": row[9],
-                    "synopsis": row[10],
-                    "directors": row[11],
-                    "stars": row[12],
-                    "genres": row[13],
-                    "review_title": row[14],
-                    "review_rating": row[15],
-                    "review_text": row[16],
-                    "link": row[17]
-                })
-            return movies
-        except sqlite3.Error as e:
-            print(f"Error reading all movies: {e}")
-            return []
+        return [movie._asdict() for movie in self.iter_movies()]
 
     def read_movies_with_columns(self, columns: List[str]) -> List[Dict[str, Any]]:
         """
@@ -194,22 +694,11 @@ class MovieDatabase:
         Returns:
             List[Dict[str, Any]]: A list of dictionaries, each containing movie data with the specified columns.
         """
+        if not columns:
+            return []
         try:
-            if not columns:
-                return []
-            
-            query = f"SELECT {', '.join(columns)} FROM movies"
-            self.cursor.execute(query)
-            rows = self.cursor.fetchall()
-            
-            movies = []
-            for row in rows:
-                movie = {}
-                for i, col in enumerate(columns):
-                    movie[col] = row[i]
-                movies.append(movie)
-            return movies
-        except sqlite3.Error as e:
+            return [movie._asdict() for movie in self.iter_movies(columns)]
+        except ValueError as e:
             print(f"Error reading movies with columns: {e}")
             return []
 
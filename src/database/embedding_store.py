@@ -0,0 +1,158 @@
+import json
+import os
+import numpy as np
+
+HEADER_FILE = "header.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+IDS_FILE = "ids.npy"
+
+class EmbeddingStore:
+    """
+    Memory-mapped matrix of movie embeddings aligned with an array of movie ids.
+
+    The store is a directory holding three files:
+        - embeddings.npy: float32 matrix of shape (n, dim)
+        - ids.npy: int64 array of movie ids, row i of the matrix belongs to ids[i]
+        - header.json: model name, dimension, row count and normalization flag
+
+    Opening the store memory-maps both arrays, so readers share the pages of the file instead of copying them.
+    """
+    def __init__(self, path, ids, embeddings, header):
+        """
+        Initializes the EmbeddingStore. Use `EmbeddingStore.open` or `EmbeddingStore.write` instead of calling this directly.
+
+        Args:
+            path (str): Directory of the store.
+            ids (np.ndarray): Array of movie ids aligned with the embedding rows.
+            embeddings (np.ndarray): Embedding matrix (usually a read-only memmap).
+            header (dict): Metadata describing the embeddings.
+        """
+        self.path = path
+        self.ids = ids
+        self.embeddings = embeddings
+        self.header = header
+        self._row_by_id = None
+
+    @property
+    def model_name(self):
+        """str: Name of the model that produced the embeddings."""
+        return self.header["model_name"]
+
+    @property
+    def dim(self):
+        """int: Dimension of the embeddings."""
+        return self.header["dim"]
+
+    @property
+    def normalized(self):
+        """bool: Whether the embeddings are L2-normalized."""
+        return self.header["normalized"]
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def write(cls, ids, embeddings, model_name, normalized=False, path="data/processed/embeddings"):
+        """
+        Writes an embedding matrix and its ids to disk and returns the opened store.
+
+        Args:
+            ids (array-like): Movie ids, one per embedding row.
+            embeddings (array-like): Embedding matrix of shape (n, dim).
+            model_name (str): Name of the model that produced the embeddings.
+            normalized (bool, optional): Whether the embeddings are L2-normalized. Defaults to False.
+            path (str, optional): Directory of the store. Defaults to "data/processed/embeddings".
+
+        Returns:
+            EmbeddingStore: The store opened in read-only memory-mapped mode.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+
+        if embeddings.ndim != 2 or embeddings.shape[0] != len(ids):
+            raise ValueError(f"Embeddings of shape {embeddings.shape} are not aligned with {len(ids)} ids.")
+
+        os.makedirs(path, exist_ok=True)
+
+        # Write the matrix through a memmap so large catalogs are not held twice in memory
+        matrix = np.lib.format.open_memmap(os.path.join(path, EMBEDDINGS_FILE), mode="w+",
+                                           dtype=np.float32, shape=embeddings.shape)
+        matrix[:] = embeddings
+        matrix.flush()
+        del matrix
+
+        np.save(os.path.join(path, IDS_FILE), ids)
+
+        header = {
+            "model_name": model_name,
+            "dim": int(embeddings.shape[1]),
+            "count": int(embeddings.shape[0]),
+            "dtype": "float32",
+            "normalized": bool(normalized),
+        }
+        with open(os.path.join(path, HEADER_FILE), "w") as f:
+            json.dump(header, f, indent=4)
+
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path="data/processed/embeddings"):
+        """
+        Opens an existing store without copying its arrays into memory.
+
+        Args:
+            path (str, optional): Directory of the store. Defaults to "data/processed/embeddings".
+
+        Returns:
+            EmbeddingStore: The opened store.
+        """
+        with open(os.path.join(path, HEADER_FILE), "r") as f:
+            header = json.load(f)
+
+        embeddings = np.load(os.path.join(path, EMBEDDINGS_FILE), mmap_mode="r")
+        ids = np.load(os.path.join(path, IDS_FILE), mmap_mode="r")
+
+        if embeddings.shape != (header["count"], header["dim"]) or len(ids) != header["count"]:
+            raise ValueError(f"Embedding store at {path} does not match its header.")
+
+        return cls(path, ids, embeddings, header)
+
+    def check_model(self, model_name):
+        """
+        Ensures the store was built with the given embedding model.
+
+        Args:
+            model_name (str): The model name queries will be encoded with.
+
+        Raises:
+            ValueError: If the store was built with a different model.
+        """
+        if self.model_name != model_name:
+            raise ValueError(f"Embedding store was built with '{self.model_name}', but '{model_name}' is configured. "
+                             "Please rerun the data preprocessing script.")
+
+    def rows_for_ids(self, ids):
+        """
+        Maps movie ids to row positions in the embedding matrix.
+
+        Args:
+            ids (iterable): Movie ids to look up.
+
+        Returns:
+            np.ndarray: Row positions of the ids that exist in the store.
+        """
+        if self._row_by_id is None:
+            self._row_by_id = {int(movie_id): row for row, movie_id in enumerate(self.ids)}
+        return np.array([self._row_by_id[int(i)] for i in ids if int(i) in self._row_by_id], dtype=np.int64)
+
+    def vectors_for_ids(self, ids):
+        """
+        Returns the embeddings of the given movie ids.
+
+        Args:
+            ids (iterable): Movie ids to look up.
+
+        Returns:
+            np.ndarray: Embedding rows of the ids that exist in the store.
+        """
+        return self.embeddings[self.rows_for_ids(ids)]
@@ -0,0 +1,171 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+# Job states: pending -> in_progress -> done, or back to pending until the attempts run out, then failed
+JOB_STATUSES = ["pending", "in_progress", "done", "failed"]
+
+class ScrapeJobQueue:
+    """
+    Persistent queue of the movie pages to scrape.
+
+    Link discovery enqueues the movie links and the scraper workers claim and complete them. Jobs are
+    only marked done once their movie is saved, so an interrupted run resumes where it stopped.
+    """
+    def __init__(self, db_filename: str = 'data/raw/scrape_jobs.db', max_attempts: int = 3):
+        """
+        Initializes the ScrapeJobQueue.
+
+        Args:
+            db_filename (str): The SQLite file of the queue.
+            max_attempts (int): Attempts before a job is marked as failed.
+        """
+        os.makedirs(os.path.dirname(db_filename) or ".", exist_ok=True)
+        self.max_attempts = max_attempts
+        self.conn = sqlite3.connect(db_filename, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self._create_table()
+
+    def _create_table(self) -> None:
+        """Creates the jobs table if it doesn't exist."""
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    url TEXT PRIMARY KEY,
+                    title TEXT,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            ''')
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at)")
+
+    def enqueue(self, movies: Iterable[Dict[str, Optional[str]]]) -> int:
+        """
+        Adds movie links to the queue. Links already queued keep their state.
+
+        Args:
+            movies (Iterable[Dict[str, Optional[str]]]): Dictionaries with the link and title of each movie.
+
+        Returns:
+            int: The number of new jobs.
+        """
+        now = time.time()
+        with self._lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany('''
+                INSERT OR IGNORE INTO jobs (url, title, status, created_at, updated_at) VALUES (?, ?, 'pending', ?, ?)
+            ''', ((movie["link"], movie.get("title"), now, now) for movie in movies if movie.get("link")))
+            return self.conn.total_changes - before
+
+    def claim(self, limit: int = 1) -> List[Dict]:
+        """
+        Takes pending jobs, oldest first, and marks them as in progress.
+
+        Args:
+            limit (int): Maximum number of jobs.
+
+        Returns:
+            List[Dict]: Jobs with their url, title and attempt number (starting at 1).
+        """
+        with self._lock, self.conn:
+            rows = self.conn.execute('''
+                SELECT url, title, attempts FROM jobs WHERE status = 'pending' ORDER BY created_at, url LIMIT ?
+            ''', (limit,)).fetchall()
+            self.conn.executemany('''
+                UPDATE jobs SET status = 'in_progress', attempts = attempts + 1, updated_at = ? WHERE url = ?
+            ''', ((time.time(), url) for url, _, _ in rows))
+        return [{"link": url, "title": title, "attempt": attempts + 1} for url, title, attempts in rows]
+
+    def complete(self, urls: Iterable[str]) -> None:
+        """
+        Marks jobs as done.
+
+        Args:
+            urls (Iterable[str]): Links of the saved movies.
+        """
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.executemany("UPDATE jobs SET status = 'done', last_error = NULL, updated_at = ? WHERE url = ?",
+                                  ((now, url) for url in urls))
+
+    def fail(self, url: str, error: str) -> str:
+        """
+        Records a failed attempt: the job goes back to pending, or to failed once out of attempts.
+
+        Args:
+            url (str): Link of the job.
+            error (str): What went wrong.
+
+        Returns:
+            str: The new status of the job.
+        """
+        with self._lock, self.conn:
+            self.conn.execute('''
+                UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                    last_error = ?, updated_at = ? WHERE url = ?
+            ''', (self.max_attempts, error, time.time(), url))
+            row = self.conn.execute("SELECT status FROM jobs WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else "failed"
+
+    def recover(self) -> int:
+        """
+        Puts back the jobs left in progress by an interrupted run. The interrupted attempt is not counted.
+
+        Returns:
+            int: The number of recovered jobs.
+        """
+        with self._lock, self.conn:
+            return self.conn.execute("UPDATE jobs SET status = 'pending', attempts = MAX(attempts - 1, 0), updated_at = ? "
+                                     "WHERE status = 'in_progress'",
+                                     (time.time(),)).rowcount
+
+    def retry_failed(self) -> int:
+        """
+        Gives the failed jobs a new set of attempts.
+
+        Returns:
+            int: The number of jobs queued again.
+        """
+        with self._lock, self.conn:
+            return self.conn.execute('''
+                UPDATE jobs SET status = 'pending', attempts = 0, updated_at = ? WHERE status = 'failed'
+            ''', (time.time(),)).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Counts the jobs in every state.
+
+        Returns:
+            Dict[str, int]: Number of jobs keyed by status.
+        """
+        with self._lock:
+            counts = dict(self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {status: counts.get(status, 0) for status in JOB_STATUSES}
+
+    def failures(self, limit: int = 20) -> List[Dict]:
+        """
+        Lists the failed jobs with their last error.
+
+        Args:
+            limit (int): Maximum number of jobs.
+
+        Returns:
+            List[Dict]: link, title, attempts and last_error of each failed job.
+        """
+        with self._lock:
+            rows = self.conn.execute('''
+                SELECT url, title, attempts, last_error FROM jobs WHERE status = 'failed' ORDER BY updated_at DESC LIMIT ?
+            ''', (limit,)).fetchall()
+        return [dict(zip(["link", "title", "attempts", "last_error"], row)) for row in rows]
+
+    def close(self) -> None:
+        """Closes the connection."""
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,402 @@
+"""
+Precomputed "more like this" graph: the top-K most similar movies of every movie.
+Usage: python -m src.database.neighbour_graph --refresh
+
+Preprocessing builds the graph from scratch, --refresh only adds the movies of the embedding store that are
+missing from the graph and drops the removed ones.
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+import config
+from src.database.embedding_store import EmbeddingStore
+
+HEADER_FILE = "header.json"
+IDS_FILE = "ids.npy"
+NEIGHBOURS_FILE = "neighbours.npy"
+SCORES_FILE = "scores.npy"
+
+def inverse_norms(matrix, block_size=1024):
+    """
+    Computes the inverse L2 norm of every row, one block of rows at a time.
+
+    Scaling dot products by these turns them into cosine similarities without writing a normalized copy of
+    a memory-mapped matrix.
+
+    Args:
+        matrix (array-like): Matrix of shape (n, dim).
+        block_size (int, optional): Rows read at once. Defaults to 1024.
+
+    Returns:
+        np.ndarray: float32 array of shape (n,), zero rows get a finite value and keep zero similarities.
+    """
+    scales = np.empty(len(matrix), dtype=np.float32)
+    for start in range(0, len(matrix), block_size):
+        norms = np.linalg.norm(np.asarray(matrix[start:start + block_size], dtype=np.float32), axis=1)
+        scales[start:start + block_size] = 1 / np.maximum(norms, 1e-12)
+    return scales
+
+def top_k_rows(scores, k):
+    """
+    Selects the k largest values of every row.
+
+    Args:
+        scores (np.ndarray): Matrix of shape (n, m).
+        k (int): Values to keep per row.
+
+    Returns:
+        tuple: (columns, values) of shape (n, min(k, m)), by decreasing value.
+    """
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return np.empty((len(scores), 0), dtype=np.int64), np.empty((len(scores), 0), dtype=np.float32)
+    columns = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    values = np.take_along_axis(scores, columns, axis=1)
+    order = np.argsort(-values, axis=1, kind="stable")
+    return np.take_along_axis(columns, order, axis=1), np.take_along_axis(values, order, axis=1)
+
+def blocked_neighbours(matrix, scales, query_rows, k, candidate_rows=None, block_size=1024):
+    """
+    Finds the k most similar rows of a matrix for some of its rows, one block of queries at a time.
+
+    Each block is read from the matrix and multiplied with the candidates, so the memory stays bounded by
+    block_size * candidates floats and the matrix is never copied whole.
+
+    Args:
+        matrix (np.ndarray): Vectors of shape (n, dim), usually a read-only memmap.
+        scales (np.ndarray): Inverse norms of the rows, see `inverse_norms`.
+        query_rows (np.ndarray): Rows to find the neighbours of.
+        k (int): Neighbours per query.
+        candidate_rows (np.ndarray, optional): Rows the neighbours are taken from. Defaults to None (all rows,
+                                               each query excluded from its own neighbours).
+        block_size (int, optional): Queries per matrix product. Defaults to 1024.
+
+    Returns:
+        tuple: (rows, scores) of shape (len(query_rows), k): matrix rows by decreasing cosine similarity, padded with -1 and -inf.
+    """
+    if candidate_rows is None:
+        candidates, candidate_scales = matrix, scales
+    else:
+        candidates, candidate_scales = np.asarray(matrix[candidate_rows], dtype=np.float32), scales[candidate_rows]
+
+    rows = np.full((len(query_rows), k), -1, dtype=np.int64)
+    scores = np.full((len(query_rows), k), -np.inf, dtype=np.float32)
+    for start in range(0, len(query_rows), block_size):
+        block_rows = query_rows[start:start + block_size]
+        queries = np.asarray(matrix[block_rows], dtype=np.float32) * scales[block_rows, None]
+        block = queries @ candidates.T
+        block *= candidate_scales
+        if candidate_rows is None:
+            block[np.arange(len(block)), block_rows] = -np.inf
+        columns, values = top_k_rows(block, k)
+        if candidate_rows is not None:
+            columns = candidate_rows[columns]
+        rows[start:start + len(block), :columns.shape[1]] = columns
+        scores[start:start + len(block), :values.shape[1]] = values
+    # Excluded or missing neighbours are padding
+    rows[~np.isfinite(scores)] = -1
+    return rows, scores
+
+def ann_neighbours(matrix, scales, ids, vector_store, k, block_size=1024):
+    """
+    Finds the k most similar rows of every row with a vector store, one block of queries at a time.
+
+    Each block is one batched search for 2k + 1 candidates per row, rescored exactly with one batched matrix product.
+
+    Args:
+        matrix (np.ndarray): Vectors of shape (n, dim), usually a read-only memmap.
+        scales (np.ndarray): Inverse norms of the rows, see `inverse_norms`.
+        ids (np.ndarray): Movie id of each row, as stored in the vector store.
+        vector_store (VectorStore): Index of the same vectors.
+        k (int): Neighbours per row.
+        block_size (int, optional): Queries per batched search, bounds the memory to block_size * (2k + 1) * dim floats.
+                                    Defaults to 1024.
+
+    Returns:
+        tuple: (rows, scores) of shape (n, k): matrix rows by decreasing cosine similarity, padded with -1 and -inf.
+    """
+    order = np.argsort(ids, kind="stable")
+    sorted_ids = ids[order]
+    rows = np.full((len(ids), k), -1, dtype=np.int64)
+    scores = np.full((len(ids), k), -np.inf, dtype=np.float32)
+    for start in range(0, len(ids), block_size):
+        block_rows = np.arange(start, min(start + block_size, len(ids)))
+        queries = np.asarray(matrix[start:start + block_size], dtype=np.float32)
+        candidate_ids, _ = vector_store.search_batch(queries, top_k=2 * k + 1)
+
+        # Movie ids to matrix rows, unknown ids and the query itself become -1
+        positions = np.minimum(np.searchsorted(sorted_ids, candidate_ids), len(ids) - 1)
+        candidate_rows = np.where(sorted_ids[positions] == candidate_ids, order[positions], -1)
+        candidate_rows[candidate_rows == block_rows[:, None]] = -1
+
+        vectors = np.asarray(matrix[np.maximum(candidate_rows, 0)], dtype=np.float32)
+        block = np.matmul(vectors, (queries * scales[block_rows, None])[:, :, None])[:, :, 0]
+        block *= scales[np.maximum(candidate_rows, 0)]
+        block[candidate_rows < 0] = -np.inf
+        columns, values = top_k_rows(block, k)
+        rows[block_rows, :columns.shape[1]] = np.take_along_axis(candidate_rows, columns, axis=1)
+        scores[block_rows, :values.shape[1]] = values
+    rows[~np.isfinite(scores)] = -1
+    return rows, scores
+
+def merge_neighbours(ids, scores, candidate_ids, candidate_scores, k):
+    """
+    Merges two neighbour lists per row and keeps the k best.
+
+    Args:
+        ids (np.ndarray): Current neighbour ids of shape (n, a), -1 for padding.
+        scores (np.ndarray): Their scores.
+        candidate_ids (np.ndarray): New neighbour ids of shape (n, b), -1 for padding.
+        candidate_scores (np.ndarray): Their scores.
+        k (int): Neighbours to keep.
+
+    Returns:
+        tuple: (ids, scores) of shape (n, k), by decreasing score.
+    """
+    all_ids = np.concatenate((ids, candidate_ids), axis=1)
+    all_scores = np.concatenate((scores.astype(np.float32), candidate_scores.astype(np.float32)), axis=1)
+    all_scores[all_ids < 0] = -np.inf
+    columns, values = top_k_rows(all_scores, k)
+    merged = np.take_along_axis(all_ids, columns, axis=1)
+    merged[~np.isfinite(values)] = -1
+    return merged, values
+
+class NeighbourGraph:
+    """
+    Top-K nearest neighbours of every movie by cosine similarity of the embeddings.
+
+    The graph is a directory holding:
+        - ids.npy: int32 movie ids, sorted, one per row
+        - neighbours.npy: int32 matrix of shape (n, k) with the neighbour movie ids of each row, -1 for padding
+        - scores.npy: float16 matrix of shape (n, k) with the cosine similarities, best first
+        - header.json: embedding model, k and row count
+
+    Looking up the neighbours of a movie is a binary search over the ids and one row read, whatever the catalog size.
+    """
+    def __init__(self, path, ids, neighbours, scores, header):
+        """
+        Initializes the NeighbourGraph. Use `NeighbourGraph.build` or `NeighbourGraph.open` instead of calling this directly.
+
+        Args:
+            path (str): Directory of the graph.
+            ids (np.ndarray): Sorted movie ids of the rows.
+            neighbours (np.ndarray): Neighbour movie ids of each row.
+            scores (np.ndarray): Similarities of the neighbours.
+            header (dict): Metadata describing the graph.
+        """
+        self.path = path
+        self.ids = ids
+        self.neighbours = neighbours
+        self.scores = scores
+        self.header = header
+
+    @property
+    def k(self):
+        """int: Neighbours stored per movie."""
+        return self.header["k"]
+
+    @property
+    def model_name(self):
+        """str: Name of the model that produced the embeddings."""
+        return self.header["model_name"]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, movie_id):
+        return self._row(movie_id) is not None
+
+    def _row(self, movie_id):
+        """Returns the row of a movie id, or None."""
+        row = int(np.searchsorted(self.ids, movie_id))
+        return row if row < len(self.ids) and self.ids[row] == movie_id else None
+
+    def similar(self, movie_id, k=None):
+        """
+        Returns the precomputed neighbours of a movie.
+
+        Args:
+            movie_id (int): The movie id.
+            k (int, optional): Maximum number of neighbours. Defaults to all the stored ones.
+
+        Returns:
+            tuple: (ids, scores) arrays of the neighbours, most similar first; empty if the movie is unknown.
+        """
+        row = self._row(movie_id)
+        if row is None:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float16)
+        ids, scores = self.neighbours[row, :k], self.scores[row, :k]
+        found = ids >= 0
+        return ids[found], scores[found]
+
+    @staticmethod
+    def _write(path, ids, neighbours, scores, model_name):
+        """Writes the arrays sorted by movie id, each file replaced atomically, and returns the opened graph."""
+        order = np.argsort(ids, kind="stable")
+        arrays = {
+            IDS_FILE: np.asarray(ids, dtype=np.int32)[order],
+            NEIGHBOURS_FILE: np.asarray(neighbours, dtype=np.int32)[order],
+            SCORES_FILE: np.asarray(scores, dtype=np.float16)[order],
+        }
+        os.makedirs(path, exist_ok=True)
+        for name, array in arrays.items():
+            temporary_path = os.path.join(path, f"{name}.tmp")
+            with open(temporary_path, "wb") as f:
+                np.save(f, array)
+            os.replace(temporary_path, os.path.join(path, name))
+
+        header = {
+            "model_name": model_name,
+            "k": int(arrays[NEIGHBOURS_FILE].shape[1]),
+            "count": len(ids),
+            "metric": "cosine",
+            "ids_dtype": "int32",
+            "scores_dtype": "float16",
+        }
+        with open(os.path.join(path, HEADER_FILE), "w") as f:
+            json.dump(header, f, indent=4)
+        return NeighbourGraph.open(path)
+
+    @classmethod
+    def build(cls, embedding_store, k=50, block_size=1024, vector_store=None, ann_threshold=None,
+              path="data/processed/neighbours"):
+        """
+        Computes the neighbours of every movie of an embedding store and writes the graph.
+
+        The exact search multiplies blocks of embeddings with the whole matrix. Above `ann_threshold` movies,
+        a vector store is searched instead for blocks of movies at once, their candidates rescored exactly.
+
+        Args:
+            embedding_store (EmbeddingStore): Embeddings of the catalog.
+            k (int, optional): Neighbours per movie. Defaults to 50.
+            block_size (int, optional): Movies per matrix product. Defaults to 1024.
+            vector_store (VectorStore, optional): Index used for the approximate search. Defaults to None (exact search).
+            ann_threshold (int, optional): Catalog size above which the vector store is used. Defaults to None (never).
+            path (str, optional): Directory of the graph. Defaults to "data/processed/neighbours".
+
+        Returns:
+            NeighbourGraph: The opened graph.
+        """
+        ids = np.asarray(embedding_store.ids, dtype=np.int64)
+        matrix = embedding_store.embeddings
+        scales = inverse_norms(matrix, block_size)
+
+        if vector_store is not None and ann_threshold is not None and len(ids) > ann_threshold:
+            rows, scores = ann_neighbours(matrix, scales, ids, vector_store, k, block_size=block_size)
+        else:
+            rows, scores = blocked_neighbours(matrix, scales, np.arange(len(ids)), k, block_size=block_size)
+        neighbours = np.where(rows >= 0, ids[np.maximum(rows, 0)], -1)
+
+        return cls._write(path, ids, neighbours, scores, embedding_store.model_name)
+
+    @classmethod
+    def open(cls, path="data/processed/neighbours"):
+        """
+        Opens an existing graph without copying its arrays into memory.
+
+        Args:
+            path (str, optional): Directory of the graph. Defaults to "data/processed/neighbours".
+
+        Returns:
+            NeighbourGraph: The opened graph.
+        """
+        with open(os.path.join(path, HEADER_FILE), "r") as f:
+            header = json.load(f)
+
+        ids = np.load(os.path.join(path, IDS_FILE), mmap_mode="r")
+        neighbours = np.load(os.path.join(path, NEIGHBOURS_FILE), mmap_mode="r")
+        scores = np.load(os.path.join(path, SCORES_FILE), mmap_mode="r")
+
+        if neighbours.shape != (header["count"], header["k"]) or scores.shape != neighbours.shape or len(ids) != header["count"]:
+            raise ValueError(f"Neighbour graph at {path} does not match its header.")
+
+        return cls(path, ids, neighbours, scores, header)
+
+    def refresh(self, embedding_store, block_size=1024):
+        """
+        Updates the graph after movies were added to or removed from the embedding store.
+
+        New movies get their full neighbour list. Existing movies only compare themselves with the new ones and
+        keep the best of both lists, unless one of their neighbours was removed, then their list is computed again.
+        Embeddings of existing movies are assumed unchanged; after re-embedding the catalog, build the graph again.
+
+        Args:
+            embedding_store (EmbeddingStore): Embeddings of the current catalog.
+            block_size (int, optional): Movies per matrix product. Defaults to 1024.
+
+        Returns:
+            NeighbourGraph: The refreshed graph, or this graph if nothing changed.
+
+        Raises:
+            ValueError: If the embedding store was built with another model.
+        """
+        if embedding_store.model_name != self.model_name:
+            raise ValueError(f"Neighbour graph was built with '{self.model_name}', but the embeddings come from "
+                             f"'{embedding_store.model_name}'. Please build the graph again.")
+
+        store_ids = np.asarray(embedding_store.ids, dtype=np.int64)
+        old_ids = np.asarray(self.ids, dtype=np.int64)
+        added = ~np.isin(store_ids, old_ids)
+        removed_ids = old_ids[~np.isin(old_ids, store_ids)]
+        if not added.any() and not len(removed_ids):
+            return self
+
+        matrix = embedding_store.embeddings
+        scales = inverse_norms(matrix, block_size)
+        k = self.k
+        neighbours = np.full((len(store_ids), k), -1, dtype=np.int64)
+        scores = np.full((len(store_ids), k), -np.inf, dtype=np.float32)
+
+        # Current lists of the kept movies, in store order
+        kept_rows = np.flatnonzero(~added)
+        graph_rows = np.searchsorted(old_ids, store_ids[kept_rows])
+        current_ids = np.asarray(self.neighbours, dtype=np.int64)[graph_rows]
+        current_scores = np.asarray(self.scores, dtype=np.float32)[graph_rows]
+        stale = np.isin(current_ids, removed_ids).any(axis=1)
+
+        # New movies and movies that lost a neighbour: full search
+        full_rows = np.concatenate((np.flatnonzero(added), kept_rows[stale]))
+        rows, full_scores = blocked_neighbours(matrix, scales, full_rows, k, block_size=block_size)
+        neighbours[full_rows] = np.where(rows >= 0, store_ids[np.maximum(rows, 0)], -1)
+        scores[full_rows] = full_scores
+
+        # Other movies: compare with the new movies only and merge
+        merge_rows = kept_rows[~stale]
+        added_rows = np.flatnonzero(added)
+        if len(added_rows):
+            rows, candidate_scores = blocked_neighbours(matrix, scales, merge_rows, k, candidate_rows=added_rows,
+                                                        block_size=block_size)
+            candidate_ids = np.where(rows >= 0, store_ids[np.maximum(rows, 0)], -1)
+            neighbours[merge_rows], scores[merge_rows] = merge_neighbours(current_ids[~stale], current_scores[~stale],
+                                                                          candidate_ids, candidate_scores, k)
+        else:
+            neighbours[merge_rows], scores[merge_rows] = current_ids[~stale], current_scores[~stale]
+
+        print(f"Neighbour graph: {int(added.sum())} movies added, {len(removed_ids)} removed, "
+              f"{len(full_rows)} lists computed again, {len(merge_rows)} lists merged.")
+        return self._write(self.path, store_ids, neighbours, scores, self.model_name)
+
+def main():
+    """
+    Main function to build or refresh the neighbour graph from the embedding store.
+    """
+    parser = argparse.ArgumentParser(description="Precompute the nearest neighbours of every movie.")
+    parser.add_argument("--refresh", action="store_true", help="Only add the new movies to the existing graph")
+    parser.add_argument("--embeddings", type=str, default="data/processed/embeddings", help="Embedding store directory")
+    parser.add_argument("--path", type=str, default=config.NEIGHBOUR_GRAPH["path"], help="Neighbour graph directory")
+    args = parser.parse_args()
+
+    embedding_store = EmbeddingStore.open(args.embeddings)
+    if args.refresh and os.path.exists(os.path.join(args.path, HEADER_FILE)):
+        graph = NeighbourGraph.open(args.path).refresh(embedding_store, block_size=config.NEIGHBOUR_GRAPH["block_size"])
+    else:
+        graph = NeighbourGraph.build(embedding_store, k=config.NEIGHBOUR_GRAPH["k"],
+                                     block_size=config.NEIGHBOUR_GRAPH["block_size"], path=args.path)
+    print(f"Neighbour graph saved to {graph.path} ({len(graph)} movies, {graph.k} neighbours each).")
+
+if __name__ == "__main__":
+    main()
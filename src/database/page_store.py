@@ -0,0 +1,387 @@
+"""
+Compressed store of the raw pages downloaded by the scraper.
+Usage: python -m src.database.page_store --import-dir data/raw/html_content
+
+Pages live in one SQLite file instead of one file per page. Page bodies are compressed and stored once per
+distinct content hash, and the pages table maps every URL to its body with the fetch time and HTTP validators.
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, Optional, Tuple
+
+import config
+
+# Bytes decompressed per step when streaming a page
+STREAM_CHUNK_SIZE = 64 * 1024
+
+def _zstd():
+    """Imports the optional zstandard module."""
+    import zstandard
+    return zstandard
+
+def compress(data: bytes, codec: str, level: Optional[int] = None) -> bytes:
+    """
+    Compresses a page body.
+
+    Args:
+        data (bytes): Raw page.
+        codec (str): "zstd" or "zlib".
+        level (Optional[int]): Compression level, defaults to the codec default.
+
+    Returns:
+        bytes: The compressed body.
+    """
+    if codec == "zstd":
+        return _zstd().ZstdCompressor(level=level or 3).compress(data)
+    if codec == "zlib":
+        return zlib.compress(data, level or 6)
+    raise ValueError(f"Unknown page codec: {codec}")
+
+def _decompressor(codec: str):
+    """Returns an object with a `decompress(chunk)` method for streaming reads."""
+    if codec == "zstd":
+        return _zstd().ZstdDecompressor().decompressobj()
+    if codec == "zlib":
+        return zlib.decompressobj()
+    raise ValueError(f"Unknown page codec: {codec}")
+
+def resolve_codec(codec: str) -> str:
+    """
+    Falls back to zlib when zstd is requested but the zstandard package is missing.
+
+    Args:
+        codec (str): Requested codec.
+
+    Returns:
+        str: Codec used for new pages.
+    """
+    if codec == "zstd":
+        try:
+            _zstd()
+        except ImportError:
+            print("zstandard is not installed, compressing pages with zlib.")
+            return "zlib"
+    return codec
+
+class PageStore:
+    """
+    SQLite store of compressed raw pages keyed by URL.
+
+    The connection is shared by the scraper threads, every access holds a lock.
+    """
+    def __init__(self, db_filename: str = 'data/raw/pages.db', codec: str = "zstd", level: Optional[int] = None):
+        """
+        Initializes the PageStore.
+
+        Args:
+            db_filename (str): The SQLite file of the store.
+            codec (str): Compression of new pages, "zstd" or "zlib". Stored pages keep their own codec.
+            level (Optional[int]): Compression level, defaults to the codec default.
+        """
+        os.makedirs(os.path.dirname(db_filename) or ".", exist_ok=True)
+        self.db_filename = db_filename
+        self.codec = resolve_codec(codec)
+        self.level = level
+        self.conn = sqlite3.connect(db_filename, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._configure_connection()
+        self._create_tables()
+
+    def _configure_connection(self) -> None:
+        """Sets the pragmas for concurrent readers and fast writes."""
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+
+    def _create_tables(self) -> None:
+        """Creates the blobs and pages tables if they don't exist."""
+        with self.conn:
+            # One row per distinct page body, shared by every URL serving the same bytes
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS blobs (
+                    hash TEXT PRIMARY KEY,
+                    codec TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    data BLOB NOT NULL
+                )
+            ''')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    hash TEXT NOT NULL REFERENCES blobs(hash),
+                    fetched_at REAL NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT
+                )
+            ''')
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_hash ON pages(hash)")
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM pages WHERE url = ?", (url,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def put(self, url: str, content: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None,
+            fetched_at: Optional[float] = None) -> None:
+        """
+        Stores a page, replacing the previous version of the URL.
+
+        Args:
+            url (str): The page URL.
+            content (bytes): The raw page.
+            etag (Optional[str]): ETag response header.
+            last_modified (Optional[str]): Last-Modified response header.
+            fetched_at (Optional[float]): Unix time of the download, defaults to now.
+        """
+        digest = hashlib.blake2b(content, digest_size=20).hexdigest()
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self._lock:
+            exists = self.conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone()
+        # Compress without holding the lock, and only if this body is new
+        data = None if exists else compress(content, self.codec, self.level)
+        with self._lock:
+            with self.conn:
+                if data is None and not self.conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone():
+                    # The body was deleted in the meantime
+                    data = compress(content, self.codec, self.level)
+                if data is not None:
+                    self.conn.execute("INSERT OR IGNORE INTO blobs (hash, codec, size, data) VALUES (?, ?, ?, ?)",
+                                      (digest, self.codec, len(content), data))
+                previous = self.conn.execute("SELECT hash FROM pages WHERE url = ?", (url,)).fetchone()
+                self.conn.execute('''
+                    INSERT INTO pages (url, hash, fetched_at, etag, last_modified) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(url) DO UPDATE SET hash = excluded.hash, fetched_at = excluded.fetched_at,
+                        etag = excluded.etag, last_modified = excluded.last_modified
+                ''', (url, digest, fetched_at, etag, last_modified))
+                if previous and previous[0] != digest:
+                    self._delete_orphan(previous[0])
+
+    def touch(self, url: str, fetched_at: Optional[float] = None) -> None:
+        """
+        Updates the fetch time of a page, e.g. after the server answered 304 Not Modified.
+
+        Args:
+            url (str): The page URL.
+            fetched_at (Optional[float]): Unix time of the check, defaults to now.
+        """
+        with self._lock, self.conn:
+            self.conn.execute("UPDATE pages SET fetched_at = ? WHERE url = ?",
+                              (time.time() if fetched_at is None else fetched_at, url))
+
+    def metadata(self, url: str) -> Optional[Dict]:
+        """
+        Returns what is known about a stored page without reading its body.
+
+        Args:
+            url (str): The page URL.
+
+        Returns:
+            Optional[Dict]: url, fetched_at, etag, last_modified, size and compressed_size, or None if not stored.
+        """
+        with self._lock:
+            row = self.conn.execute('''
+                SELECT p.url, p.fetched_at, p.etag, p.last_modified, b.size, length(b.data)
+                FROM pages p JOIN blobs b ON b.hash = p.hash WHERE p.url = ?
+            ''', (url,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(["url", "fetched_at", "etag", "last_modified", "size", "compressed_size"], row))
+
+    def get(self, url: str) -> Optional[bytes]:
+        """
+        Reads a page.
+
+        Args:
+            url (str): The page URL.
+
+        Returns:
+            Optional[bytes]: The raw page, or None if not stored.
+        """
+        with self._lock:
+            row = self.conn.execute('''
+                SELECT b.codec, b.data FROM pages p JOIN blobs b ON b.hash = p.hash WHERE p.url = ?
+            ''', (url,)).fetchone()
+        if row is None:
+            return None
+        decompressor = _decompressor(row[0])
+        return decompressor.decompress(row[1])
+
+    def stream(self, url: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Reads a page in decompressed chunks without loading the compressed body at once.
+
+        Args:
+            url (str): The page URL.
+            chunk_size (int): Compressed bytes read per step.
+
+        Yields:
+            bytes: Consecutive chunks of the raw page, nothing if the page is not stored.
+        """
+        with self._lock:
+            row = self.conn.execute('''
+                SELECT b.rowid, b.codec, length(b.data) FROM pages p JOIN blobs b ON b.hash = p.hash WHERE p.url = ?
+            ''', (url,)).fetchone()
+        if row is None:
+            return
+        rowid, codec, length = row
+        decompressor = _decompressor(codec)
+        for offset in range(0, length, chunk_size):
+            with self._lock:
+                with self.conn.blobopen("blobs", "data", rowid, readonly=True) as blob:
+                    blob.seek(offset)
+                    chunk = blob.read(chunk_size)
+            data = decompressor.decompress(chunk)
+            if data:
+                yield data
+
+    def iter_pages(self, prefix: str = "") -> Iterator[Tuple[str, bytes]]:
+        """
+        Reads every stored page, e.g. to parse them again offline.
+
+        Args:
+            prefix (str): Only yield URLs starting with this prefix.
+
+        Yields:
+            Tuple[str, bytes]: (url, raw page) in URL order.
+        """
+        last_url = ""
+        while True:
+            # Read in pages of rows so the lock is not held while the caller works
+            with self._lock:
+                rows = self.conn.execute('''
+                    SELECT p.url, b.codec, b.data FROM pages p JOIN blobs b ON b.hash = p.hash
+                    WHERE p.url > ? AND p.url LIKE ? ESCAPE '\\' ORDER BY p.url LIMIT 256
+                ''', (last_url, _like_prefix(prefix))).fetchall()
+            if not rows:
+                return
+            for url, codec, data in rows:
+                yield url, _decompressor(codec).decompress(data)
+            last_url = rows[-1][0]
+
+    def urls(self, prefix: str = "") -> list:
+        """
+        Lists the stored URLs.
+
+        Args:
+            prefix (str): Only list URLs starting with this prefix.
+
+        Returns:
+            list: URLs in sorted order.
+        """
+        with self._lock:
+            return [row[0] for row in self.conn.execute(
+                "SELECT url FROM pages WHERE url LIKE ? ESCAPE '\\' ORDER BY url", (_like_prefix(prefix),))]
+
+    def delete(self, url: str) -> None:
+        """
+        Removes a page, and its body if no other URL uses it.
+
+        Args:
+            url (str): The page URL.
+        """
+        with self._lock, self.conn:
+            row = self.conn.execute("SELECT hash FROM pages WHERE url = ?", (url,)).fetchone()
+            if row:
+                self.conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+                self._delete_orphan(row[0])
+
+    def _delete_orphan(self, digest: str) -> None:
+        """Deletes a body no page refers to anymore. Call inside a transaction."""
+        self.conn.execute("DELETE FROM blobs WHERE hash = ? AND NOT EXISTS (SELECT 1 FROM pages WHERE hash = ?)",
+                          (digest, digest))
+
+    def stats(self) -> Dict:
+        """
+        Returns the size of the store.
+
+        Returns:
+            Dict: pages, distinct bodies, raw and compressed bytes.
+        """
+        with self._lock:
+            pages = self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            blobs, raw, compressed = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(length(data)), 0) FROM blobs").fetchone()
+        return {"pages": pages, "blobs": blobs, "raw_bytes": raw, "compressed_bytes": compressed}
+
+    def import_directory(self, path: str = 'data/raw/html_content', base_url: str = config.IMDB_BASE_URL) -> int:
+        """
+        Imports the page files written by earlier versions of the scraper.
+
+        Files are named {movie_id}.json for the title page and {movie_id}_story.json for the plot summary page.
+
+        Args:
+            path (str): Directory of the page files.
+            base_url (str): Site the pages were downloaded from.
+
+        Returns:
+            int: Number of imported pages.
+        """
+        imported = 0
+        for name in sorted(os.listdir(path)):
+            stem, _ = os.path.splitext(name)
+            if stem.endswith("_story"):
+                url = f"{base_url}/title/{stem[:-len('_story')]}/plotsummary/"
+            else:
+                url = f"{base_url}/title/{stem}/"
+            file_path = os.path.join(path, name)
+            if not os.path.isfile(file_path) or url in self:
+                continue
+            with open(file_path, 'rb') as f:
+                self.put(url, f.read(), fetched_at=os.path.getmtime(file_path))
+            imported += 1
+        return imported
+
+    def close(self) -> None:
+        """Closes the connection."""
+        with self._lock:
+            self.conn.close()
+
+def _like_prefix(prefix: str) -> str:
+    """Escapes a URL prefix for a LIKE pattern."""
+    return prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+_page_store = None
+_page_store_lock = threading.Lock()
+
+def get_page_store() -> PageStore:
+    """
+    Returns the page store shared by the scraper threads, opened on first use from config.PAGE_STORE.
+
+    Returns:
+        PageStore: The shared store.
+    """
+    global _page_store
+    with _page_store_lock:
+        if _page_store is None:
+            _page_store = PageStore(config.PAGE_STORE["path"], codec=config.PAGE_STORE["codec"],
+                                    level=config.PAGE_STORE["level"])
+        return _page_store
+
+def main():
+    """
+    Imports old page files into the store and prints its size.
+    """
+    parser = argparse.ArgumentParser(description="Manage the raw page store.")
+    parser.add_argument("--import-dir", type=str, default=None, help="Directory of page files to import, e.g. data/raw/html_content")
+    parser.add_argument("--path", type=str, default=config.PAGE_STORE["path"], help="Page store file")
+    args = parser.parse_args()
+
+    store = PageStore(args.path, codec=config.PAGE_STORE["codec"], level=config.PAGE_STORE["level"])
+    if args.import_dir:
+        print(f"Imported {store.import_directory(args.import_dir)} pages from {args.import_dir}")
+    stats = store.stats()
+    ratio = stats["raw_bytes"] / stats["compressed_bytes"] if stats["compressed_bytes"] else 0
+    print(f"{stats['pages']} pages, {stats['blobs']} distinct bodies, "
+          f"{stats['raw_bytes'] / 1e6:.1f} MB raw, {stats['compressed_bytes'] / 1e6:.1f} MB compressed ({ratio:.1f}x)")
+    store.close()
+
+if __name__ == "__main__":
+    main()
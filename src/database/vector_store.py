@@ -0,0 +1,411 @@
+import json
+import os
+import numpy as np
+
+HEADER_FILE = "store.json"
+
+class VectorStore:
+    """
+    Base class for vector stores keyed by movie id.
+
+    A store lives in a directory holding a `store.json` header and the backend specific files.
+    All backends use squared L2 distances, so smaller distances mean closer movies.
+    Subclasses implement the backend specific methods; preprocessing and retrieval only use this interface.
+    """
+    backend = None
+
+    def __init__(self, dim, path):
+        """
+        Initializes the VectorStore.
+
+        Args:
+            dim (int): Dimension of the vectors.
+            path (str): Directory where the store is saved.
+        """
+        self.dim = int(dim)
+        self.path = path
+
+    def build(self, ids, embeddings):
+        """
+        Builds the store from scratch.
+
+        Args:
+            ids (array-like): Movie ids, one per embedding row.
+            embeddings (array-like): Embedding matrix of shape (n, dim).
+        """
+        self.reset()
+        self.add(ids, embeddings)
+
+    def reset(self):
+        """Removes every vector from the store."""
+        raise NotImplementedError
+
+    def add(self, ids, embeddings):
+        """
+        Adds vectors to the store.
+
+        Args:
+            ids (array-like): Movie ids, one per embedding row.
+            embeddings (array-like): Embedding matrix of shape (n, dim).
+        """
+        raise NotImplementedError
+
+    def delete(self, ids):
+        """
+        Deletes vectors from the store.
+
+        Args:
+            ids (iterable): Movie ids to delete.
+        """
+        raise NotImplementedError
+
+    def search(self, query_embedding, top_k=10, allowed_ids=None):
+        """
+        Finds the nearest movies to a query embedding.
+
+        Args:
+            query_embedding (array-like): Query vector of shape (dim,).
+            top_k (int, optional): Number of results to return. Defaults to 10.
+            allowed_ids (iterable, optional): Restricts the search to these movie ids. Defaults to None (no restriction).
+
+        Returns:
+            tuple: (ids, distances) as numpy arrays sorted by increasing distance.
+        """
+        raise NotImplementedError
+
+    def search_batch(self, query_embeddings, top_k=10):
+        """
+        Finds the nearest movies to every row of a query matrix in one call.
+
+        The base implementation searches the rows one by one, backends override it with their batched search.
+
+        Args:
+            query_embeddings (array-like): Query matrix of shape (q, dim).
+            top_k (int, optional): Number of results per query. Defaults to 10.
+
+        Returns:
+            tuple: (ids, distances) of shape (q, top_k) sorted by increasing distance, padded with -1 and inf.
+        """
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        ids = np.full((len(queries), top_k), -1, dtype=np.int64)
+        distances = np.full((len(queries), top_k), np.inf, dtype=np.float32)
+        for row, query in enumerate(queries):
+            found_ids, found_distances = self.search(query, top_k=top_k)
+            ids[row, :len(found_ids)] = found_ids
+            distances[row, :len(found_distances)] = found_distances
+        return ids, distances
+
+    def save(self):
+        """Saves the store to its directory."""
+        os.makedirs(self.path, exist_ok=True)
+        header = {"backend": self.backend, "dim": self.dim, "count": len(self), "params": self._params()}
+        with open(os.path.join(self.path, HEADER_FILE), "w") as f:
+            json.dump(header, f, indent=4)
+
+    def _params(self):
+        """Returns the backend parameters recorded in the header."""
+        return {}
+
+    def __len__(self):
+        raise NotImplementedError
+
+    @staticmethod
+    def _prepare(ids, embeddings):
+        """Converts ids and embeddings to the dtypes expected by the backends."""
+        ids = np.asarray(ids, dtype=np.int64)
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2 or embeddings.shape[0] != len(ids):
+            raise ValueError(f"Embeddings of shape {embeddings.shape} are not aligned with {len(ids)} ids.")
+        return ids, embeddings
+
+
+class FaissVectorStore(VectorStore):
+    """
+    Exact FAISS flat index wrapped in an id map.
+    """
+    backend = "faiss"
+    INDEX_FILE = "index.bin"
+
+    def __init__(self, dim, path="data/vector_stores/faiss"):
+        import faiss
+        super().__init__(dim, path)
+        self.faiss = faiss
+        self.reset()
+
+    def reset(self):
+        self.index = self.faiss.IndexIDMap2(self.faiss.IndexFlatL2(self.dim))
+
+    def add(self, ids, embeddings):
+        ids, embeddings = self._prepare(ids, embeddings)
+        self.index.add_with_ids(embeddings, ids)
+
+    def delete(self, ids):
+        self.index.remove_ids(np.asarray(list(ids), dtype=np.int64))
+
+    def search(self, query_embedding, top_k=10, allowed_ids=None):
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)
+        params = None
+        if allowed_ids is not None:
+            allowed_ids = np.asarray(list(allowed_ids), dtype=np.int64)
+            if not len(allowed_ids):
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            params = self.faiss.SearchParameters(sel=self.faiss.IDSelectorBatch(allowed_ids))
+
+        distances, ids = self.index.search(query, top_k, params=params)
+        # FAISS pads missing results with -1
+        found = ids[0] >= 0
+        return ids[0][found], distances[0][found]
+
+    def search_batch(self, query_embeddings, top_k=10):
+        queries = np.ascontiguousarray(query_embeddings, dtype=np.float32)
+        distances, ids = self.index.search(queries, top_k)
+        distances[ids < 0] = np.inf
+        return ids, distances
+
+    def save(self):
+        super().save()
+        self.faiss.write_index(self.index, os.path.join(self.path, self.INDEX_FILE))
+
+    @classmethod
+    def load(cls, path, header):
+        store = cls(header["dim"], path)
+        store.index = store.faiss.read_index(os.path.join(path, cls.INDEX_FILE))
+        return store
+
+    def __len__(self):
+        return self.index.ntotal
+
+
+class HnswVectorStore(VectorStore):
+    """
+    In-process approximate HNSW graph built with hnswlib.
+    """
+    backend = "hnsw"
+    INDEX_FILE = "index.bin"
+
+    def __init__(self, dim, path="data/vector_stores/hnsw", m=16, ef_construction=200, ef_search=64):
+        """
+        Initializes the HnswVectorStore.
+
+        Args:
+            dim (int): Dimension of the vectors.
+            path (str, optional): Directory where the store is saved. Defaults to "data/vector_stores/hnsw".
+            m (int, optional): Number of graph links per node. Defaults to 16.
+            ef_construction (int, optional): Candidate list size while building. Defaults to 200.
+            ef_search (int, optional): Candidate list size while searching. Defaults to 64.
+        """
+        import hnswlib
+        super().__init__(dim, path)
+        self.hnswlib = hnswlib
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.reset()
+
+    def reset(self, max_elements=1024):
+        self.index = self.hnswlib.Index(space="l2", dim=self.dim)
+        self.index.init_index(max_elements=max_elements, ef_construction=self.ef_construction,
+                              M=self.m, allow_replace_deleted=True)
+        self.index.set_ef(self.ef_search)
+        self.deleted = set()
+        # Movie ids searchable in the index, hnswlib raises when asked for more results than the filter can match
+        self.labels = set()
+
+    def build(self, ids, embeddings):
+        ids, embeddings = self._prepare(ids, embeddings)
+        self.reset(max_elements=max(len(ids), 1))
+        self.add(ids, embeddings)
+
+    def add(self, ids, embeddings):
+        ids, embeddings = self._prepare(ids, embeddings)
+        required = self.index.get_current_count() + len(ids)
+        if required > self.index.get_max_elements():
+            self.index.resize_index(max(required, 2 * self.index.get_max_elements()))
+        self.index.add_items(embeddings, ids, replace_deleted=True)
+        self.deleted.difference_update(int(i) for i in ids)
+        self.labels.update(int(i) for i in ids)
+
+    def delete(self, ids):
+        for movie_id in ids:
+            movie_id = int(movie_id)
+            if movie_id in self.labels:
+                self.index.mark_deleted(movie_id)
+                self.deleted.add(movie_id)
+                self.labels.discard(movie_id)
+
+    def search(self, query_embedding, top_k=10, allowed_ids=None):
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)
+        available = len(self)
+        filter_function = None
+        if allowed_ids is not None:
+            # Ids missing from the index, e.g. movies not embedded yet, cannot be returned
+            allowed_ids = {int(i) for i in allowed_ids} & self.labels
+            available = len(allowed_ids)
+            filter_function = allowed_ids.__contains__
+
+        # hnswlib raises if it cannot return k results, so never ask for more than exist
+        k = min(top_k, available)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        self.index.set_ef(max(self.ef_search, k))
+        ids, distances = self.index.knn_query(query, k=k, filter=filter_function)
+        return ids[0].astype(np.int64), distances[0]
+
+    def search_batch(self, query_embeddings, top_k=10):
+        queries = np.ascontiguousarray(query_embeddings, dtype=np.float32)
+        ids = np.full((len(queries), top_k), -1, dtype=np.int64)
+        distances = np.full((len(queries), top_k), np.inf, dtype=np.float32)
+        k = min(top_k, len(self))
+        if k <= 0 or not len(queries):
+            return ids, distances
+
+        # hnswlib spreads the queries of one call over all cores
+        self.index.set_ef(max(self.ef_search, k))
+        found_ids, found_distances = self.index.knn_query(queries, k=k)
+        ids[:, :k] = found_ids
+        distances[:, :k] = found_distances
+        return ids, distances
+
+    def save(self):
+        super().save()
+        self.index.save_index(os.path.join(self.path, self.INDEX_FILE))
+
+    def _params(self):
+        return {"m": self.m, "ef_construction": self.ef_construction, "ef_search": self.ef_search,
+                "deleted": sorted(self.deleted)}
+
+    @classmethod
+    def load(cls, path, header):
+        params = dict(header["params"])
+        deleted = params.pop("deleted", [])
+        store = cls(header["dim"], path, **params)
+        store.index.load_index(os.path.join(path, cls.INDEX_FILE), allow_replace_deleted=True)
+        store.index.set_ef(store.ef_search)
+        store.deleted = set(deleted)
+        store.labels = {int(i) for i in store.index.get_ids_list()} - store.deleted
+        return store
+
+    def __len__(self):
+        return len(self.labels)
+
+
+class QdrantVectorStore(VectorStore):
+    """
+    Embedded on-disk Qdrant collection running in local mode, no server required.
+    """
+    backend = "qdrant"
+    COLLECTION = "movies"
+    BATCH_SIZE = 1024
+
+    def __init__(self, dim, path="data/vector_stores/qdrant"):
+        from qdrant_client import QdrantClient, models
+        super().__init__(dim, path)
+        self.models = models
+        os.makedirs(path, exist_ok=True)
+        # Local mode persists every write to the directory
+        self.client = QdrantClient(path=os.path.join(path, "collection"))
+        if not self.client.collection_exists(self.COLLECTION):
+            self.reset()
+
+    def reset(self):
+        if self.client.collection_exists(self.COLLECTION):
+            self.client.delete_collection(self.COLLECTION)
+        self.client.create_collection(
+            collection_name=self.COLLECTION,
+            vectors_config=self.models.VectorParams(size=self.dim, distance=self.models.Distance.EUCLID),
+        )
+
+    def add(self, ids, embeddings):
+        ids, embeddings = self._prepare(ids, embeddings)
+        for start in range(0, len(ids), self.BATCH_SIZE):
+            end = start + self.BATCH_SIZE
+            self.client.upsert(
+                collection_name=self.COLLECTION,
+                points=self.models.Batch(ids=ids[start:end].tolist(), vectors=embeddings[start:end].tolist()),
+            )
+
+    def delete(self, ids):
+        self.client.delete(
+            collection_name=self.COLLECTION,
+            points_selector=self.models.PointIdsList(points=[int(i) for i in ids]),
+        )
+
+    def search(self, query_embedding, top_k=10, allowed_ids=None):
+        query_filter = None
+        if allowed_ids is not None:
+            allowed_ids = [int(i) for i in allowed_ids]
+            if not allowed_ids:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            query_filter = self.models.Filter(must=[self.models.HasIdCondition(has_id=allowed_ids)])
+
+        points = self.client.query_points(
+            collection_name=self.COLLECTION,
+            query=np.asarray(query_embedding, dtype=np.float32).tolist(),
+            query_filter=query_filter,
+            limit=top_k,
+        ).points
+        ids = np.array([point.id for point in points], dtype=np.int64)
+        # Qdrant returns the euclidean distance, square it to match the other backends
+        distances = np.array([point.score for point in points], dtype=np.float32) ** 2
+        return ids, distances
+
+    def search_batch(self, query_embeddings, top_k=10):
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        ids = np.full((len(queries), top_k), -1, dtype=np.int64)
+        distances = np.full((len(queries), top_k), np.inf, dtype=np.float32)
+        for start in range(0, len(queries), self.BATCH_SIZE):
+            responses = self.client.query_batch_points(
+                collection_name=self.COLLECTION,
+                requests=[self.models.QueryRequest(query=query.tolist(), limit=top_k)
+                          for query in queries[start:start + self.BATCH_SIZE]],
+            )
+            for row, response in enumerate(responses, start):
+                ids[row, :len(response.points)] = [point.id for point in response.points]
+                distances[row, :len(response.points)] = [point.score ** 2 for point in response.points]
+        return ids, distances
+
+    @classmethod
+    def load(cls, path, header):
+        return cls(header["dim"], path)
+
+    def __len__(self):
+        return self.client.count(self.COLLECTION, exact=True).count
+
+
+VECTOR_STORES = {
+    FaissVectorStore.backend: FaissVectorStore,
+    HnswVectorStore.backend: HnswVectorStore,
+    QdrantVectorStore.backend: QdrantVectorStore,
+}
+
+def create_vector_store(backend, dim, path=None, **params):
+    """
+    Creates an empty vector store.
+
+    Args:
+        backend (str): Name of the backend, one of `VECTOR_STORES`.
+        dim (int): Dimension of the vectors.
+        path (str, optional): Directory of the store. Defaults to "data/vector_stores/<backend>".
+        **params: Backend specific parameters.
+
+    Returns:
+        VectorStore: The created store.
+    """
+    if backend not in VECTOR_STORES:
+        raise ValueError(f"Unknown vector store '{backend}'. Options: {', '.join(VECTOR_STORES)}")
+    return VECTOR_STORES[backend](dim, path or f"data/vector_stores/{backend}", **params)
+
+def load_vector_store(path):
+    """
+    Loads a saved vector store, the backend is read from the store header.
+
+    Args:
+        path (str): Directory of the store.
+
+    Returns:
+        VectorStore: The loaded store.
+    """
+    with open(os.path.join(path, HEADER_FILE), "r") as f:
+        header = json.load(f)
+    return VECTOR_STORES[header["backend"]].load(path, header)
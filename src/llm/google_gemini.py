@@ -1,16 +1,30 @@
-from google import genai
-from google.genai import types
 import os
 from dotenv import load_dotenv
 from pydantic import BaseModel
 import time
 import json
 
+from src.core.tracing import tracer
+from src.llm.provider import LLMProvider
+
 # Load environment variables from .env file
 load_dotenv()
 
-# Initialize the Gemini client with the API key from environment variables
-client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+# The Gemini client is created on first use, so importing this module needs neither the SDK nor an API key
+_client = None
+
+def get_client():
+    """
+    Returns the shared Gemini client, created on first use with the API key from environment variables.
+
+    Returns:
+        genai.Client: The Gemini client.
+    """
+    global _client
+    if _client is None:
+        from google import genai
+        _client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+    return _client
 
 class GenrePreference(BaseModel):
     """
@@ -27,7 +41,7 @@ class GenrePreference(BaseModel):
     liked_years: list[int]
     liked_rating: float
 
-class Gemini:
+class Gemini(LLMProvider):
     """
     A class for interacting with the Google Gemini language model.
     
@@ -41,9 +55,7 @@ class Gemini:
             model_info (dict): A dictionary containing model name and requests per minute (rpm).
             json_output (bool, optional): Whether to format the output as JSON. Defaults to False.
         """
-        self.model_name = model_info['name']
-        self.rpm = model_info['rpm']
-        self.json_output = json_output
+        super().__init__(model_info, json_output)
         self.call_timestamps = []
 
     def generate_response(self, prompt, max_output_tokens=300, temperature=0.7):
@@ -71,44 +83,52 @@ class Gemini:
             time_to_sleep = 60 - (current_time - self.call_timestamps[0])
             if time_to_sleep > 0:
                 print(f"Rate limit reached. Sleeping for {time_to_sleep:.2f} seconds.")
-                time.sleep(time_to_sleep)
+                with tracer.span("llm.rate_limit_wait", model=self.model_name):
+                    time.sleep(time_to_sleep)
 
         # Call the LLM API to generate a response
+        from google.genai import types
+        client = get_client()
         print(f"Generating response...")
-        counter = 1
-        while counter <= 3:
-            try:
-                if self.json_output:
-                    # Generate content with JSON output format
-                    response = client.models.generate_content(
-                        model=self.model_name,
-                        contents=prompt,
-                        config={
-                            'response_mime_type': 'application/json',
-                            'response_schema': list[GenrePreference],
-                        },
-                    )
-                else:
-                    # Generate content with plain text output format
-                    response = client.models.generate_content(
-                        model=self.model_name,
-                        contents=prompt,
-                        config=types.GenerateContentConfig(
-                            max_output_tokens=max_output_tokens,
-                            temperature=temperature
+        with tracer.span("llm.generate", model=self.model_name, json_output=self.json_output, prompt_chars=len(prompt)) as span:
+            counter = 1
+            while counter <= 3:
+                try:
+                    if self.json_output:
+                        # Generate content with JSON output format
+                        response = client.models.generate_content(
+                            model=self.model_name,
+                            contents=prompt,
+                            config={
+                                'response_mime_type': 'application/json',
+                                'response_schema': list[GenrePreference],
+                            },
+                        )
+                    else:
+                        # Generate content with plain text output format
+                        response = client.models.generate_content(
+                            model=self.model_name,
+                            contents=prompt,
+                            config=types.GenerateContentConfig(
+                                max_output_tokens=max_output_tokens,
+                                temperature=temperature
+                            )
                         )
-                    )
 
-                print("Generated Summary: " + response.text.strip() + "\n")
-                break  # Exit loop if successful
-            except Exception as e:
-                print(f"Attempt {counter} failed: {e}")
-                counter += 1
-                time.sleep(5)
-        else:
-            # This else executes if the loop did not break, i.e. after 3 failed attempts
-            # Raise exception and log the error details
-            raise Exception("Failed to generate summary after 3 attempts. Please try again later.")
+                    print("Generated Summary: " + response.text.strip() + "\n")
+                    span.set(attempts=counter, response_chars=len(response.text))
+                    usage = getattr(response, "usage_metadata", None)
+                    if usage is not None:
+                        span.set(prompt_tokens=usage.prompt_token_count, output_tokens=usage.candidates_token_count)
+                    break  # Exit loop if successful
+                except Exception as e:
+                    print(f"Attempt {counter} failed: {e}")
+                    counter += 1
+                    time.sleep(5)
+            else:
+                # This else executes if the loop did not break, i.e. after 3 failed attempts
+                # Raise exception and log the error details
+                raise Exception("Failed to generate summary after 3 attempts. Please try again later.")
             
         # Update call timestamps
         self.call_timestamps.append(time.time())
@@ -0,0 +1,203 @@
+import ast
+import hashlib
+import json
+import math
+import re
+import time
+
+import config
+from src.core.tracing import tracer
+
+def estimate_tokens(text):
+    """
+    Estimates the number of tokens of a text without calling a tokenizer, at about 4 characters per token.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        int: The estimated token count.
+    """
+    return math.ceil(len(text) / 4)
+
+class LLMProvider:
+    """
+    Interface of the language models used by the pipeline.
+
+    Providers are created from a model info dictionary of config.py (name and rpm) and return either text
+    or, with json_output, the extracted features dictionary.
+    """
+    def __init__(self, model_info, json_output=False):
+        """
+        Initializes the LLMProvider.
+
+        Args:
+            model_info (dict): A dictionary containing model name and requests per minute (rpm).
+            json_output (bool, optional): Whether to return the features dictionary instead of text. Defaults to False.
+        """
+        self.model_name = model_info['name']
+        self.rpm = model_info['rpm']
+        self.json_output = json_output
+
+    def generate_response(self, prompt, max_output_tokens=300, temperature=0.7):
+        """
+        Generates a response for a prompt.
+
+        Args:
+            prompt (str): The input prompt for the language model.
+            max_output_tokens (int, optional): The maximum number of tokens in the output. Defaults to 300.
+            temperature (float, optional): The temperature for controlling the randomness of the output. Defaults to 0.7.
+
+        Returns:
+            str or dict: The generated text, or the features dictionary if json_output is set.
+        """
+        raise NotImplementedError
+
+class FakeLLM(LLMProvider):
+    """
+    Deterministic local stand-in for the Gemini models, for offline runs and load tests.
+
+    Responses depend only on the prompt: features are read from the genres mentioned in the user query,
+    HyDE and recommendation texts are canned templates filled with the query. Each call sleeps for a
+    configurable latency with a jitter seeded by the prompt, so repeated runs take the same time.
+    """
+    SYNOPSES = [
+        "A weary investigator follows a trail of small lies that leads to a secret the whole town has kept for decades.",
+        "Two strangers stuck together on a long journey slowly learn to trust each other while trouble closes in.",
+        "A family gathering turns into a fight for survival when an old threat returns on the night of a storm.",
+        "An ambitious young woman risks everything she has built to expose the people who raised her up.",
+        "A group of misfits is forced to work together on one last job that goes wrong in every possible way.",
+    ]
+
+    def __init__(self, model_info, json_output=False, latency=None, jitter=None):
+        """
+        Initializes the FakeLLM.
+
+        Args:
+            model_info (dict): A dictionary containing model name and requests per minute (rpm).
+            json_output (bool, optional): Whether to return the features dictionary instead of text. Defaults to False.
+            latency (float, optional): Mean seconds per call. Defaults to config.FAKE_LLM["latency"].
+            jitter (float, optional): Relative latency variation, 0.2 means +/-20%. Defaults to config.FAKE_LLM["jitter"].
+        """
+        super().__init__(model_info, json_output)
+        self.latency = config.FAKE_LLM["latency"] if latency is None else latency
+        self.jitter = config.FAKE_LLM["jitter"] if jitter is None else jitter
+
+    def _seed(self, prompt):
+        """Returns a stable number derived from the prompt."""
+        return int.from_bytes(hashlib.blake2b(prompt.encode("utf-8"), digest_size=8).digest(), "big")
+
+    def _user_query(self, prompt):
+        """Finds the user query inside one of the pipeline prompts."""
+        for pattern in (r"user query: '(.*?)', identify", r"User Input: (.*?)\n", r"\*\*User Query:\*\* (.*?)\n"):
+            match = re.search(pattern, prompt, flags=re.DOTALL)
+            if match:
+                return match.group(1).strip()
+        return prompt.strip()[-200:]
+
+    def _features(self, prompt):
+        """Builds a features dictionary from the genres and years mentioned in the user query."""
+        query = self._user_query(prompt).lower()
+        match = re.search(r"genres list to choose from: (\[.*?\])", prompt)
+        try:
+            genres = ast.literal_eval(match.group(1)) if match else []
+        except (ValueError, SyntaxError):
+            genres = []
+
+        liked, disliked = [], []
+        for genre in genres:
+            position = query.find(str(genre).lower())
+            if position < 0:
+                continue
+            # A negation shortly before the genre makes it disliked
+            before = query[max(0, position - 25):position]
+            (disliked if re.search(r"\b(not|no|dislike|hate|without|avoid)\b", before) else liked).append(genre)
+
+        liked_years = []
+        decade = re.search(r"\b(19|20)?(\d)0s\b", query)
+        if decade:
+            start = int((decade.group(1) or ("19" if int(decade.group(2)) >= 3 else "20")) + decade.group(2) + "0")
+            liked_years = [start, start + 9]
+        rating = re.search(r"\+\s*(\d+(?:\.\d+)?)|at ?least (\d+(?:\.\d+)?)", query)
+
+        return {
+            "liked_genres": liked,
+            "disliked_genres": disliked,
+            "liked_stars": [],
+            "disliked_stars": [],
+            "liked_directors": [],
+            "disliked_directors": [],
+            "liked_years": liked_years,
+            "liked_rating": float(next(g for g in rating.groups() if g)) if rating else 0.0,
+        }
+
+    def _movie_titles(self, prompt):
+        """Reads the titles of the movie rows (tab-separated or JSON lines) of a recommendation prompt."""
+        match = re.search(r"Retrieved Movie List[^\n]*\n(.*?)\*\*Task", prompt, flags=re.DOTALL)
+        lines = [line.strip(" \r") for line in (match.group(1) if match else "").splitlines() if line.strip()]
+        if lines and lines[0].startswith("{"):
+            return [json.loads(line).get("title", "") for line in lines]
+        header = lines[0].split("\t") if lines else []
+        if "title" not in header:
+            return []
+        column = header.index("title")
+        return [line.split("\t")[column] for line in lines[1:] if len(line.split("\t")) > column]
+
+    def _text(self, prompt):
+        """Fills a canned synopsis or recommendation with the user query."""
+        query = self._user_query(prompt)
+        synopsis = self.SYNOPSES[self._seed(prompt) % len(self.SYNOPSES)]
+        if "Retrieved Movie List" in prompt:
+            titles = self._movie_titles(prompt)[:3]
+            picks = "\n".join(f"{i}. **{title}**\n  - Reason: Matches your request." for i, title in enumerate(titles, 1))
+            return f"Based on your request \"{query}\", here are my picks:\n{picks}"
+        return f"{synopsis} The story leans into what the viewer asked for: {query}"
+
+    def generate_response(self, prompt, max_output_tokens=300, temperature=0.7):
+        """
+        Generates a deterministic response after the simulated latency.
+
+        Args:
+            prompt (str): The input prompt.
+            max_output_tokens (int, optional): Ignored, kept for interface compatibility. Defaults to 300.
+            temperature (float, optional): Ignored, responses are deterministic. Defaults to 0.7.
+
+        Returns:
+            str or dict: The canned text, or the features dictionary if json_output is set.
+        """
+        with tracer.span("llm.generate", model=self.model_name, provider="fake", json_output=self.json_output, prompt_chars=len(prompt),
+                         prompt_tokens=estimate_tokens(prompt)):
+            # Map the prompt hash to a factor in [1 - jitter, 1 + jitter]
+            factor = 1 + self.jitter * ((self._seed(prompt) % 2001) / 1000 - 1)
+            time.sleep(max(0.0, self.latency * factor))
+            return self._features(prompt) if self.json_output else self._text(prompt)
+
+def _create_gemini(model_info, json_output=False):
+    from src.llm.google_gemini import Gemini
+    return Gemini(model_info, json_output=json_output)
+
+# Provider name -> factory taking (model_info, json_output)
+LLM_PROVIDERS = {
+    "gemini": _create_gemini,
+    "fake": FakeLLM,
+}
+
+def create_llm(model_info, json_output=False, provider=None):
+    """
+    Creates the language model of a pipeline component.
+
+    Args:
+        model_info (dict): A dictionary containing model name and requests per minute (rpm), e.g. config.HYDE_MODEL.
+        json_output (bool, optional): Whether to return the features dictionary instead of text. Defaults to False.
+        provider (str, optional): Name of the provider. Defaults to config.LLM_PROVIDER.
+
+    Returns:
+        LLMProvider: The language model.
+
+    Raises:
+        ValueError: If the provider is unknown.
+    """
+    provider = provider or config.LLM_PROVIDER
+    if provider not in LLM_PROVIDERS:
+        raise ValueError(f"Unknown LLM provider '{provider}'. Options: {', '.join(LLM_PROVIDERS)}")
+    return LLM_PROVIDERS[provider](model_info, json_output=json_output)
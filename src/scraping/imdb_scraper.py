@@ -1,6 +1,8 @@
 from bs4 import BeautifulSoup
-from .utils import browser_manager, parser
-from .utils.dynamic_helpers import *
+from concurrent.futures import ThreadPoolExecutor
+from .utils import parser
+from .utils.discovery import discover_movies
+import config
 import logging
 import time
 import random
@@ -12,7 +14,7 @@ class scrape_imdb_movies:
     """
     A class to scrape movie data from IMDb.
     """
-    def __init__(self, url, load_more, headless=True, timeout=2):
+    def __init__(self, url, load_more, headless=True, timeout=2, discovery="http"):
         """
         Initializes the scraper with the given parameters.
 
@@ -21,11 +23,14 @@ class scrape_imdb_movies:
             load_more (bool): Whether to load all movies on the page by clicking "Show More" button.
             headless (bool, optional): Whether to run the browser in headless mode. Defaults to True.
             timeout (int, optional): The maximum time to wait between actions. Defaults to 2.
+            discovery (str, optional): "http" to read the search results with plain requests and use the browser
+                                       only as a fallback, "browser" to always use the browser. Defaults to "http".
         """
         self.base_url = url
         self.load_more = load_more
         self.headless = headless
         self.timeout = timeout if timeout > 1 else 2
+        self.discovery = discovery
 
     def scrape_dynamic(self,):
         """
@@ -36,6 +41,10 @@ class scrape_imdb_movies:
         Returns:
             list: A list of dictionaries, where each dictionary represents a movie and contains its title and link.
         """
+        # Selenium is only needed for this fallback
+        from .utils import browser_manager
+        from .utils.dynamic_helpers import handle_cookies, load_all_pages, scrape_movies
+
         with browser_manager.managed_browser(headless=self.headless) as driver:
             driver.get(self.base_url)
             time.sleep(random.uniform(1, self.timeout))
@@ -47,28 +56,109 @@ class scrape_imdb_movies:
             time.sleep(random.uniform(1, self.timeout))
             return scrape_movies(driver)
 
+    def discover(self):
+        """
+        Collects the movie links of the search page.
+
+        Reads the search results and follows their pagination with plain HTTP requests. Falls back to the
+        browser if no movie is found, or if pages are missing while all of them were requested.
+
+        Returns:
+            list: A list of dictionaries, where each dictionary represents a movie and contains its title and link.
+        """
+        if self.discovery == "http":
+            print("Discovering movies from the search results...")
+            movies, total = discover_movies(self.base_url, load_more=self.load_more)
+            if movies and (not self.load_more or total is None or len(movies) >= total):
+                return movies
+            print(f" -> Found {len(movies)} of {total if total is not None else 'an unknown number of'} movies, "
+                  "falling back to the browser.")
+        return self.scrape_dynamic()
+
     def scrape_static(self, movie_links, advanced):
         """
         Requests with BeautifulSoup parsing logic.
 
         Uses BeautifulSoup to parse the HTML content of each movie page and extract details.
+        Pages are fetched by config.SCRAPER["max_workers"] threads sharing the rate limited fetcher.
 
         Args:
             movie_links (list): A list of dictionaries, where each dictionary represents a movie and contains its title and link.
             advanced (bool): A flag indicating whether to extract advanced movie details.
 
         Returns:
-            list: A list of dictionaries, where each dictionary represents a movie and contains its details.
+            list: A list of dictionaries, where each dictionary represents a movie and contains its details, in the order of `movie_links`.
         """
-        movies = []
-        for movie in movie_links:
+        def parse(movie):
             try:
-                movie_details = parser.run(movie['link'], advanced)
-                movies.append(movie_details)
+                return [parser.run(movie['link'], advanced)]
             except Exception as e:
                 logger.error(f"Error parsing {movie['link']}: {str(e)}")
+                return []
+
+        movies = []
+        with ThreadPoolExecutor(max_workers=config.SCRAPER["max_workers"], thread_name_prefix="scrape") as executor:
+            for result in executor.map(parse, movie_links):
+                movies.extend(result)
         return movies
 
+    def scrape_jobs(self, job_queue, advanced, db, batch_size=50):
+        """
+        Drains a job queue, saving the parsed movies in small batches.
+
+        Jobs are marked done only once their movie is saved, failed jobs go back to the queue until they run
+        out of attempts. Only the current batch is held in memory.
+
+        Args:
+            job_queue (ScrapeJobQueue): Queue of the movie links to scrape.
+            advanced (bool): A flag indicating whether to extract advanced movie details.
+            db (MovieDatabase): Database receiving the movies.
+            batch_size (int, optional): Movies per database transaction. Defaults to 50.
+
+        Returns:
+            dict: Number of saved movies and failed attempts.
+        """
+        def parse(job):
+            try:
+                movie_details = parser.run(job['link'], advanced)
+            except Exception as e:
+                return job, None, f"{type(e).__name__}: {e}"
+            if not movie_details:
+                return job, None, "Page could not be fetched or parsed"
+            return job, movie_details, None
+
+        def flush(batch):
+            saved = db.upsert_movies([movie for _, movie in batch])
+            if saved:
+                job_queue.complete(job['link'] for job, _ in batch)
+            else:
+                for job, _ in batch:
+                    job_queue.fail(job['link'], "Database write failed")
+            return saved
+
+        stats = {"saved": 0, "failed_attempts": 0}
+        batch = []
+        workers = config.SCRAPER["max_workers"]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scrape") as executor:
+            while True:
+                # Claim a few jobs per worker at a time, so an interruption leaves little in progress
+                jobs = job_queue.claim(workers * 2)
+                if not jobs:
+                    break
+                for job, movie_details, error in executor.map(parse, jobs):
+                    if error is not None:
+                        status = job_queue.fail(job['link'], error)
+                        stats["failed_attempts"] += 1
+                        logger.error(f"Error parsing {job['link']} (attempt {job['attempt']}, now {status}): {error}")
+                        continue
+                    batch.append((job, movie_details))
+                    if len(batch) >= batch_size:
+                        stats["saved"] += flush(batch)
+                        batch = []
+        if batch:
+            stats["saved"] += flush(batch)
+        return stats
+
     def run(self, advanced=False):
         """
         Full scraping workflow.
@@ -83,7 +173,7 @@ class scrape_imdb_movies:
         """
         all_movies = []
 
-        movie_info = self.scrape_dynamic()
+        movie_info = self.discover()
         all_movies = self.scrape_static(movie_info, advanced)
 
         return all_movies
@@ -0,0 +1,157 @@
+"""
+Parses the stored raw pages again and saves the movies to SQLite DB, without network or browser.
+Usage: python -m src.scraping.reparse --search advanced --workers 8
+
+Run it after changing the extraction logic to rebuild the catalog from the page store.
+"""
+
+import argparse
+import json
+import os
+import time
+import traceback
+from multiprocessing import Pool
+
+from tqdm import tqdm
+
+import config
+from src.database.db_manager import MovieDatabase
+from src.database.page_store import PageStore
+from src.scraping.utils.extraction import extract_movie, extract_plot
+
+# Page store of the worker process, opened once by `_init_worker`
+_store = None
+
+def _init_worker(store_path):
+    """Opens the page store in a worker process, SQLite connections cannot be shared across processes."""
+    global _store
+    _store = PageStore(store_path, codec=config.PAGE_STORE["codec"])
+
+def parse_stored_movie(task):
+    """
+    Parses the stored title page of a movie, and its plot summary page in advanced mode.
+
+    Args:
+        task (tuple): (title page URL, advanced flag).
+
+    Returns:
+        tuple: (url, movie details or None, error message or None)
+    """
+    url, advanced = task
+    try:
+        data = _store.get(url)
+        if data is None:
+            return url, None, "Page not in store"
+        details = extract_movie(data, advanced)
+        details["link"] = url
+
+        if advanced:
+            plot_page = _store.get(f"{url}plotsummary/")
+            if plot_page is not None:
+                details["summary"], details["synopsis"] = extract_plot(plot_page)
+        return url, details, None
+    except Exception as e:
+        return url, None, "".join(traceback.format_exception_only(type(e), e)).strip()
+
+def title_page_urls(store):
+    """
+    Lists the stored title pages.
+
+    Args:
+        store (PageStore): The page store.
+
+    Returns:
+        list: URLs of the title pages, plot summary pages excluded.
+    """
+    return [url for url in store.urls(f"{config.IMDB_BASE_URL}/title/") if not url.endswith("/plotsummary/")]
+
+def reparse(store_path, db, advanced=False, workers=None, batch_size=500, error_path=None, limit=None):
+    """
+    Parses every stored title page on a process pool and upserts the movies in batches.
+
+    Args:
+        store_path (str): Page store file.
+        db (MovieDatabase): Database receiving the movies, None for a dry run.
+        advanced (bool, optional): Whether to extract the review, summaries and synopsis. Defaults to False.
+        workers (int, optional): Worker processes. Defaults to the number of CPUs.
+        batch_size (int, optional): Movies per database transaction. Defaults to 500.
+        error_path (str, optional): JSON lines file receiving the failed pages. Defaults to None.
+        limit (int, optional): Maximum number of pages. Defaults to None (all).
+
+    Returns:
+        dict: Parsed, saved and failed page counts, errors grouped by message and the elapsed time.
+    """
+    store = PageStore(store_path, codec=config.PAGE_STORE["codec"])
+    urls = title_page_urls(store)[:limit]
+    store.close()
+
+    workers = workers or os.cpu_count() or 1
+    parsed, saved, errors, batch = 0, 0, [], []
+    start = time.perf_counter()
+
+    with Pool(workers, initializer=_init_worker, initargs=(store_path,)) as pool:
+        results = pool.imap_unordered(parse_stored_movie, ((url, advanced) for url in urls), chunksize=16)
+        for url, details, error in tqdm(results, total=len(urls), desc="Reparsing", unit="page"):
+            if error is not None:
+                errors.append({"url": url, "error": error})
+                continue
+            parsed += 1
+            batch.append(details)
+            if len(batch) >= batch_size:
+                saved += db.upsert_movies(batch) if db else 0
+                batch = []
+        if batch and db:
+            saved += db.upsert_movies(batch)
+
+    if error_path and errors:
+        os.makedirs(os.path.dirname(error_path) or ".", exist_ok=True)
+        with open(error_path, "w", encoding="utf-8") as f:
+            for error in errors:
+                f.write(json.dumps(error) + "\n")
+
+    by_message = {}
+    for error in errors:
+        message = error["error"].splitlines()[-1]
+        by_message[message] = by_message.get(message, 0) + 1
+
+    return {
+        "pages": len(urls),
+        "parsed": parsed,
+        "saved": saved,
+        "failed": len(errors),
+        "errors": dict(sorted(by_message.items(), key=lambda item: -item[1])),
+        "seconds": time.perf_counter() - start,
+    }
+
+def main():
+    """
+    Main function to reparse the page store into the database.
+    """
+    parser = argparse.ArgumentParser(description="Rebuild the movies table from the stored raw pages.")
+    parser.add_argument("--search", choices=["basic", "advanced"], default="basic",
+                        help="advanced also extracts the review, summaries and synopsis")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes, defaults to the number of CPUs")
+    parser.add_argument("--batch-size", type=int, default=500, help="Movies per database transaction")
+    parser.add_argument("--store", type=str, default=config.PAGE_STORE["path"], help="Page store file")
+    parser.add_argument("--db", type=str, default="data/processed/movies.db", help="Movie database file")
+    parser.add_argument("--errors", type=str, default="data/logs/reparse_errors.jsonl", help="Report of the failed pages")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of pages")
+    parser.add_argument("--dry-run", action="store_true", help="Parse without saving to DB")
+    args = parser.parse_args()
+
+    db = None if args.dry_run else MovieDatabase(args.db)
+    report = reparse(args.store, db, advanced=args.search == "advanced", workers=args.workers,
+                     batch_size=args.batch_size, error_path=args.errors, limit=args.limit)
+    if db:
+        db.close()
+
+    rate = report["parsed"] / report["seconds"] if report["seconds"] else 0
+    print(f"Parsed {report['parsed']} of {report['pages']} pages in {report['seconds']:.1f}s ({rate:.0f} pages/s), "
+          f"added or updated {report['saved']} movies in database")
+    if report["failed"]:
+        print(f"{report['failed']} pages failed, details in {args.errors}:")
+        for message, count in list(report["errors"].items())[:10]:
+            print(f"    {count} x {message}")
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,17 @@ Usage: python -m src.scraping.run_scraper --source imdb --max-pages 5
 """
 
 import argparse
+import config
 from src.database.db_manager import MovieDatabase
+from src.database.job_queue import ScrapeJobQueue
 from src.scraping.imdb_scraper import scrape_imdb_movies
 
 def main():
     """
     Main function to run the scraper and save data to the database.
+
+    Discovered movie links go to a persistent job queue (config.SCRAPE_QUEUE) that the workers drain,
+    saving movies in small batches. Run again with --resume to continue an interrupted run.
     """
     # CLI arguments (showcasing production-grade design)
     parser = argparse.ArgumentParser()
@@ -20,29 +25,50 @@ def main():
                        help="Test scraping without saving to DB")
     parser.add_argument("--link", type=str, default="https://www.imdb.com/search/title/?title=The%20Godfather&title_type=feature&runtime=120",
                        help="Link to scrape from")
+    parser.add_argument("--discovery", choices=["http", "browser"], default="http",
+                       help="http reads the search results without a browser and falls back to it if needed")
+    parser.add_argument("--resume", action="store_true",
+                       help="Skip link discovery and finish the jobs already queued")
+    parser.add_argument("--retry-failed", action="store_true",
+                       help="Queue the jobs that ran out of attempts again")
+    parser.add_argument("--batch-size", type=int, default=config.SCRAPE_QUEUE["batch_size"],
+                       help="Movies saved per database transaction")
 
     args = parser.parse_args()
+    advanced = args.search == "advanced"
+
+    scrape = scrape_imdb_movies(args.link, args.load_pages, discovery=args.discovery)
+
+    if args.dry_run:
+        movies = scrape.run(advanced=advanced)
+        print("[Dry run] Sample movie:", movies[0] if movies else None)
+        return
+
+    job_queue = ScrapeJobQueue(config.SCRAPE_QUEUE["path"], max_attempts=config.SCRAPE_QUEUE["max_attempts"])
+    recovered = job_queue.recover()
+    if recovered:
+        print(f"Resuming {recovered} jobs left in progress by an interrupted run")
+    if args.retry_failed:
+        print(f"Queued {job_queue.retry_failed()} failed jobs again")
+
+    # Discover the movie links unless only the queued jobs should be finished
+    if not args.resume:
+        added = job_queue.enqueue(scrape.discover())
+        print(f"Queued {added} new movie links")
+
+    # Initialize database
+    db = MovieDatabase()
+    stats = scrape.scrape_jobs(job_queue, advanced, db, batch_size=args.batch_size)
+    db.close()
+    print(f"Added or updated {stats['saved']} movies in database")
 
-    movies = []
-
-    scrape = scrape_imdb_movies(args.link, args.load_pages)
-
-    # Scrape based on search
-    if args.search == "basic":
-        movies = scrape.run()
-    elif args.search == "advanced":
-        movies = scrape.run(advanced=True)
-    
-    # Save to DB unless dry-run
-    if not args.dry_run:
-        # Initialize database
-        db = MovieDatabase()
-        for movie_data in movies:
-            db.insert_movie_data(movie_data)
-        db.close()
-        print(f"Added {len(movies)} movies to database")
-    else:
-        print("[Dry run] Sample movie:", movies[0])
+    counts = job_queue.counts()
+    print(f"Jobs: {counts['done']} done, {counts['pending']} pending, {counts['failed']} failed")
+    for job in job_queue.failures(limit=10):
+        print(f"    Failed after {job['attempts']} attempts: {job['link']} ({job['last_error']})")
+    if counts["failed"]:
+        print("Run again with --resume --retry-failed to retry the failed jobs.")
+    job_queue.close()
 
 if __name__ == "__main__":
     main()
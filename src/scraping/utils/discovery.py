@@ -0,0 +1,140 @@
+import html
+import re
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+import config
+from .extraction import dig, next_data
+from .fetcher import get_fetcher
+
+# Title links and titles of the search result items, e.g. <a href="/title/tt0068646/?ref_=sr_t_1" class="ipc-title-link-wrapper"><h3 class="ipc-title__text">1. The Godfather</h3>
+RESULT_LINK_PATTERN = re.compile(
+    rb'<a[^>]*href="(/title/(tt\d{7,8})/[^"]*)"[^>]*class="[^"]*ipc-title-link-wrapper[^"]*"[^>]*>\s*<h3[^>]*>(.*?)</h3>', re.S)
+NEXT_LINK_PATTERN = re.compile(rb'<a[^>]*rel="next"[^>]*href="([^"]+)"|<a[^>]*href="([^"]+)"[^>]*rel="next"')
+RANK_PATTERN = re.compile(r"^\d+\.\s+")
+
+def movie_link(movie_id, base_url=None):
+    """
+    Builds the canonical title page link of a movie.
+
+    Args:
+        movie_id (str): The IMDb ID of the movie.
+        base_url (str, optional): Site of the link. Defaults to config.IMDB_BASE_URL.
+
+    Returns:
+        str: The link, without tracking parameters.
+    """
+    return f"{base_url or config.IMDB_BASE_URL}/title/{movie_id}/"
+
+def _title_text(value):
+    """Reads a title that is either a string or a {"text": ...} object."""
+    text = value.get("text") if isinstance(value, dict) else value
+    return html.unescape(text).strip() if isinstance(text, str) else None
+
+def parse_listing(data, page_url=None):
+    """
+    Extracts the movies and the pagination state of a search results page.
+
+    The embedded Next.js data is read first. The result items of the HTML are scanned only if it holds no results.
+
+    Args:
+        data (bytes): Raw search results page.
+        page_url (str, optional): URL of the page, to resolve a relative next page link. Defaults to None.
+
+    Returns:
+        dict: movies (title and link of each result, in page order), total (results of the whole search, None
+              if unknown), cursor (end cursor of the embedded data, None if there is none) and next_url
+              (next page link of the HTML, None if there is none).
+    """
+    movies, total, cursor, next_url = [], None, None, None
+
+    results = dig(next_data(data), "searchResults", "titleResults") or {}
+    for item in results.get("titleListItems") or []:
+        movie_id = item.get("titleId") or dig(item, "title", "id")
+        title = _title_text(item.get("titleText")) or _title_text(item.get("originalTitleText"))
+        if movie_id:
+            movies.append({"title": title or "N/A", "link": movie_link(movie_id)})
+    total = results.get("total")
+    page_info = results.get("pageInfo") or {}
+    if page_info.get("hasNextPage"):
+        cursor = page_info.get("endCursor")
+    elif results.get("endCursor") and results.get("hasNextPage"):
+        cursor = results["endCursor"]
+
+    if not movies:
+        for _, movie_id, title in RESULT_LINK_PATTERN.findall(data):
+            title = html.unescape(re.sub(r"<[^>]+>", "", title.decode("utf-8", "replace"))).strip()
+            movies.append({"title": RANK_PATTERN.sub("", title), "link": movie_link(movie_id.decode())})
+
+    match = NEXT_LINK_PATTERN.search(data)
+    if match:
+        href = html.unescape((match.group(1) or match.group(2)).decode())
+        next_url = urljoin(page_url, href) if page_url else href
+
+    return {"movies": movies, "total": total, "cursor": cursor, "next_url": next_url}
+
+def with_query(url, **params):
+    """
+    Sets query parameters of a URL.
+
+    Args:
+        url (str): The URL.
+        **params: Parameters to set.
+
+    Returns:
+        str: The URL with the parameters replaced or added.
+    """
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query, keep_blank_values=True))
+    query.update(params)
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+def discover_movies(url, load_more=True, max_pages=200, fetch=None):
+    """
+    Collects the movie links of a search with plain HTTP requests, following the pagination.
+
+    The next page is the next link of the HTML if there is one, otherwise the search URL with the end cursor
+    of the embedded data as `after` parameter. Discovery stops when a page brings no new movie.
+
+    Args:
+        url (str): Search results URL.
+        load_more (bool, optional): Whether to follow the pagination or read the first page only. Defaults to True.
+        max_pages (int, optional): Maximum number of pages. Defaults to 200.
+        fetch (callable, optional): Function returning the raw page of a URL or None, e.g. to read saved pages.
+                                    Defaults to the shared page fetcher.
+
+    Returns:
+        tuple: (movies, total) with the title and link of each movie in result order, and the number of
+               results announced by the search (None if unknown).
+    """
+    if fetch is None:
+        def fetch(page_url):
+            result = get_fetcher().fetch(page_url)
+            if not result.ok:
+                print(f"Failed to fetch search results: {result.error} \nFailed url: {page_url}")
+            return result.content if result.ok else None
+
+    movies, seen, total = [], set(), None
+    page_url, pages = url, 0
+    while page_url and pages < max_pages:
+        data = fetch(page_url)
+        pages += 1
+        if not data:
+            break
+
+        listing = parse_listing(data, page_url)
+        total = listing["total"] if listing["total"] is not None else total
+        new_movies = [movie for movie in listing["movies"] if movie["link"] not in seen]
+        seen.update(movie["link"] for movie in new_movies)
+        movies.extend(new_movies)
+        print(f" -> Page {pages}: {len(new_movies)} new movies ({len(movies)}{f' of {total}' if total else ''})")
+
+        if not load_more or not new_movies:
+            break
+        if listing["next_url"]:
+            page_url = listing["next_url"]
+        elif listing["cursor"]:
+            page_url = with_query(url, after=listing["cursor"])
+        else:
+            page_url = None
+
+    return movies, total
@@ -0,0 +1,390 @@
+import html
+import json
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Script tags holding the structured data IMDb embeds in every page
+JSON_LD_PATTERN = re.compile(rb'<script[^>]*type="application/ld\+json"[^>]*>')
+NEXT_DATA_PATTERN = re.compile(rb'<script[^>]*id="__NEXT_DATA__"[^>]*>')
+
+HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+ISO_DURATION_PATTERN = re.compile(r"PT(?:(\d+)H)?(?:(\d+)M)?")
+RUNTIME_TEXT_PATTERN = re.compile(r"^(?:(\d+)\s*h)?\s*(?:(\d+)\s*m)?")
+PLOT_AUTHOR_PATTERN = re.compile(r"plot_author=")
+
+# Elements the fallback parser keeps, located by their test ids rather than generated class names
+MOVIE_PAGE_TEST_IDS = [
+    "hero__primary-text", "hero-rating-bar__aggregate-rating", "plot-xl", "title-pc-principal-credit",
+    "genres", "interests", "title-details-releasedate", "title-techspec_runtime", "storyline-certificate",
+    "reviewContent-all-reviews", "UserReviews",
+]
+PLOT_PAGE_TEST_IDS = ["sub-section-summaries", "sub-section-synopsis"]
+
+try:
+    import lxml  # noqa: F401
+    FALLBACK_PARSER = "lxml"
+except ImportError:
+    FALLBACK_PARSER = "html.parser"
+
+def empty_details():
+    """
+    Returns the movie fields with their placeholders.
+
+    Returns:
+        dict: Every scraped field set to "N/A" or 0.
+    """
+    return {
+        "title": "N/A",
+        "year": 0,
+        "imdb_rating": 0,
+        "metascore": 0,
+        "pg_rating": "N/A",
+        "votes": "N/A",
+        "length": "N/A",
+        "plot": "N/A",
+        "summary": "N/A",
+        "synopsis": "N/A",
+        "directors": "N/A",
+        "stars": "N/A",
+        "genres": "N/A",
+        "review_title": "N/A",
+        "review_rating": 0,
+        "review_text": "N/A",
+        "link": "N/A"
+    }
+
+def is_missing(value):
+    """Tells whether a field still holds its placeholder."""
+    return value in (None, "", "N/A", 0, "0")
+
+def dig(data, *keys):
+    """Follows keys and list indexes through nested JSON, None if any step is missing."""
+    for key in keys:
+        try:
+            data = data[key]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return data
+
+def _text(value):
+    """Unescapes HTML entities and strips tags from a JSON string."""
+    if not isinstance(value, str):
+        return None
+    return " ".join(HTML_TAG_PATTERN.sub(" ", html.unescape(value)).split()) or None
+
+def script_json(data, pattern):
+    """
+    Parses the JSON of the script tags matching a pattern, without parsing the rest of the page.
+
+    Args:
+        data (bytes): Raw page.
+        pattern (re.Pattern): Bytes pattern of the opening script tag.
+
+    Returns:
+        list: Parsed JSON documents, in page order. Invalid documents are skipped.
+    """
+    documents = []
+    for match in pattern.finditer(data):
+        end = data.find(b"</script>", match.end())
+        if end == -1:
+            break
+        try:
+            documents.append(json.loads(data[match.end():end]))
+        except ValueError:
+            continue
+    return documents
+
+def movie_json_ld(data):
+    """
+    Returns the schema.org Movie object of a title page.
+
+    Args:
+        data (bytes): Raw page.
+
+    Returns:
+        dict: The JSON-LD object, or None if the page has none.
+    """
+    for document in script_json(data, JSON_LD_PATTERN):
+        for item in document if isinstance(document, list) else [document]:
+            if isinstance(item, dict) and item.get("@type") in ("Movie", "TVSeries", "TVMovie", "TVEpisode"):
+                return item
+    return None
+
+def next_data(data):
+    """
+    Returns the page props of the Next.js data of a page.
+
+    Args:
+        data (bytes): Raw page.
+
+    Returns:
+        dict: props.pageProps, or None if the page has no Next.js data.
+    """
+    documents = script_json(data, NEXT_DATA_PATTERN)
+    return dig(documents, 0, "props", "pageProps") if documents else None
+
+def format_votes(count):
+    """
+    Formats a vote count the way IMDb shows it, e.g. 2100000 -> "2.1M".
+
+    Args:
+        count (int): Number of votes.
+
+    Returns:
+        str: The short count.
+    """
+    for threshold, suffix in ((1_000_000, "M"), (1_000, "K")):
+        if count >= threshold:
+            return f"{count / threshold:.1f}".rstrip("0").rstrip(".") + suffix
+    return str(count)
+
+def format_runtime(seconds):
+    """
+    Formats a runtime the way IMDb shows it, e.g. 10500 -> "2h 55m".
+
+    Args:
+        seconds (int): Runtime in seconds.
+
+    Returns:
+        str: Hours and minutes.
+    """
+    hours, minutes = divmod(int(seconds) // 60, 60)
+    return " ".join(part for part in (f"{hours}h" if hours else "", f"{minutes}m" if minutes else "") if part) or "N/A"
+
+def _names(people):
+    """Joins the names of JSON-LD Person objects."""
+    people = people if isinstance(people, list) else [people]
+    names = [_text(person.get("name")) for person in people if isinstance(person, dict)]
+    return ", ".join(name for name in names if name) or None
+
+def structured_movie(data, advanced=False):
+    """
+    Extracts the movie fields from the JSON-LD and Next.js data embedded in a title page.
+
+    Args:
+        data (bytes): Raw title page.
+        advanced (bool, optional): Whether to extract the featured review. Defaults to False.
+
+    Returns:
+        dict: The fields found, missing ones keep their placeholders.
+    """
+    details = empty_details()
+    movie = movie_json_ld(data) or {}
+    props = next_data(data) or {}
+    fold = props.get("aboveTheFoldData") or {}
+    main = props.get("mainColumnData") or {}
+
+    details["title"] = _text(dig(fold, "titleText", "text")) or _text(movie.get("name")) or "N/A"
+    year = dig(fold, "releaseYear", "year") or (movie.get("datePublished") or "")[:4]
+    details["year"] = str(year) if year else 0
+
+    rating = dig(fold, "ratingsSummary", "aggregateRating") or dig(movie, "aggregateRating", "ratingValue")
+    details["imdb_rating"] = str(rating) if rating else 0
+    votes = dig(fold, "ratingsSummary", "voteCount") or dig(movie, "aggregateRating", "ratingCount")
+    details["votes"] = format_votes(int(votes)) if votes else "N/A"
+    metascore = dig(fold, "metacritic", "metascore", "score")
+    details["metascore"] = str(metascore) if metascore else 0
+
+    details["pg_rating"] = dig(fold, "certificate", "rating") or _text(movie.get("contentRating")) or "N/A"
+    runtime = dig(fold, "runtime", "seconds")
+    if runtime:
+        details["length"] = format_runtime(runtime)
+    elif movie.get("duration"):
+        match = ISO_DURATION_PATTERN.match(movie["duration"])
+        if match and any(match.groups()):
+            details["length"] = format_runtime(3600 * int(match.group(1) or 0) + 60 * int(match.group(2) or 0))
+    details["plot"] = _text(dig(fold, "plot", "plotText", "plainText")) or _text(movie.get("description")) or "N/A"
+
+    genres = [dig(genre, "text") for genre in dig(fold, "genres", "genres") or []]
+    if not any(genres):
+        genres = movie.get("genre") or []
+        genres = genres if isinstance(genres, list) else [genres]
+    details["genres"] = ", ".join(_text(genre) for genre in genres if _text(genre)) or "N/A"
+
+    credits = {}
+    for group in fold.get("principalCredits") or main.get("principalCredits") or []:
+        category = (dig(group, "category", "id") or "").lower()
+        names = [_text(dig(credit, "name", "nameText", "text")) for credit in group.get("credits") or []]
+        credits[category] = ", ".join(name for name in names if name)
+    details["directors"] = credits.get("director") or _names(movie.get("director")) or "N/A"
+    details["stars"] = credits.get("cast") or _names(movie.get("actor")) or "N/A"
+
+    if advanced:
+        review = dig(main, "featuredReviews", "edges", 0, "node")
+        if review:
+            details["review_title"] = _text(dig(review, "summary", "originalText")) or "No title"
+            details["review_rating"] = str(review["authorRating"]) if review.get("authorRating") else "No rating"
+            details["review_text"] = _text(dig(review, "text", "originalText", "plaidHtml")) or "No text"
+        elif isinstance(movie.get("review"), dict):
+            review = movie["review"]
+            details["review_title"] = _text(review.get("name")) or "No title"
+            rating = dig(review, "reviewRating", "ratingValue")
+            details["review_rating"] = str(rating) if rating else "No rating"
+            details["review_text"] = _text(review.get("reviewBody")) or "No text"
+    return details
+
+def strained_movie(data, advanced=False):
+    """
+    Extracts the movie fields by parsing only the title page elements that hold them.
+
+    Slower than `structured_movie`, used for the fields the embedded data does not provide.
+
+    Args:
+        data (bytes): Raw title page.
+        advanced (bool, optional): Whether to extract the featured review. Defaults to False.
+
+    Returns:
+        dict: The fields found, missing ones keep their placeholders.
+    """
+    details = empty_details()
+    soup = BeautifulSoup(data, FALLBACK_PARSER,
+                         parse_only=SoupStrainer(attrs={"data-testid": MOVIE_PAGE_TEST_IDS}))
+
+    def find(test_id):
+        return soup.find(attrs={"data-testid": test_id})
+
+    title_element = find("hero__primary-text")
+    details["title"] = title_element.get_text(strip=True) if title_element else "N/A"
+
+    # The rating bar opens with an "IMDb RATING" label, the score element holds "9.3" and "/10",
+    # and the vote count is the element right after it
+    score_element = find("hero-rating-bar__aggregate-rating__score")
+    if score_element:
+        score = score_element.find("span")
+        details["imdb_rating"] = score.get_text(strip=True) if score else 0
+        votes_element = score_element.find_next_sibling()
+        details["votes"] = votes_element.get_text(strip=True) if votes_element else "N/A"
+
+    metascore_element = find("reviewContent-all-reviews")
+    metascore = metascore_element.find("span", class_="metacritic-score-box") if metascore_element else None
+    details["metascore"] = metascore.get_text(strip=True) if metascore else 0
+
+    release_element = find("title-details-releasedate")
+    year = re.search(r"\b(18|19|20)\d{2}\b", release_element.get_text(" ", strip=True)) if release_element else None
+    details["year"] = year.group() if year else 0
+
+    certificate_element = find("storyline-certificate")
+    if certificate_element:
+        values = list(certificate_element.stripped_strings)
+        details["pg_rating"] = values[-1] if len(values) > 1 else "N/A"
+
+    runtime_element = find("title-techspec_runtime")
+    if runtime_element:
+        # The label is followed by a div whose text the page splits into "2", "h", "55", "m" nodes
+        content = runtime_element.find("div") or runtime_element
+        match = RUNTIME_TEXT_PATTERN.match(content.get_text().strip())
+        details["length"] = (format_runtime(3600 * int(match.group(1) or 0) + 60 * int(match.group(2) or 0))
+                             if match and any(match.groups()) else "N/A")
+
+    plot_element = find("plot-xl")
+    details["plot"] = plot_element.get_text(strip=True) if plot_element else "N/A"
+
+    genre_element = find("genres") or find("interests")
+    if genre_element:
+        details["genres"] = ", ".join(span.get_text(strip=True) for span in genre_element.select("span.ipc-chip__text")) or "N/A"
+
+    for credit in soup.find_all(attrs={"data-testid": "title-pc-principal-credit"}):
+        names = [a.get_text(strip=True) for a in credit.find_all("a") if a.get_text(strip=True)]
+        if "Stars" in credit.get_text():
+            details["stars"] = ", ".join(names[1:]) or "N/A"
+        if "Director" in credit.get_text():
+            details["directors"] = ", ".join(names) or "N/A"
+
+    if advanced:
+        review_section = find("UserReviews")
+        card = review_section.find("article") if review_section else None
+        if card:
+            title_tag = card.find("h3", class_="ipc-title__text")
+            rating_tag = card.find("span", class_="ipc-rating-star--rating")
+            text_tag = card.find("div", class_="ipc-html-content-inner-div")
+            details["review_title"] = title_tag.get_text(strip=True) if title_tag else "No title"
+            details["review_rating"] = rating_tag.get_text(strip=True) if rating_tag else "No rating"
+            details["review_text"] = text_tag.get_text(strip=True) if text_tag else "No text"
+    return details
+
+def extract_movie(data, advanced=False):
+    """
+    Extracts the movie fields of a title page, from the embedded data first and parsed elements for the rest.
+
+    The HTML is only parsed when a field is missing from the embedded data.
+
+    Args:
+        data (bytes): Raw title page.
+        advanced (bool, optional): Whether to extract the featured review. Defaults to False.
+
+    Returns:
+        dict: The movie fields, with placeholders for the ones not found.
+    """
+    details = structured_movie(data, advanced)
+    fields = ["title", "year", "imdb_rating", "pg_rating", "votes", "length", "plot", "directors", "stars", "genres"]
+    if advanced:
+        fields += ["review_title", "review_text"]
+    if any(is_missing(details[field]) for field in fields):
+        fallback = strained_movie(data, advanced)
+        for field, value in fallback.items():
+            if is_missing(details[field]) and not is_missing(value):
+                details[field] = value
+    return details
+
+def structured_plot(data):
+    """
+    Extracts the plot summaries and synopsis from the Next.js data of a plot summary page.
+
+    Args:
+        data (bytes): Raw plot summary page.
+
+    Returns:
+        tuple: (summaries joined by spaces, synopsis), None for each one not found.
+    """
+    categories = dig(next_data(data), "contentData", "categories") or []
+    texts = {}
+    for category in categories:
+        items = dig(category, "section", "items") or []
+        texts[category.get("id")] = [_text(item.get("htmlContent")) for item in items if isinstance(item, dict)]
+    summaries = [text for text in texts.get("summaries", []) if text]
+    synopsis = [text for text in texts.get("synopsis", []) if text]
+    return (" ".join(summaries) or None), (synopsis[0] if synopsis else None)
+
+def _summary_text(element):
+    """Text of a summary element, without the "—author" line the page renders inside it."""
+    for author in element.find_all("a", href=PLOT_AUTHOR_PATTERN):
+        (author.parent if author.parent is not element else author).decompose()
+    return element.get_text(strip=True).rstrip("—").strip()
+
+def strained_plot(data):
+    """
+    Extracts the plot summaries and synopsis by parsing only their sections of a plot summary page.
+
+    Args:
+        data (bytes): Raw plot summary page.
+
+    Returns:
+        tuple: (summaries joined by spaces, synopsis), None for each one not found.
+    """
+    soup = BeautifulSoup(data, FALLBACK_PARSER, parse_only=SoupStrainer(attrs={"data-testid": PLOT_PAGE_TEST_IDS}))
+    summaries_section = soup.find(attrs={"data-testid": "sub-section-summaries"})
+    synopsis_section = soup.find(attrs={"data-testid": "sub-section-synopsis"})
+
+    summaries = []
+    if summaries_section:
+        summaries = [_summary_text(div) for div in summaries_section.find_all("div", class_="ipc-html-content-inner-div")]
+    synopsis = synopsis_section.find("div", class_="ipc-html-content-inner-div") if synopsis_section else None
+    return (" ".join(summaries) or None), (synopsis.get_text(strip=True) if synopsis else None)
+
+def extract_plot(data):
+    """
+    Extracts the plot summaries and synopsis of a plot summary page, from the embedded data first.
+
+    Args:
+        data (bytes): Raw plot summary page.
+
+    Returns:
+        tuple: (summaries, synopsis), "N/A" for each one not found.
+    """
+    summaries, synopsis = structured_plot(data)
+    if summaries is None or synopsis is None:
+        fallback_summaries, fallback_synopsis = strained_plot(data)
+        summaries = summaries or fallback_summaries
+        synopsis = synopsis or fallback_synopsis
+    return summaries or "N/A", synopsis or "N/A"
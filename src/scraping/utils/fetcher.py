@@ -0,0 +1,228 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+
+# Responses worth retrying: rate limited or a temporary server error
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: allows `rate` requests per second on average and bursts of up to `burst` requests.
+    """
+    def __init__(self, rate, burst=1):
+        """
+        Initializes the TokenBucket.
+
+        Args:
+            rate (float): Tokens added per second.
+            burst (int, optional): Bucket capacity. Defaults to 1.
+        """
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available and takes it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Empties the bucket so no request starts for `seconds`, e.g. after a 429 with Retry-After."""
+        with self._lock:
+            self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+            self.updated = time.monotonic()
+
+class FetchResult:
+    """
+    Outcome of one fetch.
+    """
+    def __init__(self, url, status, content=None, etag=None, last_modified=None, error=None):
+        self.url = url
+        self.status = status
+        self.content = content
+        self.etag = etag
+        self.last_modified = last_modified
+        self.error = error
+
+    @property
+    def ok(self):
+        """bool: True for a 2xx response."""
+        return self.status is not None and 200 <= self.status < 300
+
+    @property
+    def not_modified(self):
+        """bool: True if a conditional request found the page unchanged (304)."""
+        return self.status == 304
+
+class PageFetcher:
+    """
+    Concurrent HTTP fetcher with pooled keep-alive connections and per-host politeness.
+
+    All requests share one requests.Session, so connections are reused. Requests to the same host go
+    through a token bucket, failed requests (429, 5xx, connection errors) are retried with exponential
+    backoff honouring Retry-After, and known ETag / Last-Modified validators are sent as conditional headers.
+    """
+    def __init__(self, max_workers=8, requests_per_second=2.0, burst=4, max_retries=4, backoff=1.0, timeout=20):
+        """
+        Initializes the PageFetcher.
+
+        Args:
+            max_workers (int, optional): Concurrent requests. Defaults to 8.
+            requests_per_second (float, optional): Average requests per second per host. Defaults to 2.0.
+            burst (int, optional): Requests allowed back to back per host. Defaults to 4.
+            max_retries (int, optional): Retries after the first attempt. Defaults to 4.
+            backoff (float, optional): Base delay in seconds, doubled on every retry. Defaults to 1.0.
+            timeout (float, optional): Seconds to wait for a response. Defaults to 20.
+        """
+        self.max_workers = max_workers
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Accept-Language": "en-US,en;q=0.9",
+            "Upgrade-Insecure-Requests": "1",
+        })
+
+        self.validators = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls):
+        """Creates a fetcher with the settings of config.SCRAPER."""
+        return cls(**{key: config.SCRAPER[key] for key in
+                      ("max_workers", "requests_per_second", "burst", "max_retries", "backoff", "timeout")})
+
+    def _bucket(self, url):
+        """Returns the token bucket of the host of a URL."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.requests_per_second, self.burst)
+            return self._buckets[host]
+
+    def _retry_after(self, response):
+        """Reads the Retry-After header in seconds, None if missing or invalid."""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def fetch(self, url, etag=None, last_modified=None):
+        """
+        Fetches one URL.
+
+        Args:
+            url (str): The URL.
+            etag (str, optional): ETag of the cached copy, sent as If-None-Match. Defaults to the last one seen for the URL.
+            last_modified (str, optional): Last-Modified of the cached copy, sent as If-Modified-Since. Defaults to the last one seen.
+
+        Returns:
+            FetchResult: The response status, content and validators, or the error after the last retry.
+        """
+        known_etag, known_last_modified = self.validators.get(url, (None, None))
+        headers = {"User-Agent": random.choice(config.USER_AGENTS_LIST) if config.USER_AGENTS_LIST else DEFAULT_USER_AGENT}
+        if etag or known_etag:
+            headers["If-None-Match"] = etag or known_etag
+        if last_modified or known_last_modified:
+            headers["If-Modified-Since"] = last_modified or known_last_modified
+
+        bucket = self._bucket(url)
+        error = None
+        for attempt in range(self.max_retries + 1):
+            bucket.acquire()
+            delay = None
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                error = str(e)
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    result = FetchResult(url, response.status_code,
+                                         content=response.content if response.ok else None,
+                                         etag=response.headers.get("ETag"),
+                                         last_modified=response.headers.get("Last-Modified"),
+                                         error=None if response.ok or response.status_code == 304 else f"HTTP {response.status_code}")
+                    if result.ok and (result.etag or result.last_modified):
+                        self.validators[url] = (result.etag, result.last_modified)
+                    return result
+                error = f"HTTP {response.status_code}"
+                delay = self._retry_after(response)
+                if response.status_code == 429:
+                    # Slow down every request to this host, not only this one
+                    bucket.pause(delay if delay is not None else self.backoff * 2 ** attempt)
+
+            if attempt < self.max_retries:
+                if delay is None:
+                    delay = self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+                print(f"Retrying {url} in {delay:.1f}s after {error} (attempt {attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+
+        return FetchResult(url, None, error=error)
+
+    def fetch_many(self, urls):
+        """
+        Fetches URLs concurrently.
+
+        Args:
+            urls (list): URLs to fetch.
+
+        Returns:
+            list: FetchResult objects in the order of `urls`.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fetch") as executor:
+            return list(executor.map(self.fetch, urls))
+
+    def close(self):
+        """Closes the pooled connections."""
+        self.session.close()
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+def get_fetcher():
+    """
+    Returns the fetcher shared by the scraper threads, created on first use from config.SCRAPER.
+
+    Returns:
+        PageFetcher: The shared fetcher.
+    """
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = PageFetcher.from_config()
+        return _fetcher
@@ -0,0 +1,27 @@
+"""
+Regression tests for saving scraped movies in the SQLite database.
+"""
+import pytest
+
+from src.database.db_manager import MovieDatabase
+
+GODFATHER = {"title": "The Godfather", "link": "https://www.imdb.com/title/tt0068646/?ref_=sr_t_2",
+             "genres": "Crime, Drama", "stars": "Marlon Brando, Al Pacino", "directors": "Francis Ford Coppola"}
+NO_ID = {"title": "Unknown", "link": "https://www.imdb.com/search/title/", "genres": "Drama"}
+
+@pytest.fixture
+def db(tmp_path):
+    db = MovieDatabase(str(tmp_path / "movies.db"))
+    yield db
+    db.conn.close()
+
+def test_upsert_updates_existing_movie(db):
+    assert db.upsert_movies([GODFATHER]) == 1
+    assert db.upsert_movies([dict(GODFATHER, title="The Godfather (1972)")]) == 1
+    assert db.conn.execute("SELECT title FROM movies").fetchall() == [("The Godfather (1972)",)]
+
+def test_upsert_skips_movies_without_imdb_id(db):
+    assert db.upsert_movies([GODFATHER, NO_ID]) == 1
+    assert db.upsert_movies([NO_ID]) == 0
+    assert db.conn.execute("SELECT COUNT(*) FROM movies").fetchone() == (1,)
+    assert len(db.filter_movie_ids({"liked_genres": ["Drama"]})) == 1
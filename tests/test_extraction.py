@@ -0,0 +1,93 @@
+"""
+Regression tests for the title and plot summary page extraction.
+
+The fixtures in `tests/fixtures/imdb/` follow the markup of live IMDb pages, trimmed to the elements and
+embedded data the parsers read: the "IMDb RATING" label of the rating bar, the runtime split into separate
+text nodes and the author line rendered inside each plot summary. The two Shawshank Redemption pages carry
+the JSON-LD and Next.js data, the two Godfather pages have HTML only and exercise the fallback parser.
+They can be refreshed with pages saved by the scraper, e.g. `PageStore(config.PAGE_STORE["path"]).get(url)`.
+"""
+from pathlib import Path
+
+import pytest
+
+from src.scraping.utils.extraction import extract_movie, extract_plot, strained_movie, structured_movie
+
+FIXTURES = Path(__file__).parent / "fixtures" / "imdb"
+
+def load(name):
+    return (FIXTURES / name).read_bytes()
+
+SHAWSHANK = {
+    "title": "The Shawshank Redemption",
+    "year": "1994",
+    "imdb_rating": "9.3",
+    "metascore": "82",
+    "pg_rating": "R",
+    "votes": "3M",
+    "length": "2h 22m",
+    "directors": "Frank Darabont",
+    "stars": "Tim Robbins, Morgan Freeman, Bob Gunton",
+    "genres": "Drama",
+}
+
+GODFATHER = {
+    "title": "The Godfather",
+    "year": "1972",
+    "imdb_rating": "9.2",
+    "metascore": "100",
+    "pg_rating": "R",
+    "votes": "2.1M",
+    "length": "2h 55m",
+    "directors": "Francis Ford Coppola",
+    "stars": "Marlon Brando, Al Pacino, James Caan",
+}
+
+@pytest.mark.parametrize("page, expected", [("title_tt0111161.html", SHAWSHANK), ("title_tt0068646.html", GODFATHER)])
+def test_extract_movie(page, expected):
+    details = extract_movie(load(page))
+    for field, value in expected.items():
+        assert details[field] == value, field
+    assert details["plot"].startswith(("A banker convicted", "The aging patriarch"))
+
+def test_extract_movie_fallback_genres():
+    genres = extract_movie(load("title_tt0068646.html"))["genres"].split(", ")
+    assert {"Crime", "Drama"} <= set(genres)
+
+def test_structured_movie_reads_embedded_data_only():
+    details = structured_movie(load("title_tt0111161.html"), advanced=True)
+    assert details["imdb_rating"] == "9.3"
+    assert details["review_title"] == "Some birds aren't meant to be caged."
+    assert details["review_rating"] == "10"
+    assert details["review_text"].startswith("The Shawshank Redemption is written and directed by Frank Darabont.")
+
+def test_strained_movie_skips_rating_label():
+    for page, rating in [("title_tt0111161.html", "9.3"), ("title_tt0068646.html", "9.2")]:
+        details = strained_movie(load(page))
+        assert details["imdb_rating"] == rating
+        assert "RATING" not in details["votes"]
+
+def test_strained_movie_review():
+    details = strained_movie(load("title_tt0068646.html"), advanced=True)
+    assert details["review_title"] == "The Godfather is the greatest film of all time"
+    assert details["review_rating"] == "10"
+    assert details["review_text"].startswith("Every scene is carefully built")
+
+def test_extract_plot_structured():
+    summaries, synopsis = extract_plot(load("plotsummary_tt0111161.html"))
+    assert summaries.startswith("Chronicles the experiences of a formerly successful banker")
+    assert "the man's unique way" in summaries
+    assert "<br" not in summaries and summaries.endswith("he never loses hope.")
+    assert synopsis.startswith("In 1947, banker Andy Dufresne")
+    assert 'Ellis "Red" Redding' in synopsis
+
+def test_extract_plot_fallback():
+    summaries, synopsis = extract_plot(load("plotsummary_tt0068646.html"))
+    assert summaries.startswith("The aging patriarch of an organized crime dynasty")
+    assert summaries.endswith("the head of the Corleone mafia family in New York.")
+    assert "Anonymous" not in summaries
+    assert synopsis == ("In late summer 1945, guests are gathered for the wedding reception of "
+                        "Don Vito Corleone's daughter Connie and Carlo Rizzi.")
+
+def test_extract_plot_missing_sections():
+    assert extract_plot(load("title_tt0068646.html")) == ("N/A", "N/A")
@@ -0,0 +1,42 @@
+"""
+Regression tests for the filtered search of the vector store backends.
+
+The retrieval filters pass movie ids from the database, which may include movies that are not embedded yet.
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+hnswlib = pytest.importorskip("hnswlib")
+
+from src.database.vector_store import HnswVectorStore, load_vector_store
+
+@pytest.fixture
+def store(tmp_path):
+    rng = np.random.default_rng(0)
+    store = HnswVectorStore(8, path=str(tmp_path / "hnsw"))
+    store.build(np.arange(100), rng.normal(size=(100, 8)))
+    return store
+
+def test_search_ignores_allowed_ids_missing_from_index(store):
+    ids, distances = store.search(np.zeros(8), top_k=5, allowed_ids={1, 2, 500, 501, 502})
+    assert sorted(ids.tolist()) == [1, 2]
+    assert len(distances) == 2
+
+def test_search_without_indexed_allowed_ids_is_empty(store):
+    ids, distances = store.search(np.zeros(8), top_k=5, allowed_ids={500, 501})
+    assert len(ids) == 0 and len(distances) == 0
+
+def test_search_skips_deleted_and_reloaded_labels(store):
+    store.delete([1, 700])
+    ids, _ = store.search(np.zeros(8), top_k=5, allowed_ids={1, 2, 500})
+    assert ids.tolist() == [2]
+
+    store.save()
+    loaded = load_vector_store(store.path)
+    assert len(loaded) == 99
+    ids, _ = loaded.search(np.zeros(8), top_k=5, allowed_ids={1, 2, 3, 500})
+    assert sorted(ids.tolist()) == [2, 3]
+
+    loaded.add([1], np.zeros((1, 8)))
+    ids, _ = loaded.search(np.zeros(8), top_k=5, allowed_ids={1, 500})
+    assert ids.tolist() == [1]
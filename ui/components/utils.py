@@ -1,69 +1,43 @@
 import streamlit as st
-import pandas as pd
-import sqlite3
+import altair as alt
 
-from src.core.generation import RecommendationGenerator
-from src.core.retrieval import HybridRetriever
-from src.core.reranking import Reranker
-from src.core.hyde import Hyde
-from src.core.feature_extractor import FeatureExtractor
+from src.core.pipeline import RecommendationPipeline
+from src.core.startup import StartupOrchestrator
 
 @st.cache_resource
-def load_recommendation_generator():
-    """Loads the recommendation generator model."""
-    generator = RecommendationGenerator()
-    st.success("Recommendation generator model loaded.")
-    return generator
-
-@st.cache_resource
-def load_feature_extractor():
-    """Loads the feature extractor model."""
-    conn = sqlite3.connect('data/processed/movies.db')
-
-    # Load data into pandas DataFrame
-    df = pd.read_sql_query("SELECT * FROM movies", conn)
-    conn.close()
-
-    all_genres = df['genres'].str.split(', ').explode().unique()
-    print("All genres:", len(all_genres))
-
-    extractor = FeatureExtractor(all_genres)
-    st.success("Genre extraction model loaded.")
-    return extractor
-
-@st.cache_resource
-def load_movie_retriever():
-    """Loads the movie retriever model."""
-    try:
-        conn = sqlite3.connect('data/processed/movies_summaries.db')
-        df_summaries = pd.read_sql_query("SELECT * FROM movies_summaries", conn)
-        conn.close()
-
-        conn = sqlite3.connect('data/processed/movies.db')
-        df_movies = pd.read_sql_query("SELECT * FROM movies", conn)
-        conn.close()
-
-    except FileNotFoundError:
-        st.error("Data file not found. Please run data preprocessing script.")
-        return None
-    retriever = HybridRetriever(
-        vector_index_path="data/faiss_index.bin",
-        bm25_corpus=df_summaries["generated_summary"].tolist(),
-        metadata=df_movies
+def load_pipeline():
+    """
+    Starts loading every pipeline component in the background.
+
+    The pipeline is cached, so components load once per process and are shared by every session.
+    """
+    return RecommendationPipeline(StartupOrchestrator().start())
+
+def show_startup_status(startup):
+    """Displays the load state and load time of every component."""
+    for name, state in startup.status().items():
+        if state == "loading":
+            st.info(f"{name}: loading...")
+        elif state == "failed":
+            st.error(f"{name}: failed to load ({startup.errors[name]}). Please run the data preprocessing script.")
+        else:
+            st.success(f"{name}: loaded in {state}s.")
+
+def show_trace_waterfall(trace):
+    """Displays the spans of a query trace as a waterfall chart, one bar per span, nested spans indented."""
+    rows = trace.waterfall()
+    if not rows:
+        st.write("No spans recorded.")
+        return
+
+    for row in rows:
+        row["span"] = f"{'  ' * row['depth']}{row['name']}"
+
+    chart = alt.Chart(alt.Data(values=rows)).mark_bar().encode(
+        x=alt.X("start_ms:Q", title="Milliseconds since query start"),
+        x2="end_ms:Q",
+        y=alt.Y("span:N", sort=None, title=None),
+        tooltip=["name:N", alt.Tooltip("duration_ms:Q", format=".1f")],
     )
-    st.success("Movie data loaded and search engine initialized.")
-    return retriever
-
-@st.cache_resource
-def load_movie_reranker():
-    """Loads the movie reranker model."""
-    reranker = Reranker()
-    st.success("Reranking model loaded.")
-    return reranker
-
-@st.cache_resource
-def load_hyde_generator():
-    """Loads the Hyde generator model."""
-    hyde = Hyde()
-    st.success("Hyde generator loaded.")
-    return hyde
+    st.altair_chart(chart, use_container_width=True)
+    st.caption(f"Trace {trace.trace_id}: {rows[0]['duration_ms']:.0f} ms in total.")